@@ -3,3 +3,8 @@ from django.apps import AppConfig
 class AccountsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'accounts'
+
+    def ready(self):
+        from core import refdata
+        from .models import UserType
+        refdata.register(UserType, name_field='type_name')
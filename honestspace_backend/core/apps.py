@@ -3,3 +3,36 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from . import profiling, refdata
+        from .system_settings import system_settings
+        from .models import (
+            Amenity, AmenityCategory, City, Country, County, MediaType,
+            Neighborhood, RatingCategory, SystemSetting, TrustBadge,
+        )
+        if profiling.profiling_settings()['ENABLED']:
+            connection_created.connect(
+                profiling.install_execute_wrapper, dispatch_uid='profiling_execute_wrapper',
+            )
+            profiling.instrument_serializers()
+
+        refdata.register(Country)
+        refdata.register(County, select_related=['country'])
+        refdata.register(City, select_related=['county__country'])
+        refdata.register(Neighborhood, select_related=['city__county__country'])
+        refdata.register(AmenityCategory)
+        refdata.register(Amenity, select_related=['category'])
+        refdata.register(MediaType)
+        refdata.register(RatingCategory)
+        refdata.register(TrustBadge)
+
+        def invalidate_system_settings(sender, **kwargs):
+            system_settings.invalidate()
+
+        post_save.connect(invalidate_system_settings, sender=SystemSetting,
+                          dispatch_uid='system_settings_saved', weak=False)
+        post_delete.connect(invalidate_system_settings, sender=SystemSetting,
+                            dispatch_uid='system_settings_deleted', weak=False)
@@ -0,0 +1,8 @@
+# core/async_urls.py
+from django.urls import path
+from .async_views import AsyncAmenityListView, AsyncNeighborhoodListView
+
+urlpatterns = [
+    path('amenities/', AsyncAmenityListView.as_view(), name='async-amenity-list'),
+    path('neighborhoods/', AsyncNeighborhoodListView.as_view(), name='async-neighborhood-list'),
+]
@@ -0,0 +1,183 @@
+# core/async_views.py
+"""
+Async read endpoints for ASGI deployments.
+
+DRF views are synchronous, so under ASGI every DRF request still holds a
+worker thread while it waits on Postgres. ``AsyncAPIView`` is a small
+async counterpart for read-only JSON endpoints, built on Django's async
+views and async ORM. It authenticates like the API (JWT bearer token,
+then the session), answers conditional GETs and sets cache headers as
+``core.conditional`` does, returns DRF-shaped error bodies and renders
+with ``FastJSONRenderer``. Handlers return plain data. The few pieces
+with no async ORM equivalent (filter validation against the reference
+cache, count estimates, session lookups) go through ``sync_to_async``.
+
+Django 4.2 cannot ``prefetch_related()`` during async iteration;
+``prefetch()`` fills the prefetch cache the same way with one async
+query. The endpoints are mounted under ``/api/async/``, mirroring the
+sync URLs.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.contrib.auth.models import AnonymousUser
+from django.http import Http404, HttpResponse
+from django.views import View
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from properties.models import NeighborhoodMarketStats
+from properties.serializers import AmenitySerializer
+from . import refdata
+from .conditional import (
+    ConditionalGetMixin, add_content_etag, add_validators, is_conditional, make_etag, not_modified,
+    patch_cache_headers,
+)
+from .models import Amenity, AmenityCategory, City, Country, County, Neighborhood
+from .pagination import AsyncPageNumberPagination
+from .renderers import FastJSONRenderer
+from .serializers import NeighborhoodSerializer, NeighborhoodWithStatsSerializer
+from .views import amarket_stats_validators
+
+MEDIA_TYPE = 'application/json'
+
+
+async def prefetch(instances, name, queryset):
+    """
+    ``prefetch_related(Prefetch(name, queryset))`` for a reverse foreign key
+    ``name`` on ``instances``, run with the async ORM.
+    """
+    if not instances:
+        return
+    field = instances[0]._meta.get_field(name).field
+    groups = {}
+    related = queryset.filter(**{f'{field.name}__in': [instance.pk for instance in instances]})
+    async for obj in related:
+        groups.setdefault(getattr(obj, field.attname), []).append(obj)
+    for instance in instances:
+        cached = getattr(instance, name).all()
+        cached._result_cache = groups.get(instance.pk, [])
+        cached._prefetch_done = True
+        instance.__dict__.setdefault('_prefetched_objects_cache', {})[name] = cached
+
+
+class AsyncAPIView(View):
+    http_method_names = ['get', 'head']
+    authentication_required = False
+    renderer = FastJSONRenderer()
+    vary_headers = ConditionalGetMixin.vary_headers
+    validate_unconditional = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = AnonymousUser()
+        if request.method not in ('GET', 'HEAD'):
+            return await super().dispatch(request, *args, **kwargs)
+        api_request = Request(request, parsers=[], authenticators=[])
+        api_request.accepted_media_type = MEDIA_TYPE
+        self.request = api_request
+        try:
+            api_request.user = await self.authenticate(request)
+            if self.authentication_required and not api_request.user.is_authenticated:
+                raise exceptions.NotAuthenticated()
+            response = await self.conditional_get(api_request, *args, **kwargs)
+        except Http404:
+            response = self.handle_exception(exceptions.NotFound())
+        except exceptions.APIException as exc:
+            response = self.handle_exception(exc)
+        patch_cache_headers(api_request, response, self.vary_headers)
+        return response
+
+    async def conditional_get(self, request, *args, **kwargs):
+        if not self.validate_unconditional and not is_conditional(request):
+            return add_content_etag(self.render(await self.get(request, *args, **kwargs)))
+        validators = await self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return self.render(await self.get(request, *args, **kwargs))
+        parts, last_modified = validators
+        etag = make_etag(request, MEDIA_TYPE, parts)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = self.render(await self.get(request, *args, **kwargs))
+        return add_validators(response, etag, last_modified)
+
+    async def get_validators(self, request, *args, **kwargs):
+        """As ``ConditionalGetMixin.get_validators()``; None skips conditional handling."""
+        return None
+
+    async def get(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    async def authenticate(self, request):
+        """The user for a bearer token, else the session user, else ``AnonymousUser``."""
+        authentication = JWTAuthentication()
+        header = authentication.get_header(request)
+        raw_token = authentication.get_raw_token(header) if header is not None else None
+        if raw_token is not None:
+            token = authentication.get_validated_token(raw_token)
+            try:
+                user_id = token[jwt_settings.USER_ID_CLAIM]
+            except KeyError:
+                raise InvalidToken('Token contained no recognizable user identification')
+            user = await authentication.user_model.objects.filter(
+                **{jwt_settings.USER_ID_FIELD: user_id}
+            ).afirst()
+            if user is None:
+                raise exceptions.AuthenticationFailed('User not found', code='user_not_found')
+            if not user.is_active:
+                raise exceptions.AuthenticationFailed('User is inactive', code='user_inactive')
+            return user
+        if settings.SESSION_COOKIE_NAME in request.COOKIES:
+            return await sync_to_async(get_user)(request)
+        return AnonymousUser()
+
+    def render(self, data, status=200):
+        return HttpResponse(self.renderer.render(data), status=status, content_type=MEDIA_TYPE)
+
+    def handle_exception(self, exc):
+        detail = exc.detail
+        response = self.render(detail if isinstance(detail, (list, dict)) else {'detail': detail}, exc.status_code)
+        if isinstance(exc, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+            response.status_code = 401
+            response['WWW-Authenticate'] = 'Bearer realm="api"'
+        return response
+
+
+class AsyncNeighborhoodListView(AsyncAPIView):
+    """Async ``NeighborhoodListView``"""
+
+    async def get_validators(self, request):
+        parts, last_modified = [refdata.versions(Neighborhood, City, County, Country)], None
+        if self.include_stats(request):
+            stats, last_modified = await amarket_stats_validators(NeighborhoodMarketStats.objects.all())
+            parts.append(stats)
+        return parts, last_modified
+
+    def include_stats(self, request):
+        return 'stats' in request.query_params.get('include', '').split(',')
+
+    async def get(self, request):
+        paginator = AsyncPageNumberPagination()
+        queryset = Neighborhood.objects.select_related('city__county__country')
+        page = await paginator.apaginate_queryset(queryset, request)
+        serializer_class = NeighborhoodSerializer
+        if self.include_stats(request):
+            await prefetch(page, 'market_stats', NeighborhoodMarketStats.objects.all())
+            serializer_class = NeighborhoodWithStatsSerializer
+        return paginator.get_paginated_response(serializer_class(page, many=True).data).data
+
+
+class AsyncAmenityListView(AsyncAPIView):
+    """Active amenities with their categories"""
+
+    async def get_validators(self, request):
+        return [refdata.versions(Amenity, AmenityCategory)], None
+
+    async def get(self, request):
+        amenities = [
+            amenity async for amenity in
+            Amenity.objects.filter(is_active=True).select_related('category').order_by('sort_order', 'name')
+        ]
+        return AmenitySerializer(amenities, many=True).data
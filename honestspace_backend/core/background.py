@@ -0,0 +1,60 @@
+# core/background.py
+"""
+Per-process background flushing for in-memory buffers.
+
+A ``PeriodicFlusher`` runs a callback every ``interval`` seconds on a daemon
+thread, started lazily the first time something is buffered, and once more
+at interpreter exit so a worker shutting down does not lose its buffer.
+Pollers with nothing buffered in memory pass ``flush_at_exit=False``.
+"""
+import atexit
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class PeriodicFlusher:
+    def __init__(self, name, callback, interval, flush_at_exit=True):
+        self.name = name
+        self.callback = callback
+        self.interval = interval
+        self.flush_at_exit = flush_at_exit
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def ensure_started(self):
+        """Start the flush thread for this process if it is not running."""
+        # A forked worker inherits the parent's thread object but not the thread.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid is None and self.flush_at_exit:
+                atexit.register(self.flush_now)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def wake(self):
+        """Flush early, e.g. when a buffer reaches its size limit."""
+        self._wakeup.set()
+
+    def flush_now(self):
+        try:
+            self.callback()
+        except Exception:
+            logger.exception('%s flush failed', self.name)
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush_now()
+            # Database connections are per thread; do not hold one between flushes.
+            from django.db import connections
+            connections.close_all()
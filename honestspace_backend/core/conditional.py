@@ -0,0 +1,120 @@
+# core/conditional.py
+"""
+Conditional GET and cache headers for read endpoints.
+
+Views that mix in ``ConditionalGetMixin`` implement ``get_validators()``,
+returning a few cheap values that change whenever the response would
+(timestamps, counts, reference-table versions) and the latest modification
+time; views with their own ``get()`` pass their handler through
+``conditional_response()``. The values are hashed into an ETag together with the URL, the negotiated
+media type and the user, and a matching ``If-None-Match`` or
+``If-Modified-Since`` is answered with ``304 Not Modified`` before the
+queryset is evaluated or anything is serialized.
+
+Validators that aggregate over a whole filtered queryset are not cheap.
+Views that set ``validate_unconditional = False`` skip them for requests
+without ``If-None-Match`` or ``If-Modified-Since``; such responses get an
+ETag hashed from the body, and later revalidations go through the
+validators.
+
+Anonymous responses are ``public`` for ``HTTP_CACHE_MAX_AGE`` seconds so a
+reverse proxy can serve repeats; authenticated ones carry per-user fields
+and are ``private`` and revalidated on every use.
+"""
+import hashlib
+
+from django.conf import settings
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag,
+)
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    vary_headers = ('Accept', 'Authorization', 'Cookie')
+    # False to skip get_validators() unless the client is revalidating
+    validate_unconditional = True
+
+    def get_validators(self, request, *args, **kwargs):
+        """
+        ``(parts, last_modified)`` for the current representation, or None
+        when there is nothing to validate (e.g. the object does not exist).
+        """
+        raise NotImplementedError
+
+    def get_etag(self, request, parts):
+        return make_etag(request, request.accepted_media_type, parts)
+
+    def get(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().get, *args, **kwargs)
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        """Call ``handler`` unless the client's copy is still current."""
+        if not self.validate_unconditional and not is_conditional(request):
+            return add_content_etag(handler(request, *args, **kwargs))
+        validators = self.get_validators(request, *args, **kwargs)
+        if validators is None:
+            return handler(request, *args, **kwargs)
+
+        parts, last_modified = validators
+        etag = self.get_etag(request, parts)
+        response = not_modified(request, etag, last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        return add_validators(response, etag, last_modified)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        patch_cache_headers(request, response, self.vary_headers)
+        return response
+
+
+def make_etag(request, media_type, parts):
+    user = request.user.pk if request.user.is_authenticated else None
+    fingerprint = repr((request.get_full_path(), media_type, user, parts))
+    return quote_etag(hashlib.md5(fingerprint.encode()).hexdigest())
+
+
+def is_conditional(request):
+    return 'HTTP_IF_NONE_MATCH' in request.META or 'HTTP_IF_MODIFIED_SINCE' in request.META
+
+
+def add_content_etag(response):
+    """ETag ``response`` with a hash of its body once it is rendered."""
+    if response.status_code == 200:
+        if getattr(response, 'is_rendered', True):
+            set_response_etag(response)
+        else:
+            response.add_post_render_callback(set_response_etag)
+    return response
+
+
+def not_modified(request, etag, last_modified):
+    """The ``304`` (or ``412``) response when the client's copy is current, else None"""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def add_validators(response, etag, last_modified):
+    if response.status_code in (200, 304):
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(int(last_modified.timestamp()))
+    return response
+
+
+def patch_cache_headers(request, response, vary_headers):
+    """Public caching for anonymous reads, private revalidation for authenticated ones"""
+    if request.method in ('GET', 'HEAD') and response.status_code in (200, 304):
+        if request.user.is_authenticated:
+            patch_cache_control(response, private=True, no_cache=True)
+        else:
+            patch_cache_control(
+                response, public=True, max_age=getattr(settings, 'HTTP_CACHE_MAX_AGE', 60)
+            )
+        patch_vary_headers(response, vary_headers)
+
+
+def latest(*timestamps):
+    """Most recent of ``timestamps``, ignoring missing ones"""
+    return max((ts for ts in timestamps if ts is not None), default=None)
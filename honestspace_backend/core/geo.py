@@ -0,0 +1,70 @@
+# core/geo.py
+"""
+PostGIS expressions for metre-based search on SRID 4326 points.
+
+Radius and distance queries cast the stored geometry to ``geography`` so
+that distances are in metres; the casts match the functional GiST indexes
+on ``property_locations`` and ``landmarks`` so both ``ST_DWithin`` and
+KNN ``<->`` ordering are index-assisted.
+"""
+from django.contrib.gis.db import models as gis_models
+from django.db import models
+from django.db.models import Func, Value
+
+SRID = 4326
+
+
+class AsGeography(Func):
+    """``<geometry>::geography``"""
+    template = '(%(expressions)s)::geography'
+    output_field = gis_models.PointField(srid=SRID, geography=True)
+
+
+class GeographyPoint(Func):
+    """A constant lng/lat point as ``geography``"""
+    template = f'ST_SetSRID(ST_MakePoint(%(expressions)s), {SRID})::geography'
+    output_field = gis_models.PointField(srid=SRID, geography=True)
+
+    def __init__(self, lng, lat, **extra):
+        super().__init__(Value(float(lng)), Value(float(lat)), **extra)
+
+
+class GeographyDWithin(Func):
+    """``ST_DWithin(a, b, metres)`` on geography arguments"""
+    function = 'ST_DWithin'
+    output_field = models.BooleanField()
+
+
+class GeographyKNNDistance(Func):
+    """``a <-> b``: index-assisted nearest-neighbour distance in metres"""
+    arg_joiner = ' <-> '
+    template = '(%(expressions)s)'
+    output_field = models.FloatField()
+
+
+class MakeEnvelope(Func):
+    function = 'ST_MakeEnvelope'
+    template = f'%(function)s(%(expressions)s, {SRID})'
+    output_field = gis_models.PolygonField(srid=SRID)
+
+    def __init__(self, min_lng, min_lat, max_lng, max_lat, **extra):
+        super().__init__(*(Value(float(v)) for v in (min_lng, min_lat, max_lng, max_lat)), **extra)
+
+
+class BBoxOverlaps(Func):
+    """``a && b``: bounding-box overlap, served by the geometry GiST index"""
+    arg_joiner = ' && '
+    template = '(%(expressions)s)'
+    output_field = models.BooleanField()
+
+
+def within_radius(field, lng, lat, radius_m):
+    return GeographyDWithin(AsGeography(field), GeographyPoint(lng, lat), Value(float(radius_m)))
+
+
+def distance_to(field, lng, lat):
+    return GeographyKNNDistance(AsGeography(field), GeographyPoint(lng, lat))
+
+
+def within_bbox(field, min_lng, min_lat, max_lng, max_lat):
+    return BBoxOverlaps(field, MakeEnvelope(min_lng, min_lat, max_lng, max_lat))
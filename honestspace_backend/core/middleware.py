@@ -0,0 +1,155 @@
+# core/middleware.py
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from .models import APIUsageLog
+from .profiling import RequestProfile, profile_store, profiled, profiling_settings, sample, should_profile
+from .replicas import pins_to_primary, reads_from_replicas, replica_reads, replication_settings, stick
+from .usage import client_ip, usage_log_writer
+
+
+def endpoint_name(request):
+    """The matched URL pattern (e.g. ``/api/properties/<uuid:pk>/``), else the path"""
+    match = request.resolver_match
+    return f'/{match.route}' if match is not None and match.route else request.path
+
+
+class HybridMiddleware:
+    """
+    Base for middleware that runs natively under both WSGI and ASGI, so an
+    async view is not pushed onto a thread by a sync middleware in front of
+    it. Subclasses implement ``before()``, whose return value is passed on
+    to ``after()``.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self.before(request)
+        response = self.get_response(request)
+        return self.after(request, response, state)
+
+    async def __acall__(self, request):
+        state = self.before(request)
+        response = await self.get_response(request)
+        return self.after(request, response, state)
+
+    def before(self, request):
+        return None
+
+    def after(self, request, response, state):
+        return response
+
+
+class APIUsageLogMiddleware(HybridMiddleware):
+    """
+    Record API calls in ``APIUsageLog`` without a synchronous INSERT; records
+    are queued for the background writer in ``core.usage``.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.writer = usage_log_writer
+
+    def before(self, request):
+        if not self.writer.should_log(request.path):
+            return None
+        return time.perf_counter()
+
+    def after(self, request, response, started):
+        if started is None:
+            return response
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+
+        endpoint = endpoint_name(request)
+        # DRF copies the authenticated (e.g. JWT) user back onto the Django request.
+        user = getattr(request, 'user', None)
+        self.writer.enqueue(APIUsageLog(
+            endpoint=endpoint[:200],
+            method=request.method,
+            user_id=user.pk if user is not None and user.is_authenticated else None,
+            ip_address=client_ip(request) or '0.0.0.0',
+            user_agent=request.META.get('HTTP_USER_AGENT', ''),
+            response_status=response.status_code,
+            response_time_ms=elapsed_ms,
+            request_size_bytes=int(request.META.get('CONTENT_LENGTH') or 0),
+            response_size_bytes=0 if response.streaming else len(response.content),
+        ))
+        return response
+
+
+class RequestProfilingMiddleware(HybridMiddleware):
+    """
+    Count queries and time the database and serializers for each request
+    (see ``core.profiling``). Staff users get the totals in a
+    ``Server-Timing`` header; sampled requests are aggregated per endpoint.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.config = profiling_settings()
+        self.store = profile_store
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not should_profile(request.path, self.config):
+            return self.get_response(request)
+        profile = RequestProfile(sample(self.config), self.config)
+        with profiled(profile):
+            response = self.get_response(request)
+        return self.finish(request, response, profile)
+
+    async def __acall__(self, request):
+        if not should_profile(request.path, self.config):
+            return await self.get_response(request)
+        profile = RequestProfile(sample(self.config), self.config)
+        with profiled(profile):
+            response = await self.get_response(request)
+        return self.finish(request, response, profile)
+
+    def finish(self, request, response, profile):
+        total_ms = (time.perf_counter() - profile.started) * 1000
+        user = getattr(request, 'user', None)
+        if self.config['SERVER_TIMING'] and user is not None and user.is_staff:
+            response['Server-Timing'] = profile.server_timing(total_ms)
+        if profile.sampled:
+            self.store.add(f'{request.method} {endpoint_name(request)}', profile, total_ms)
+        return response
+
+
+class ReplicaRoutingMiddleware(HybridMiddleware):
+    """
+    Let safe requests read from replicas unless the client wrote recently,
+    and pin clients to the primary after a write (see ``core.replicas``).
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.config = replication_settings()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        with replica_reads(reads_from_replicas(request, self.config)):
+            response = self.get_response(request)
+        return self.after(request, response, None)
+
+    async def __acall__(self, request):
+        with replica_reads(reads_from_replicas(request, self.config)):
+            response = await self.get_response(request)
+        return self.after(request, response, None)
+
+    def after(self, request, response, state):
+        if pins_to_primary(request, response):
+            stick(request, response, self.config)
+        return response
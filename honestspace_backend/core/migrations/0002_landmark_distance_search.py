@@ -0,0 +1,22 @@
+import core.geo
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='landmarktype',
+            name='search_radius_m',
+            field=models.PositiveIntegerField(default=2000),
+        ),
+        migrations.AddIndex(
+            model_name='landmark',
+            index=django.contrib.postgres.indexes.GistIndex(core.geo.AsGeography('location'), name='landmarks_geog_idx'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_landmark_distance_search'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='county',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='counties_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='city',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='cities_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='neighborhood',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='neighborhoods_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
@@ -1,7 +1,10 @@
 from django.db import models
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex, GistIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 import uuid
+from .geo import AsGeography
 
 
 class Country(models.Model):
@@ -30,6 +33,9 @@ class County(models.Model):
         db_table = 'counties'
         unique_together = ['name', 'country']
         verbose_name_plural = 'Counties'
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='counties_name_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name}, {self.country.name}"
@@ -47,6 +53,9 @@ class City(models.Model):
         db_table = 'cities'
         unique_together = ['name', 'county']
         verbose_name_plural = 'Cities'
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='cities_name_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name}, {self.county.name}"
@@ -78,6 +87,9 @@ class Neighborhood(models.Model):
     class Meta:
         db_table = 'neighborhoods'
         unique_together = ['name', 'city']
+        indexes = [
+            GinIndex(fields=['name'], opclasses=['gin_trgm_ops'], name='neighborhoods_name_trgm_idx'),
+        ]
     
     def __str__(self):
         return f"{self.name}, {self.city.name}"
@@ -89,6 +101,8 @@ class LandmarkType(models.Model):
     icon = models.CharField(max_length=50)
     color = models.CharField(max_length=7, default='#000000')  # Hex color
     description = models.TextField(blank=True)
+    # How far away a landmark of this type is still worth listing on a property
+    search_radius_m = models.PositiveIntegerField(default=2000)
     
     class Meta:
         db_table = 'landmark_types'
@@ -133,6 +147,7 @@ class Landmark(models.Model):
             models.Index(fields=['landmark_type']),
             models.Index(fields=['neighborhood']),
             models.Index(fields=['is_active']),
+            GistIndex(AsGeography('location'), name='landmarks_geog_idx'),
         ]
     
     def __str__(self):
@@ -314,6 +329,10 @@ class SystemSetting(models.Model):
     def __str__(self):
         return f"{self.key}: {self.value}"
     
+    def clean(self):
+        from .system_settings import system_settings
+        system_settings.parse(self)
+    
     def get_typed_value(self):
         """Return the value converted to its proper type"""
         if self.data_type == 'integer':
@@ -344,7 +363,8 @@ class APIUsageLog(models.Model):
     response_time_ms = models.PositiveIntegerField()
     request_size_bytes = models.PositiveIntegerField(default=0)
     response_size_bytes = models.PositiveIntegerField(default=0)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Request time, not insert time: rows are written in batches by core.usage
+    timestamp = models.DateTimeField(default=timezone.now)
     
     class Meta:
         db_table = 'api_usage_logs'
@@ -0,0 +1,283 @@
+# core/pagination.py
+import base64
+import binascii
+import json
+from collections import OrderedDict
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db import connections
+from django.db.models import F, Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Return the planner's row estimate for ``queryset`` instead of running
+    ``COUNT(*)``. Cheap at any table size, but only as accurate as the
+    table statistics.
+    """
+    query = queryset.order_by().values('pk').query
+    sql, params = query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset ("seek") pagination over ``(ordering_field, pk)``.
+
+    Each page is fetched with ``WHERE (ordering_field, pk) < (last seen)``
+    against a matching composite index, so deep pages cost the same as the
+    first one. Nullable ordering fields sort last. Querysets that arrive
+    already ordered (e.g. by distance or relevance) keep their ordering and
+    are paged by offset instead. The total is optional:
+    ``?count=exact`` runs ``COUNT(*)`` and ``?count=estimate`` reads the
+    planner estimate; by default no count is computed.
+    """
+    ordering_field = 'created_at'
+    page_size = api_settings.PAGE_SIZE or 20
+    max_page_size = 100
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    count_modes = ('exact', 'estimate')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        page = self.page_queryset(queryset, request)
+        self.count = self.get_count(queryset)
+        return self.set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset()`` for async views; rows come from the async ORM."""
+        page = self.page_queryset(queryset, request)
+        self.count = await sync_to_async(self.get_count)(queryset) if self.count_mode else None
+        return self.set_page([row async for row in page])
+
+    def page_queryset(self, queryset, request):
+        """Read the paging parameters and return the slice to fetch (one row past the page)."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.offset = None
+        self.count_mode = request.query_params.get(self.count_query_param)
+        if self.count_mode not in self.count_modes:
+            self.count_mode = None
+
+        model = queryset.model
+        self.pk_name = model._meta.pk.name
+        self.field = model._meta.get_field(self.ordering_field)
+        self.pk_field = model._meta.pk
+
+        self.cursor = cursor = self.decode_cursor(request)
+        self.reverse = bool(cursor and cursor.get('reverse'))
+        if queryset.query.order_by:
+            if cursor and 'offset' not in cursor:
+                raise NotFound(self.invalid_cursor_message)
+            self.offset = cursor['offset'] if cursor else 0
+            # Break ties on the primary key so pages are deterministic.
+            queryset = queryset.order_by(*queryset.query.order_by, self.pk_name)
+            return queryset[self.offset:self.offset + self.page_size + 1]
+        if cursor and 'offset' in cursor:
+            raise NotFound(self.invalid_cursor_message)
+
+        if cursor:
+            queryset = queryset.filter(self.seek_filter(cursor['value'], cursor['pk'], self.reverse))
+        return queryset.order_by(*self.get_ordering(self.reverse))[:self.page_size + 1]
+
+    def set_page(self, results):
+        """Trim the fetched rows to the page and work out the neighbouring links."""
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if self.offset is not None:
+            self.has_next = has_more
+            self.has_previous = self.offset > 0
+        elif self.reverse:
+            results.reverse()
+            self.has_next = self.cursor is not None
+            self.has_previous = has_more
+        else:
+            self.has_next = has_more
+            self.has_previous = self.cursor is not None
+        self.page = results
+        return results
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                size = int(request.query_params[self.page_size_query_param])
+                if size > 0:
+                    return min(size, self.max_page_size)
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_count(self, queryset):
+        if self.count_mode == 'exact':
+            return queryset.count()
+        if self.count_mode == 'estimate':
+            return estimate_count(queryset)
+        return None
+
+    def get_ordering(self, reverse=False):
+        name = self.ordering_field
+        if reverse:
+            return [F(name).asc(nulls_first=True), F(self.pk_name).asc()]
+        return [F(name).desc(nulls_last=True), F(self.pk_name).desc()]
+
+    def seek_filter(self, value, pk, reverse=False):
+        """Rows strictly after (or, when reversing, before) the cursor position."""
+        name, pk_name = self.ordering_field, self.pk_name
+        if not reverse:
+            if value is None:
+                return Q(**{f'{name}__isnull': True, f'{pk_name}__lt': pk})
+            # The redundant upper bound keeps the condition sargable for the index.
+            condition = Q(**{f'{name}__lte': value}) & (
+                Q(**{f'{name}__lt': value}) | Q(**{f'{pk_name}__lt': pk})
+            )
+            if self.field.null:
+                condition |= Q(**{f'{name}__isnull': True})
+            return condition
+
+        if value is None:
+            return Q(**{f'{name}__isnull': False}) | Q(**{f'{pk_name}__gt': pk})
+        return Q(**{f'{name}__gte': value}) & (
+            Q(**{f'{name}__gt': value}) | Q(**{f'{pk_name}__gt': pk})
+        )
+
+    def position_of(self, item):
+        if isinstance(item, dict):
+            return item[self.ordering_field], item[self.pk_name]
+        return getattr(item, self.ordering_field), getattr(item, self.pk_name)
+
+    def encode_cursor(self, item, reverse=False):
+        value, pk = self.position_of(item)
+        return self.encode_payload({
+            'v': value.isoformat() if hasattr(value, 'isoformat') else value,
+            'pk': force_str(pk),
+            'r': int(reverse),
+        })
+
+    def encode_payload(self, payload):
+        raw = json.dumps(payload, separators=(',', ':')).encode('ascii')
+        token = base64.urlsafe_b64encode(raw).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode('ascii')))
+            if 'o' in payload:
+                offset = int(payload['o'])
+                if offset < 0:
+                    raise ValueError(offset)
+                return {'offset': offset}
+            value = payload['v']
+            if value is not None:
+                value = self.field.to_python(value)
+            return {
+                'value': value,
+                'pk': self.pk_field.to_python(payload['pk']),
+                'reverse': bool(payload.get('r')),
+            }
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        if self.offset is not None:
+            return self.encode_payload({'o': self.offset + self.page_size})
+        return self.encode_cursor(self.page[-1])
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if self.offset is not None:
+            previous = self.offset - self.page_size
+            if previous <= 0:
+                return remove_query_param(self.base_url, self.cursor_query_param)
+            return self.encode_payload({'o': previous})
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('count', self.count),
+            ('count_type', self.count_mode),
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'nullable': True},
+                'count_type': {'type': 'string', 'nullable': True, 'enum': list(self.count_modes)},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                'name': self.cursor_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'The pagination cursor value.',
+                'schema': {'type': 'string'},
+            },
+            {
+                'name': self.page_size_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Number of results to return per page.',
+                'schema': {'type': 'integer'},
+            },
+            {
+                'name': self.count_query_param,
+                'required': False,
+                'in': 'query',
+                'description': 'Include a total: "exact" or "estimate".',
+                'schema': {'type': 'string', 'enum': list(self.count_modes)},
+            },
+        ]
+
+
+class AsyncPageNumberPagination(PageNumberPagination):
+    """``PageNumberPagination`` that can also page with the async ORM"""
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        paginator = self.django_paginator_class(queryset, page_size)
+        # Paginator.count is a cached_property; fill it so nothing counts synchronously.
+        paginator.count = await queryset.acount()
+        page_number = self.get_page_number(request, paginator)
+        try:
+            self.page = paginator.page(page_number)
+        except InvalidPage as exc:
+            raise NotFound(self.invalid_page_message.format(page_number=page_number, message=str(exc)))
+        self.page.object_list = [obj async for obj in self.page.object_list]
+        self.request = request
+        return list(self.page)
@@ -0,0 +1,323 @@
+# core/profiling.py
+"""
+Per-request SQL and timing instrumentation.
+
+``RequestProfilingMiddleware`` makes each request's ``RequestProfile``
+current; an execute wrapper installed on every database connection
+reports queries to it. Every request gets the cheap totals (query
+count and DB time, plus serializer time from ``section('serialize')``)
+and staff users see them in a ``Server-Timing`` header. A sampled
+fraction of requests also records each query's normalized fingerprint,
+duration and calling code location; those samples are aggregated per
+endpoint and per fingerprint in ``profile_store`` (in memory, per
+process) and served to admins by ``ProfilingView``. Queries slower than
+``SLOW_QUERY_MS`` are logged. Configuration lives in
+``settings.REQUEST_PROFILING``.
+"""
+import contextvars
+import heapq
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+
+import django
+import rest_framework
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    'PATH_PREFIXES': ('/api/',),
+    # Fraction of requests whose queries are fingerprinted and aggregated.
+    'SAMPLE_RATE': 0.05,
+    'SERVER_TIMING': True,
+    'SLOW_QUERY_MS': 200,
+    # Slowest queries kept per request and per endpoint.
+    'SLOWEST_QUERIES': 5,
+    # Fingerprints kept; the ones with the least total time are evicted first.
+    'MAX_FINGERPRINTS': 1000,
+}
+
+
+def profiling_settings():
+    return {**DEFAULTS, **getattr(settings, 'REQUEST_PROFILING', {})}
+
+
+# Fingerprints
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_LIST = re.compile(r'\((?:\s*(?:%s|\?)\s*,)+\s*(?:%s|\?)\s*\)')
+_SPACE = re.compile(r'\s+')
+
+
+@lru_cache(maxsize=4096)
+def fingerprint(sql):
+    """``sql`` with literals and parameter lists collapsed, so equivalent queries group."""
+    sql = _STRING.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _LIST.sub('(...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+# Frames from these are skipped when looking for the code that ran a query.
+_SKIP_PATHS = tuple(
+    os.path.dirname(module.__file__) + os.sep for module in (django, rest_framework, os)
+) + (__file__,)
+
+
+@lru_cache(maxsize=1024)
+def _is_own_code(filename):
+    return not filename.startswith(_SKIP_PATHS) and 'site-packages' not in filename
+
+
+def call_site():
+    """``path:line (function)`` of the innermost project frame on the stack"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if _is_own_code(code.co_filename):
+            path = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            return f'{path}:{frame.f_lineno} ({code.co_name})'
+        frame = frame.f_back
+    return 'unknown'
+
+
+# Per-request recording
+
+class RequestProfile:
+    def __init__(self, sampled, config):
+        self.sampled = sampled
+        self.slowest_count = config['SLOWEST_QUERIES']
+        self.slow_query_ms = config['SLOW_QUERY_MS']
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_ms = 0.0
+        self.sections = {}
+        self.serializer_depth = 0
+        # fingerprint: [count, total_ms, max_ms, call site]
+        self.fingerprints = {}
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += elapsed
+            if self.sampled or elapsed >= self.slow_query_ms:
+                self.record(sql, elapsed)
+
+    def record(self, sql, elapsed):
+        key = fingerprint(sql)
+        site = call_site()
+        if elapsed >= self.slow_query_ms:
+            logger.warning('Slow query (%.1f ms) at %s: %s', elapsed, site, key[:500])
+        entry = self.fingerprints.get(key)
+        if entry is None:
+            self.fingerprints[key] = [1, elapsed, elapsed, site]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+        item = (elapsed, key, site)
+        if len(self.slowest) < self.slowest_count:
+            heapq.heappush(self.slowest, item)
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, item)
+
+    def server_timing(self, total_ms):
+        parts = [f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"']
+        parts += [f'{name};dur={ms:.1f}' for name, ms in self.sections.items()]
+        parts.append(f'total;dur={total_ms:.1f}')
+        return ', '.join(parts)
+
+
+_current = contextvars.ContextVar('request_profile', default=None)
+
+
+@contextmanager
+def section(name):
+    """Add the time spent in the block to the current request's ``name`` timing."""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.sections[name] = profile.sections.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _execute(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    return profile(execute, sql, params, many, context)
+
+
+def install_execute_wrapper(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver. The wrapper stays on the connection and
+    reports to the profile in the current context, so queries run by the
+    async ORM in worker threads reach the request that awaited them.
+    """
+    if _execute not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_execute)
+
+
+@contextmanager
+def profiled(profile):
+    """Record queries run in this context (and threads it hands work to) into ``profile``."""
+    token = _current.set(profile)
+    try:
+        yield profile
+    finally:
+        _current.reset(token)
+
+
+def instrument_serializers():
+    """
+    Time top-level ``serializer.data`` calls as the ``serialize`` section.
+    ``Serializer.data`` and ``ListSerializer.data`` both build on
+    ``BaseSerializer.data``, so wrapping it covers every serializer.
+    """
+    from rest_framework.serializers import BaseSerializer
+
+    original = BaseSerializer.data.fget
+    if getattr(original, 'profiled', False):
+        return
+
+    def data(self):
+        profile = _current.get()
+        if profile is None or profile.serializer_depth:
+            return original(self)
+        profile.serializer_depth += 1
+        try:
+            with section('serialize'):
+                return original(self)
+        finally:
+            profile.serializer_depth -= 1
+
+    data.profiled = True
+    BaseSerializer.data = property(data)
+
+
+# Aggregation
+
+class ProfileStore:
+    """Sampled request profiles, aggregated per endpoint and per fingerprint."""
+
+    def __init__(self, max_fingerprints=DEFAULTS['MAX_FINGERPRINTS'], slowest=DEFAULTS['SLOWEST_QUERIES']):
+        self.max_fingerprints = max_fingerprints
+        self.slowest = slowest
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.since = timezone.now()
+            self.requests = 0
+            self.endpoints = {}
+            self.fingerprints = {}
+
+    def add(self, endpoint, profile, total_ms):
+        with self._lock:
+            self.requests += 1
+            stats = self.endpoints.get(endpoint)
+            if stats is None:
+                stats = self.endpoints[endpoint] = {
+                    'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'db_ms': 0.0, 'queries': 0,
+                    'sections': {}, 'slowest_queries': [],
+                }
+            stats['requests'] += 1
+            stats['total_ms'] += total_ms
+            stats['max_ms'] = max(stats['max_ms'], total_ms)
+            stats['db_ms'] += profile.db_ms
+            stats['queries'] += profile.queries
+            for name, ms in profile.sections.items():
+                stats['sections'][name] = stats['sections'].get(name, 0.0) + ms
+            stats['slowest_queries'] = heapq.nlargest(
+                self.slowest, stats['slowest_queries'] + profile.slowest,
+            )
+
+            for key, (count, ms, max_ms, site) in profile.fingerprints.items():
+                entry = self.fingerprints.get(key)
+                if entry is None:
+                    entry = self.fingerprints[key] = {
+                        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'call_sites': {}, 'endpoints': {},
+                    }
+                entry['count'] += count
+                entry['total_ms'] += ms
+                entry['max_ms'] = max(entry['max_ms'], max_ms)
+                entry['call_sites'][site] = entry['call_sites'].get(site, 0) + count
+                entry['endpoints'][endpoint] = entry['endpoints'].get(endpoint, 0) + count
+            if len(self.fingerprints) > self.max_fingerprints:
+                keep = heapq.nlargest(
+                    self.max_fingerprints, self.fingerprints.items(), key=lambda item: item[1]['total_ms'],
+                )
+                self.fingerprints = dict(keep)
+
+    def snapshot(self, limit=20):
+        """Top endpoints and fingerprints by total time, as plain data"""
+        with self._lock:
+            endpoints = heapq.nlargest(limit, self.endpoints.items(), key=lambda item: item[1]['total_ms'])
+            fingerprints = heapq.nlargest(limit, self.fingerprints.items(), key=lambda item: item[1]['total_ms'])
+            return {
+                'since': self.since,
+                'sampled_requests': self.requests,
+                'endpoints': [
+                    {
+                        'endpoint': endpoint,
+                        'requests': stats['requests'],
+                        'avg_ms': round(stats['total_ms'] / stats['requests'], 2),
+                        'max_ms': round(stats['max_ms'], 2),
+                        'avg_db_ms': round(stats['db_ms'] / stats['requests'], 2),
+                        'avg_queries': round(stats['queries'] / stats['requests'], 2),
+                        'avg_section_ms': {
+                            name: round(ms / stats['requests'], 2) for name, ms in stats['sections'].items()
+                        },
+                        'slowest_queries': [
+                            {'ms': round(ms, 2), 'fingerprint': key, 'call_site': site}
+                            for ms, key, site in stats['slowest_queries']
+                        ],
+                    }
+                    for endpoint, stats in endpoints
+                ],
+                'fingerprints': [
+                    {
+                        'fingerprint': key,
+                        'count': entry['count'],
+                        'total_ms': round(entry['total_ms'], 2),
+                        'avg_ms': round(entry['total_ms'] / entry['count'], 3),
+                        'max_ms': round(entry['max_ms'], 2),
+                        'call_sites': sorted(entry['call_sites'].items(), key=lambda item: -item[1])[:5],
+                        'endpoints': sorted(entry['endpoints'].items(), key=lambda item: -item[1])[:5],
+                    }
+                    for key, entry in fingerprints
+                ],
+            }
+
+
+_config = profiling_settings()
+profile_store = ProfileStore(_config['MAX_FINGERPRINTS'], _config['SLOWEST_QUERIES'])
+
+
+def should_profile(path, config):
+    return config['ENABLED'] and path.startswith(tuple(config['PATH_PREFIXES']))
+
+
+def sample(config):
+    return random.random() < config['SAMPLE_RATE']
@@ -0,0 +1,196 @@
+# core/refdata.py
+"""
+Process-local cache for small, rarely changing reference tables.
+
+Each registered model is loaded whole on first use and served from memory
+by id or by name. Every table has a version number in the Django cache,
+which ``settings.CACHES`` points at Redis so all workers share it. Saving
+or deleting a row bumps it (after commit) and each process compares its
+copy's version at most every ``CHECK_INTERVAL`` seconds, so steady-state
+lookups cost no queries and edits reach every worker within a few
+seconds. With a per-process cache backend only the editing worker would
+notice.
+
+Cached instances are shared between requests: assign them to foreign keys
+or read them, but do not modify them.
+"""
+import threading
+import time
+
+import django_filters
+from django_filters import fields as filter_fields
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import serializers
+
+CHECK_INTERVAL = 5
+
+_registry = {}
+
+
+class ReferenceTable:
+    def __init__(self, model, name_field='name', select_related=()):
+        self.model = model
+        self.name_field = name_field
+        self.select_related = select_related
+        self.version_key = f'refdata:version:{model._meta.label_lower}'
+        self._lock = threading.Lock()
+        self._rows = None      # (by_id, by_name)
+        self._version = None
+        self._checked_at = 0.0
+
+    def _shared_version(self):
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, 1, None)
+            version = cache.get(self.version_key, 1)
+        return version
+
+    def _load(self):
+        version = self._shared_version()
+        by_id, by_name = {}, {}
+        # From the primary: a lagging replica may not have the edit behind the bump yet.
+        rows = self.model._default_manager.using(DEFAULT_DB_ALIAS).select_related(*self.select_related)
+        for obj in rows:
+            by_id[obj.pk] = obj
+            by_name.setdefault(getattr(obj, self.name_field), []).append(obj)
+        self._rows, self._version = (by_id, by_name), version
+        self._checked_at = time.monotonic()
+
+    def _current(self):
+        rows, now = self._rows, time.monotonic()
+        if rows is None or now - self._checked_at > CHECK_INTERVAL:
+            with self._lock:
+                if self._rows is None:
+                    self._load()
+                elif now - self._checked_at > CHECK_INTERVAL:
+                    if self._shared_version() != self._version:
+                        self._load()
+                    else:
+                        self._checked_at = now
+                rows = self._rows
+        return rows
+
+    def all(self):
+        return list(self._current()[0].values())
+
+    def by_id(self, pk):
+        try:
+            pk = self.model._meta.pk.to_python(pk)
+        except ValidationError:
+            return None
+        return self._current()[0].get(pk)
+
+    def by_name(self, name, **attrs):
+        """The row called ``name``; ``attrs`` narrow down names that are not unique."""
+        for obj in self._current()[1].get(name, ()):
+            if all(getattr(obj, key) == value for key, value in attrs.items()):
+                return obj
+        return None
+
+    def version(self):
+        """Shared version number, changed by every edit to the table"""
+        return self._shared_version()
+
+    def invalidate(self):
+        """Drop this process's copy and, after commit, every other process's."""
+        with self._lock:
+            self._rows = None
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        try:
+            cache.incr(self.version_key)
+        except ValueError:
+            cache.set(self.version_key, 2, None)
+        with self._lock:
+            self._rows = None
+
+
+def register(model, name_field='name', select_related=()):
+    table = ReferenceTable(model, name_field, select_related)
+    _registry[model] = table
+    uid = f'refdata_{model._meta.label_lower}'
+    post_save.connect(_invalidate, sender=model, dispatch_uid=uid, weak=False)
+    post_delete.connect(_invalidate, sender=model, dispatch_uid=f'{uid}_delete', weak=False)
+    return table
+
+
+def _invalidate(sender, **kwargs):
+    _registry[sender].invalidate()
+
+
+def table(model):
+    return _registry[model]
+
+
+def by_id(model, pk):
+    return _registry[model].by_id(pk)
+
+
+def by_name(model, name, **attrs):
+    return _registry[model].by_name(name, **attrs)
+
+
+def all_rows(model):
+    return _registry[model].all()
+
+
+def versions(*models):
+    """Shared version numbers of several tables in one cache round trip"""
+    tables = [_registry[model] for model in models]
+    found = cache.get_many([table.version_key for table in tables])
+    return [found.get(table.version_key) or table.version() for table in tables]
+
+
+class ReferenceChoiceField(filter_fields.ModelChoiceField):
+    """``ModelChoiceField`` validated against the reference cache"""
+
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        obj = by_id(self.queryset.model, value)
+        if obj is None:
+            raise ValidationError(
+                self.error_messages['invalid_choice'],
+                code='invalid_choice',
+                params={'value': value},
+            )
+        return obj
+
+
+class ReferenceMultipleChoiceField(filter_fields.ModelMultipleChoiceField):
+    """``ModelMultipleChoiceField`` validated against the reference cache"""
+
+    def _check_values(self, value):
+        objects = []
+        for pk in value:
+            obj = by_id(self.queryset.model, pk)
+            if obj is None:
+                raise ValidationError(
+                    self.error_messages['invalid_choice'],
+                    code='invalid_choice',
+                    params={'value': pk},
+                )
+            objects.append(obj)
+        return objects
+
+
+class ReferenceRelatedField(serializers.PrimaryKeyRelatedField):
+    """``PrimaryKeyRelatedField`` resolved from the reference cache"""
+
+    def to_internal_value(self, data):
+        obj = by_id(self.get_queryset().model, data)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
+class ReferenceChoiceFilter(django_filters.ModelChoiceFilter):
+    field_class = ReferenceChoiceField
+
+
+class ReferenceMultipleChoiceFilter(django_filters.ModelMultipleChoiceFilter):
+    field_class = ReferenceMultipleChoiceField
@@ -0,0 +1,28 @@
+# core/renderers.py
+import ujson
+from rest_framework.renderers import JSONRenderer
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    ``JSONRenderer`` backed by ujson, for views whose data is already plain
+    (str, int, float, bool, None, list, dict). Anything else, such as
+    serializer output holding ``Decimal`` or ``datetime`` values, falls back
+    to DRF's encoder.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        renderer_context = renderer_context or {}
+        if self.get_indent(accepted_media_type, renderer_context) is None:
+            try:
+                ret = ujson.dumps(
+                    data, ensure_ascii=False, escape_forward_slashes=False, reject_bytes=True
+                )
+            except (TypeError, OverflowError):
+                pass
+            else:
+                # As JSONRenderer: keep the output safe to embed in JavaScript.
+                return ret.replace('\u2028', '\\u2028').replace('\u2029', '\\u2029').encode()
+        return super().render(data, accepted_media_type, renderer_context)
@@ -0,0 +1,213 @@
+# core/replicas.py
+"""
+Read replicas with read-your-writes stickiness.
+
+``ReplicaRouter`` sends reads to a healthy replica (a ``DATABASES`` alias
+streaming from ``default``) only while replica reads are enabled for the
+current context. ``ReplicaRoutingMiddleware`` enables them for safe
+(GET/HEAD/OPTIONS) requests, unless the client wrote within the last
+``STICKY_SECONDS``. Everything else stays on the primary: writes, reads
+inside a transaction, unsafe requests, and code outside requests
+(management commands, background flushers). Use ``replica_reads()`` for
+read-only jobs that can tolerate lag.
+
+After a successful unsafe request the client is pinned to the primary.
+This uses a cookie, plus a short cache entry keyed on the Authorization
+header for API clients that do not keep cookies. The entry must be visible
+to every worker, so it relies on the shared cache in ``settings.CACHES``;
+with a per-process backend, requests with an Authorization header always
+read from the primary. A landlord who has just created a listing
+therefore reads it back from the primary.
+
+A background thread checks each replica every ``HEALTH_CHECK_INTERVAL``
+seconds. Replicas that cannot be reached, or that lag the primary by more
+than ``MAX_LAG_SECONDS``, get no reads until a later check passes. If no
+replica is healthy, reads go to the primary. Configuration lives in
+``settings.DATABASE_REPLICATION``.
+"""
+import contextvars
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .background import PeriodicFlusher
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # DATABASES aliases replicating 'default'.
+    'REPLICAS': (),
+    # How long a client reads from the primary after a write.
+    'STICKY_SECONDS': 10,
+    'STICKY_COOKIE_NAME': 'hs_primary',
+    'HEALTH_CHECK_INTERVAL': 10,
+    'MAX_LAG_SECONDS': 5,
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Replication lag in seconds; 0 on a primary or a replica that has replayed
+# everything it received (replay timestamps stop moving when the primary is idle).
+LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+
+def replication_settings():
+    return {**DEFAULTS, **getattr(settings, 'DATABASE_REPLICATION', {})}
+
+
+class ReplicaPool:
+    """Per-process health state of the replicas"""
+
+    def __init__(self, config):
+        self.aliases = tuple(config['REPLICAS'])
+        self.max_lag = config['MAX_LAG_SECONDS']
+        self._lock = threading.Lock()
+        # Replicas are trusted until the first check says otherwise.
+        self.healthy = set(self.aliases)
+        self.status = {alias: {'healthy': True, 'lag_s': None, 'error': None, 'checked_at': None}
+                       for alias in self.aliases}
+        self.checker = PeriodicFlusher('replica-health', self.check_all, config['HEALTH_CHECK_INTERVAL'])
+        self._started = False
+
+    def choose(self):
+        """A healthy replica alias, or None when there is none"""
+        if not self.aliases:
+            return None
+        if not self._started:
+            self._started = True
+            self.checker.ensure_started()
+            self.checker.wake()
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return random.choice(tuple(healthy))
+
+    def check(self, alias):
+        """Check replica ``alias``; returns its lag in seconds, or None if it is unreachable."""
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(LAG_SQL)
+                lag = float(cursor.fetchone()[0])
+            error = None if lag <= self.max_lag else f'lagging {lag:.1f}s'
+        except DatabaseError as exc:
+            lag, error = None, str(exc).strip() or type(exc).__name__
+            connections[alias].close()
+        with self._lock:
+            was_healthy = alias in self.healthy
+            if error is None:
+                self.healthy = self.healthy | {alias}
+            else:
+                self.healthy = self.healthy - {alias}
+            self.status[alias] = {
+                'healthy': error is None, 'lag_s': lag, 'error': error, 'checked_at': time.time(),
+            }
+        if was_healthy and error is not None:
+            logger.warning('Replica %s taken out of rotation: %s', alias, error)
+        elif not was_healthy and error is None:
+            logger.info('Replica %s back in rotation', alias)
+        return lag
+
+    def check_all(self):
+        for alias in self.aliases:
+            self.check(alias)
+
+
+_config = replication_settings()
+replica_pool = ReplicaPool(_config)
+
+_replica_reads = contextvars.ContextVar('replica_reads', default=False)
+
+
+@contextmanager
+def replica_reads(enabled=True):
+    """Let reads in this context (and threads it hands work to) use replicas."""
+    token = _replica_reads.set(enabled)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return replica_pool.choose() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, or an instance read from a replica would be saved back to it.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *replica_pool.aliases}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in replica_pool.aliases:
+            return False
+        return None
+
+
+# Stickiness
+
+def reads_from_replicas(request, config):
+    """Whether ``request`` may read from replicas"""
+    return bool(replica_pool.aliases) and request.method in SAFE_METHODS and not is_sticky(request, config)
+
+
+def pins_to_primary(request, response):
+    """Whether ``response`` finishes a write after which the client must read its own data"""
+    return bool(replica_pool.aliases) and request.method not in SAFE_METHODS and response.status_code < 400
+
+
+def _sticky_key(request):
+    header = request.META.get('HTTP_AUTHORIZATION')
+    if not header:
+        return None
+    return 'replicas:sticky:' + hashlib.sha1(header.encode()).hexdigest()
+
+
+def _cache_is_shared():
+    return not isinstance(caches[DEFAULT_CACHE_ALIAS], (LocMemCache, DummyCache))
+
+
+def is_sticky(request, config):
+    """Whether the client wrote recently enough that it must read from the primary"""
+    try:
+        if float(request.COOKIES.get(config['STICKY_COOKIE_NAME'], 0)) > time.time():
+            return True
+    except ValueError:
+        pass
+    key = _sticky_key(request)
+    if key is None:
+        return False
+    # Another worker's pin would be invisible in a per-process cache.
+    return not _cache_is_shared() or cache.get(key) is not None
+
+
+def stick(request, response, config):
+    """Pin the client to the primary for ``STICKY_SECONDS``."""
+    seconds = config['STICKY_SECONDS']
+    response.set_cookie(
+        config['STICKY_COOKIE_NAME'], f'{time.time() + seconds:.0f}', max_age=seconds,
+        httponly=True, samesite='Lax', secure=request.is_secure(),
+    )
+    key = _sticky_key(request)
+    if key is not None:
+        cache.set(key, 1, seconds)
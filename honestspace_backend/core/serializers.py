@@ -1,5 +1,6 @@
 # core/serializers.py
 from rest_framework import serializers
+from properties.market import neighborhood_stats
 from .models import Country, County, City, Neighborhood
 
 class CountrySerializer(serializers.ModelSerializer):
@@ -32,4 +33,14 @@ class NeighborhoodSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'city', 'city_name', 'county_name', 'country_name',
             'average_rent_range', 'safety_rating'
-        ]
\ No newline at end of file
+        ]
+
+class NeighborhoodWithStatsSerializer(NeighborhoodSerializer):
+    """Neighborhood with its market statistics (prefetch ``market_stats``)"""
+    market_stats = serializers.SerializerMethodField()
+    
+    class Meta(NeighborhoodSerializer.Meta):
+        fields = NeighborhoodSerializer.Meta.fields + ['market_stats']
+    
+    def get_market_stats(self, obj):
+        return neighborhood_stats(obj.pk, rows=obj.market_stats.all())
@@ -0,0 +1,158 @@
+# core/system_settings.py
+"""
+In-memory registry of typed ``SystemSetting`` values.
+
+Keys are declared in code with a type, a default and an optional
+validator::
+
+    TYPO_CORRECTION = system_settings.declare('search.typo_correction', True, 'boolean')
+    ...
+    if system_settings.get(TYPO_CORRECTION):
+
+All active rows are loaded and parsed once per process. Saving or deleting
+a row bumps a version number in the shared cache (after commit); each
+process checks it every few seconds and also reloads unconditionally after
+``SYSTEM_SETTINGS_TTL`` seconds, so changes propagate even with a
+per-process cache backend. Rows that fail to parse or validate fall back to
+the declared default.
+"""
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'system-settings:version'
+CHECK_INTERVAL = 5
+
+_MISSING = object()
+
+_PYTHON_TYPES = {
+    'string': str,
+    'integer': int,
+    'float': (int, float),
+    'boolean': bool,
+    'json': object,
+}
+
+
+class Declaration:
+    def __init__(self, key, default, data_type, validator, description):
+        self.key = key
+        self.default = default
+        self.data_type = data_type
+        self.validator = validator
+        self.description = description
+
+    def validate(self, value):
+        if not isinstance(value, _PYTHON_TYPES[self.data_type]):
+            raise ValidationError(f'{self.key} must be of type {self.data_type}')
+        if self.validator is not None:
+            self.validator(value)
+
+
+class SystemSettingsRegistry:
+    def __init__(self):
+        self._declarations = {}
+        self._lock = threading.Lock()
+        self._values = None
+        self._version = None
+        self._loaded_at = 0.0
+        self._checked_at = 0.0
+
+    def declare(self, key, default, data_type='string', validator=None, description=''):
+        """Register ``key`` with its type, default and validator; returns ``key``."""
+        declaration = Declaration(key, default, data_type, validator, description)
+        declaration.validate(default)
+        self._declarations[key] = declaration
+        return key
+
+    @property
+    def declarations(self):
+        return dict(self._declarations)
+
+    def get(self, key, default=_MISSING):
+        values = self._current()
+        if key in values:
+            return values[key]
+        if key in self._declarations:
+            return self._declarations[key].default
+        if default is not _MISSING:
+            return default
+        raise KeyError(key)
+
+    def __getitem__(self, key):
+        return self.get(key)
+
+    def parse(self, setting):
+        """Typed value of a ``SystemSetting`` row, checked against its declaration."""
+        try:
+            value = setting.get_typed_value()
+        except (TypeError, ValueError) as exc:
+            raise ValidationError(f'{setting.key}: {exc}')
+        declaration = self._declarations.get(setting.key)
+        if declaration is not None:
+            if declaration.data_type != setting.data_type:
+                raise ValidationError(
+                    f'{setting.key} is declared as {declaration.data_type}, not {setting.data_type}'
+                )
+            declaration.validate(value)
+        return value
+
+    def _load(self):
+        from .models import SystemSetting
+
+        version = self._shared_version()
+        values = {}
+        for setting in SystemSetting.objects.filter(is_active=True):
+            try:
+                values[setting.key] = self.parse(setting)
+            except ValidationError as exc:
+                logger.warning('Ignoring system setting %s: %s', setting.key, exc)
+        now = time.monotonic()
+        self._values, self._version = values, version
+        self._loaded_at = self._checked_at = now
+
+    def _current(self):
+        values, now = self._values, time.monotonic()
+        ttl = getattr(settings, 'SYSTEM_SETTINGS_TTL', 60)
+        if values is None or now - self._checked_at > CHECK_INTERVAL:
+            with self._lock:
+                if self._values is None or now - self._loaded_at > ttl:
+                    self._load()
+                elif now - self._checked_at > CHECK_INTERVAL:
+                    if self._shared_version() != self._version:
+                        self._load()
+                    else:
+                        self._checked_at = now
+                values = self._values
+        return values
+
+    @staticmethod
+    def _shared_version():
+        version = cache.get(VERSION_KEY)
+        if version is None:
+            cache.add(VERSION_KEY, 1, None)
+            version = cache.get(VERSION_KEY, 1)
+        return version
+
+    def invalidate(self):
+        with self._lock:
+            self._values = None
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.set(VERSION_KEY, 2, None)
+        with self._lock:
+            self._values = None
+
+
+system_settings = SystemSettingsRegistry()
@@ -1,3 +1,239 @@
-from django.test import TestCase
+import queue
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.db import OperationalError, connections
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from accounts.models import User, UserType
+from . import refdata, replicas
+from .middleware import ReplicaRoutingMiddleware
+from .models import APIUsageLog, Country, MediaType, SystemSetting
+from .profiling import fingerprint, profile_store
+from .replicas import ReplicaPool, ReplicaRouter, replica_reads
+from .system_settings import SystemSettingsRegistry
+from .usage import DEFAULTS, UsageLogWriter, client_ip, usage_log_writer
+
+
+def make_log(**overrides):
+    fields = {
+        'endpoint': '/api/core/neighborhoods/', 'method': 'GET', 'ip_address': '127.0.0.1',
+        'response_status': 200, 'response_time_ms': 3,
+    }
+    fields.update(overrides)
+    return APIUsageLog(**fields)
+
+
+class UsageLogWriterTests(TestCase):
+    """Queued API usage records are written in batches"""
+
+    def make_writer(self, **config):
+        writer = UsageLogWriter({**DEFAULTS, **config})
+        writer.flusher.ensure_started = lambda: None
+        return writer
+
+    def test_flush_writes_in_batches(self):
+        writer = self.make_writer(BATCH_SIZE=2)
+        for _ in range(5):
+            writer.enqueue(make_log())
+
+        with self.assertNumQueries(3):
+            self.assertEqual(writer.flush(), 5)
+        self.assertEqual(APIUsageLog.objects.count(), 5)
+
+    def test_full_queue_drops_and_counts(self):
+        writer = self.make_writer(MAX_QUEUE=2)
+        for _ in range(3):
+            writer.enqueue(make_log())
+        self.assertEqual(writer.stats()['dropped'], 1)
+        self.assertEqual(writer.flush(), 2)
+
+    def test_sampling_per_endpoint(self):
+        writer = self.make_writer(SAMPLE_RATES={'/api/properties/': 0, '/api/properties/facets/': 1})
+        self.assertFalse(writer.should_log('/api/properties/'))
+        self.assertTrue(writer.should_log('/api/properties/facets/'))
+        self.assertTrue(writer.should_log('/api/core/neighborhoods/'))
+        self.assertFalse(writer.should_log('/admin/'))
+
+    def test_middleware_queues_instead_of_inserting(self):
+        with mock.patch.object(usage_log_writer.flusher, 'ensure_started'), \
+                mock.patch.object(usage_log_writer, 'queue', queue.Queue()):
+            response = self.client.get('/api/core/neighborhoods/')
+            self.assertFalse(APIUsageLog.objects.exists())
+            usage_log_writer.flush()
+
+        log = APIUsageLog.objects.get()
+        self.assertEqual(log.endpoint, '/api/core/neighborhoods/')
+        self.assertEqual(log.response_status, response.status_code)
+
+    def test_client_ip_only_trusts_forwarded_for_from_proxies(self):
+        factory = RequestFactory()
+        spoofed = factory.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4', REMOTE_ADDR='10.0.0.5')
+        self.assertEqual(client_ip(spoofed), '10.0.0.5')
+        with override_settings(TRUSTED_PROXIES=['10.0.0.0/8']):
+            self.assertEqual(client_ip(spoofed), '1.2.3.4')
+            chained = factory.get('/', HTTP_X_FORWARDED_FOR='1.2.3.4, 5.6.7.8, 10.0.0.9', REMOTE_ADDR='10.0.0.5')
+            self.assertEqual(client_ip(chained), '5.6.7.8')
+            garbage = factory.get('/', HTTP_X_FORWARDED_FOR='foo', REMOTE_ADDR='10.0.0.5')
+            self.assertEqual(client_ip(garbage), '10.0.0.5')
+
+
+class ReferenceDataCacheTests(TestCase):
+    """Reference rows are served from memory and refreshed on save"""
+
+    def setUp(self):
+        self.image = MediaType.objects.create(name='image', max_file_size_mb=10, allowed_formats=['jpg'])
+
+    def test_steady_state_lookups_are_free(self):
+        refdata.by_id(MediaType, self.image.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(refdata.by_id(MediaType, str(self.image.pk)), self.image)
+            self.assertEqual(refdata.by_name(MediaType, 'image'), self.image)
+            self.assertIsNone(refdata.by_id(MediaType, 'not-an-id'))
+            self.assertIsNone(refdata.by_name(MediaType, 'video'))
+
+    def test_save_invalidates(self):
+        self.assertIsNone(refdata.by_name(Country, 'Kenya'))
+        with self.captureOnCommitCallbacks(execute=True):
+            kenya = Country.objects.create(
+                name='Kenya', code='KEN', currency_code='KES', phone_prefix='+254'
+            )
+        self.assertEqual(refdata.by_name(Country, 'Kenya'), kenya)
+
+
+class SystemSettingsRegistryTests(TestCase):
+    """Typed settings are parsed once, validated and refreshed on change"""
+
+    def setUp(self):
+        self.registry = SystemSettingsRegistry()
+        self.registry.declare('listing.max_photos', 20, 'integer', self.positive)
+
+    @staticmethod
+    def positive(value):
+        if value <= 0:
+            raise ValidationError('must be positive')
+
+    def test_defaults_and_typed_values(self):
+        SystemSetting.objects.create(key='feature.chat', value='{"beta": true}', data_type='json')
+        self.assertEqual(self.registry.get('listing.max_photos'), 20)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.registry['feature.chat'], {'beta': True})
+            self.assertIsNone(self.registry.get('unknown', None))
+        with self.assertRaises(KeyError):
+            self.registry['unknown']
+
+    def test_invalid_rows_fall_back_to_default(self):
+        setting = SystemSetting(key='listing.max_photos', value='-1', data_type='integer')
+        with self.assertRaises(ValidationError):
+            self.registry.parse(setting)
+        setting.save()
+        self.assertEqual(self.registry.get('listing.max_photos'), 20)
+
+    def test_invalidate_reloads(self):
+        self.assertEqual(self.registry.get('listing.max_photos'), 20)
+        SystemSetting.objects.create(key='listing.max_photos', value='30', data_type='integer')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.registry.invalidate()
+        self.assertEqual(self.registry.get('listing.max_photos'), 30)
+
+
+@override_settings(REQUEST_PROFILING={'SAMPLE_RATE': 1.0})
+class RequestProfilingTests(TestCase):
+    """Requests are timed, fingerprinted and aggregated per endpoint"""
+
+    def setUp(self):
+        profile_store.reset()
+        admin_type, _ = UserType.objects.get_or_create(type_name='admin')
+        self.staff = User.objects.create_user(
+            username='staff', email='staff@example.com', password='pass12345',
+            first_name='Sam', last_name='Staff', user_type=admin_type, is_staff=True,
+        )
+        Country.objects.create(name='Kenya', code='KEN', currency_code='KES', phone_prefix='+254')
+
+    def test_fingerprint_collapses_literals_and_lists(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s) AND name = 'x' LIMIT 21"),
+            'SELECT * FROM t WHERE id IN (...) AND name = ? LIMIT ?',
+        )
+
+    def test_server_timing_for_staff_and_admin_report(self):
+        client = Client()
+        anonymous = client.get('/api/core/neighborhoods/')
+        self.assertNotIn('Server-Timing', anonymous)
+
+        client.force_login(self.staff)
+        response = client.get('/api/core/neighborhoods/')
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", .*total;dur=')
+        self.assertIn('serialize;dur=', response['Server-Timing'])
+
+        report = client.get('/api/core/profiling/').json()
+        endpoints = {row['endpoint']: row for row in report['endpoints']}
+        self.assertEqual(endpoints['GET /api/core/neighborhoods/']['requests'], 2)
+        self.assertTrue(report['fingerprints'])
+        self.assertTrue(all(row['call_sites'] for row in report['fingerprints']))
+
+        self.assertEqual(client.delete('/api/core/profiling/').status_code, 204)
+        self.assertEqual(Client().get('/api/core/profiling/').status_code, 401)
+
+
+class ReplicaRoutingTests(TestCase):
+    """Safe requests read from healthy replicas; writers stick to the primary"""
+
+    def make_pool(self):
+        pool = ReplicaPool({**replicas.DEFAULTS, 'REPLICAS': ['replica']})
+        pool._started = True
+        return pool
+
+    def test_reads_use_replicas_only_when_enabled_and_outside_transactions(self):
+        router = ReplicaRouter()
+        with mock.patch.object(replicas, 'replica_pool', self.make_pool()):
+            self.assertEqual(router.db_for_read(Country), 'default')
+            with replica_reads():
+                # Test cases run inside a transaction, which keeps reads on the primary.
+                self.assertEqual(router.db_for_read(Country), 'default')
+                with mock.patch.object(connections['default'], 'in_atomic_block', False):
+                    self.assertEqual(router.db_for_read(Country), 'replica')
+                    self.assertEqual(router.db_for_write(Country), 'default')
+
+    def test_reference_cache_fills_from_the_primary(self):
+        image = MediaType.objects.create(name='image', max_file_size_mb=10, allowed_formats=['jpg'])
+        refdata.table(MediaType).invalidate()
+        with mock.patch.object(replicas, 'replica_pool', self.make_pool()), replica_reads(), \
+                mock.patch.object(connections['default'], 'in_atomic_block', False):
+            # Queries to 'replica' are not allowed in this test case.
+            self.assertEqual(refdata.by_id(MediaType, image.pk), image)
+
+    def test_unreachable_replica_leaves_rotation(self):
+        pool = self.make_pool()
+        with mock.patch.object(connections['replica'], 'cursor', side_effect=OperationalError('down')):
+            self.assertIsNone(pool.check('replica'))
+        self.assertIsNone(pool.choose())
+        self.assertEqual(pool.status['replica']['error'], 'down')
+
+    def test_writes_pin_the_client_to_the_primary(self):
+        seen = []
+
+        def view(request):
+            seen.append(replicas._replica_reads.get())
+            return HttpResponse(status=201 if request.method == 'POST' else 200)
+
+        factory = RequestFactory()
+        with mock.patch.object(replicas, 'replica_pool', self.make_pool()):
+            middleware = ReplicaRoutingMiddleware(view)
+            middleware(factory.get('/api/properties/'))
+            response = middleware(factory.post('/api/properties/', HTTP_AUTHORIZATION='Bearer writer'))
+            with_cookie = factory.get('/api/properties/')
+            with_cookie.COOKIES['hs_primary'] = response.cookies['hs_primary'].value
+            middleware(with_cookie)
+            middleware(factory.get('/api/properties/', HTTP_AUTHORIZATION='Bearer writer'))
+            middleware(factory.get('/api/properties/', HTTP_AUTHORIZATION='Bearer reader'))
+
+        self.assertEqual(seen, [True, False, False, False, True])
+
+    @override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_token_clients_stay_on_the_primary_without_a_shared_cache(self):
+        config = replicas.replication_settings()
+        request = RequestFactory().get('/api/properties/', HTTP_AUTHORIZATION='Bearer reader')
+        self.assertTrue(replicas.is_sticky(request, config))
+        self.assertFalse(replicas.is_sticky(RequestFactory().get('/api/properties/'), config))
@@ -1,7 +1,9 @@
 from django.urls import path
 from . import views
-from .views import NeighborhoodListView
+from .views import NeighborhoodListView, NeighborhoodStatsView, ProfilingView
 urlpatterns = [
     path('amenities/', views.AmenitiesView.as_view(), name='amenities'),
     path('neighborhoods/', NeighborhoodListView.as_view(), name='neighborhood-list'),
+    path('neighborhoods/<int:pk>/stats/', NeighborhoodStatsView.as_view(), name='neighborhood-stats'),
+    path('profiling/', ProfilingView.as_view(), name='request-profiling'),
 ]
@@ -0,0 +1,140 @@
+# core/usage.py
+"""
+Asynchronous, batched writer for ``APIUsageLog``.
+
+Requests only build an unsaved ``APIUsageLog`` and put it on a bounded
+in-process queue; a background thread drains the queue with
+``bulk_create`` in batches. When the queue is full new records are
+dropped and counted rather than slowing requests down. Configuration
+lives in ``settings.API_USAGE_LOG``.
+"""
+import ipaddress
+import logging
+import queue
+import random
+
+from django.conf import settings
+
+from .background import PeriodicFlusher
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': True,
+    # Only paths under these prefixes are logged.
+    'PATH_PREFIXES': ('/api/',),
+    # Fraction of requests logged; SAMPLE_RATES overrides it per path
+    # prefix (the longest matching prefix wins).
+    'SAMPLE_RATE': 1.0,
+    'SAMPLE_RATES': {},
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,
+    'MAX_QUEUE': 10000,
+}
+
+
+def usage_log_settings():
+    return {**DEFAULTS, **getattr(settings, 'API_USAGE_LOG', {})}
+
+
+def _ip(value):
+    try:
+        return ipaddress.ip_address(value.strip())
+    except ValueError:
+        return None
+
+
+def _trusted(address, proxies):
+    return any(address in network for network in proxies)
+
+
+def client_ip(request):
+    """
+    The client's address, or '' when none is valid. ``X-Forwarded-For`` is
+    only read when the peer is in ``settings.TRUSTED_PROXIES`` (addresses
+    or networks); it is then walked from the right, past trusted proxies.
+    """
+    address = _ip(request.META.get('REMOTE_ADDR', ''))
+    if address is None:
+        return ''
+    proxies = [ipaddress.ip_network(proxy, strict=False) for proxy in getattr(settings, 'TRUSTED_PROXIES', ())]
+    if not _trusted(address, proxies):
+        return str(address)
+    for value in reversed(request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')):
+        forwarded = _ip(value)
+        if forwarded is None:
+            break
+        address = forwarded
+        if not _trusted(address, proxies):
+            break
+    return str(address)
+
+
+class UsageLogWriter:
+    def __init__(self, config=None):
+        self.config = config or usage_log_settings()
+        self.queue = queue.Queue(maxsize=self.config['MAX_QUEUE'])
+        self.dropped = 0
+        self.failed = 0
+        self.written = 0
+        self.flusher = PeriodicFlusher('api-usage-log', self.flush, self.config['FLUSH_INTERVAL'])
+        self._rates = sorted(
+            self.config['SAMPLE_RATES'].items(), key=lambda item: len(item[0]), reverse=True
+        )
+
+    def should_log(self, path):
+        if not self.config['ENABLED']:
+            return False
+        if not path.startswith(tuple(self.config['PATH_PREFIXES'])):
+            return False
+        rate = self.config['SAMPLE_RATE']
+        for prefix, prefix_rate in self._rates:
+            if path.startswith(prefix):
+                rate = prefix_rate
+                break
+        return rate >= 1 or random.random() < rate
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            return
+        self.flusher.ensure_started()
+        if self.queue.qsize() >= self.config['BATCH_SIZE']:
+            self.flusher.wake()
+
+    def flush(self):
+        """Drain the queue in ``BATCH_SIZE`` chunks. Returns the number written."""
+        from .models import APIUsageLog
+
+        written = 0
+        while True:
+            batch = []
+            while len(batch) < self.config['BATCH_SIZE']:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return written
+            try:
+                APIUsageLog.objects.bulk_create(batch)
+            except Exception:
+                # Usage logs are best effort; a failed batch is counted, not retried.
+                self.failed += len(batch)
+                logger.exception('Dropped %d API usage log records', len(batch))
+                continue
+            written += len(batch)
+            self.written += len(batch)
+
+    def stats(self):
+        return {
+            'queued': self.queue.qsize(),
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+        }
+
+
+usage_log_writer = UsageLogWriter()
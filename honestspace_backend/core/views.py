@@ -1,17 +1,87 @@
 from django.shortcuts import render
+from rest_framework.exceptions import NotFound
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import generics
-from core.models import Neighborhood
-from core.serializers import NeighborhoodSerializer
+from django.db.models import Count, Max
+from rest_framework import generics, permissions
+from core import refdata
+from core.conditional import ConditionalGetMixin
+from core.models import City, Country, County, Neighborhood
+from core.profiling import profile_store
+from core.serializers import NeighborhoodSerializer, NeighborhoodWithStatsSerializer
+from properties.market import cached_neighborhood_stats
+from properties.models import NeighborhoodMarketStats
 
-class NeighborhoodListView(generics.ListAPIView):
-    queryset = Neighborhood.objects.all()
-    serializer_class = NeighborhoodSerializer
 class AmenitiesView(APIView):
     def get(self, request):
         return Response({"message": "Amenities endpoint"})
 
-class NeighborhoodListView(generics.ListAPIView):
-    queryset = Neighborhood.objects.all()
-    serializer_class = NeighborhoodSerializer
\ No newline at end of file
+def market_stats_validators(queryset):
+    totals = queryset.aggregate(count=Count('pk'), computed=Max('computed_at'))
+    return sorted(totals.items()), totals['computed']
+
+async def amarket_stats_validators(queryset):
+    totals = await queryset.aaggregate(count=Count('pk'), computed=Max('computed_at'))
+    return sorted(totals.items()), totals['computed']
+
+class NeighborhoodListView(ConditionalGetMixin, generics.ListAPIView):
+    """Neighborhoods; ``?include=stats`` embeds market statistics"""
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    queryset = Neighborhood.objects.select_related('city__county__country')
+    serializer_class = NeighborhoodSerializer
+
+    def get_validators(self, request, *args, **kwargs):
+        parts, last_modified = [refdata.versions(Neighborhood, City, County, Country)], None
+        if self.include_stats():
+            stats, last_modified = market_stats_validators(NeighborhoodMarketStats.objects.all())
+            parts.append(stats)
+        return parts, last_modified
+
+    def include_stats(self):
+        return 'stats' in self.request.query_params.get('include', '').split(',')
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.include_stats():
+            queryset = queryset.prefetch_related('market_stats')
+        return queryset
+
+    def get_serializer_class(self):
+        if self.include_stats():
+            return NeighborhoodWithStatsSerializer
+        return NeighborhoodSerializer
+
+class NeighborhoodStatsView(ConditionalGetMixin, APIView):
+    """Market statistics for one neighborhood, cached until its listings change"""
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+
+    def get_validators(self, request, pk):
+        if refdata.by_id(Neighborhood, pk) is None:
+            return None
+        return market_stats_validators(NeighborhoodMarketStats.objects.filter(neighborhood_id=pk))
+
+    def get(self, request, pk):
+        return self.conditional_response(request, self.stats, pk=pk)
+
+    def stats(self, request, pk):
+        if refdata.by_id(Neighborhood, pk) is None:
+            raise NotFound()
+        return Response(cached_neighborhood_stats(pk))
+
+class ProfilingView(APIView):
+    """
+    Top endpoints and SQL fingerprints from sampled requests in this
+    process (``core.profiling``); DELETE clears them.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        try:
+            limit = min(max(int(request.query_params.get('limit', 20)), 1), 200)
+        except ValueError:
+            limit = 20
+        return Response(profile_store.snapshot(limit))
+
+    def delete(self, request):
+        profile_store.reset()
+        return Response(status=204)
@@ -3,6 +3,15 @@ ASGI config for honestspace project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Under ASGI the async read endpoints (``/api/async/...``) serve many
+concurrent connections per worker, e.g.:
+
+    gunicorn honestspace.asgi:application -k uvicorn.workers.UvicornWorker -w 4
+
+Sync DRF views still work there, each on a thread. The
+``bench_concurrency`` command compares a deployment like this one with
+the WSGI one.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -27,6 +27,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # For GIS support
+    'django.contrib.postgres',  # Full-text and trigram search
     'phonenumber_field',  # For phone number fields
 
     # JWT blacklist support
@@ -35,6 +36,7 @@ INSTALLED_APPS = [
     # Third party apps
     'rest_framework',
     'corsheaders',
+    'django_filters',
     
     # Local apps
     'accounts',
@@ -44,6 +46,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.RequestProfilingMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -51,6 +55,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.middleware.APIUsageLogMiddleware',
 ]
 
 ROOT_URLCONF = 'honestspace.urls'
@@ -82,7 +87,46 @@ DATABASES = {
         'PASSWORD': 'honestspace123',
         'HOST': 'localhost',
         'PORT': '5432',
-    }
+        # Persistent connections, checked before reuse after each request.
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+    },
+    # Read replica of 'default'. Locally this is a second alias of the same
+    # database; in production point HOST at the streaming replica.
+    'replica': {
+        'ENGINE': 'django.contrib.gis.db.backends.postgis',
+        'NAME': 'honestspace_db',
+        'USER': 'honestspace',
+        'PASSWORD': 'honestspace123',
+        'HOST': 'localhost',
+        'PORT': '5432',
+        'CONN_MAX_AGE': 60,
+        'CONN_HEALTH_CHECKS': True,
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+DATABASE_ROUTERS = ['core.replicas.ReplicaRouter']
+# Read replicas (core.replicas): safe requests read from a healthy replica
+# unless the client wrote within STICKY_SECONDS; everything else uses 'default'.
+DATABASE_REPLICATION = {
+    'REPLICAS': ['replica'],
+    'STICKY_SECONDS': 10,
+    'HEALTH_CHECK_INTERVAL': 10,
+    'MAX_LAG_SECONDS': 5,
+}
+
+# Cache shared by every worker and process. Reference table versions
+# (core.refdata), read-your-writes pins (core.replicas) and unique-view
+# dedupe (properties.analytics) rely on it being shared, so do not switch
+# to a per-process backend such as LocMemCache.
+CACHES = {
+    'default': {
+        'BACKEND': 'django_redis.cache.RedisCache',
+        'LOCATION': 'redis://127.0.0.1:6379/1',
+        'OPTIONS': {
+            'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+        },
+    },
 }
 
 # Custom user model
@@ -134,6 +178,34 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
 }
+# Reverse proxies (addresses or networks) whose X-Forwarded-For is trusted
+# when working out client IPs (core.usage.client_ip)
+TRUSTED_PROXIES = []
+# API usage logging (core.usage): sampled, queued and written in batches
+API_USAGE_LOG = {
+    'SAMPLE_RATE': 1.0,
+    'SAMPLE_RATES': {},  # e.g. {'/api/properties/': 0.25}
+    'BATCH_SIZE': 500,
+    'FLUSH_INTERVAL': 5,  # seconds
+    'MAX_QUEUE': 10000,  # records beyond this are dropped and counted
+}
+# Per-request SQL and timing instrumentation (core.profiling). Staff get a
+# Server-Timing header; SAMPLE_RATE of requests feed /api/core/profiling/.
+REQUEST_PROFILING = {
+    'SAMPLE_RATE': 0.05,
+    'SLOW_QUERY_MS': 200,
+}
+# Property media renditions (properties.media). Set PROPERTY_MEDIA_BACKGROUND
+# to False when `manage.py process_media --watch` runs as its own service.
+PROPERTY_MEDIA_BACKGROUND = True
+PROPERTY_MEDIA_WORKERS = None  # process pool size; defaults to min(CPUs, 4)
+# Resumable media uploads (properties.uploads). MEDIA_UPLOAD_DIR must be shared
+# by all app servers; it defaults to a directory under the system temp dir.
+MEDIA_UPLOAD_MAX_CHUNK_BYTES = 8 * 1024 * 1024
+MEDIA_UPLOAD_SESSION_HOURS = 24
+# Seconds shared caches may keep anonymous listing and neighborhood reads
+# (core.conditional); authenticated reads are private and always revalidated.
+HTTP_CACHE_MAX_AGE = 60
 # JWT settings
 from datetime import timedelta
 
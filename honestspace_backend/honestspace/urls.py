@@ -33,4 +33,7 @@ urlpatterns = [
     # Other apps
     path('api/core/', include('core.urls')),
     path('api/properties/', include('properties.urls')),
+    # Async read endpoints, for ASGI deployments
+    path('api/async/core/', include('core.async_urls')),
+    path('api/async/properties/', include('properties.async_urls')),
 ]
@@ -1,8 +1,15 @@
 from django.contrib import admin
 from .models import Property
+from .search import search_properties
 
 @admin.register(Property)
 class PropertyAdmin(admin.ModelAdmin):
     list_display = ('title', 'landlord', 'rent_amount', 'is_verified', 'created_at')
     list_filter = ('is_verified', 'created_at')
     search_fields = ('title', 'description')
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the GIN-indexed search vector instead of ILIKE scans on description.
+        if not search_term:
+            return queryset, False
+        return search_properties(queryset, search_term), False
@@ -0,0 +1,172 @@
+# properties/analytics.py
+"""
+Buffered view, inquiry and love counters.
+
+Events are added to a per-process buffer keyed by ``(property, day)`` and
+written periodically: one ``INSERT ... ON CONFLICT DO UPDATE`` adds the
+day's deltas to ``property_analytics`` and one ``UPDATE ... FROM (VALUES
+...)`` adds them to the denormalised counters on ``properties``. A busy
+listing therefore costs one row update per flush instead of one per page
+view, and never holds its row lock on the request path. The weekly and
+monthly rollups of the days written are refreshed in the same transaction
+(see ``properties.rollups``).
+
+Unique views are deduplicated per visitor and day, first in the worker's
+own memory and then across workers with ``cache.add`` on the shared Redis
+cache (``settings.CACHES``). A per-process cache backend would count a
+visitor once per worker that served them.
+"""
+import hashlib
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from core.background import PeriodicFlusher
+from core.usage import client_ip
+from .rollups import refresh_rollups
+
+FLUSH_INTERVAL = getattr(settings, 'PROPERTY_COUNTER_FLUSH_INTERVAL', 10)
+# Flush early once this many (property, day) rows are pending.
+MAX_PENDING_ROWS = getattr(settings, 'PROPERTY_COUNTER_MAX_PENDING', 5000)
+# Local unique-view keys remembered before falling back to the cache only.
+MAX_SEEN_VISITORS = 100000
+UNIQUE_VIEW_TTL = 60 * 60 * 25
+
+_ANALYTICS_SQL = """
+INSERT INTO property_analytics AS pa (
+    property_id, date, views, unique_views, inquiries, loves, shares,
+    view_to_inquiry_rate, inquiry_to_viewing_rate, search_appearances,
+    search_clicks, search_ctr, social_shares, social_clicks, created_at
+)
+SELECT d.property_id::uuid, d.date::date, d.views, d.unique_views, d.inquiries, d.loves, 0,
+       COALESCE(LEAST(9.9999, ROUND(d.inquiries::numeric / NULLIF(d.views, 0), 4)), 0),
+       0, 0, 0, 0, 0, 0, NOW()
+FROM (VALUES {rows}) AS d(property_id, date, views, unique_views, inquiries, loves)
+WHERE EXISTS (SELECT 1 FROM properties p WHERE p.id = d.property_id::uuid)
+ON CONFLICT (property_id, date) DO UPDATE SET
+    views = pa.views + EXCLUDED.views,
+    unique_views = pa.unique_views + EXCLUDED.unique_views,
+    inquiries = pa.inquiries + EXCLUDED.inquiries,
+    loves = pa.loves + EXCLUDED.loves,
+    view_to_inquiry_rate = COALESCE(LEAST(
+        9.9999,
+        ROUND((pa.inquiries + EXCLUDED.inquiries)::numeric
+              / NULLIF(pa.views + EXCLUDED.views, 0), 4)
+    ), 0)
+"""
+
+# Deliberately leaves updated_at alone: a page view is not an edit.
+_PROPERTY_COUNTERS_SQL = """
+UPDATE properties p SET
+    view_count = p.view_count + d.views,
+    inquiry_count = p.inquiry_count + d.inquiries,
+    love_count = GREATEST(p.love_count + d.love_delta, 0)
+FROM (VALUES {rows}) AS d(property_id, views, inquiries, love_delta)
+WHERE p.id = d.property_id::uuid
+"""
+
+
+def visitor_key(request):
+    """Stable identifier for unique-view counting: the user, else IP + user agent."""
+    if request.user.is_authenticated:
+        return f'u:{request.user.pk}'
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    return 'a:' + hashlib.sha1(f'{client_ip(request)}|{agent}'.encode()).hexdigest()
+
+
+class CounterBuffer:
+    """Per-process pending counter deltas"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._daily = defaultdict(Counter)     # (property_id, date) -> deltas
+        self._love_delta = Counter()           # property_id -> net loves
+        self._seen = set()
+        self._seen_date = None
+        self.flusher = PeriodicFlusher('property-counters', self.flush, FLUSH_INTERVAL)
+
+    def record_view(self, property_id, visitor):
+        today = timezone.localdate()
+        unique = self._first_view_today(property_id, visitor, today)
+        self._add(property_id, today, views=1, unique_views=int(unique))
+
+    def record_inquiry(self, property_id):
+        self._add(property_id, timezone.localdate(), inquiries=1)
+
+    def record_love(self, property_id, delta=1):
+        """``delta`` is +1 when a listing is loved and -1 when un-loved."""
+        self._add(property_id, timezone.localdate(), loves=max(delta, 0), love_delta=delta)
+
+    def _first_view_today(self, property_id, visitor, today):
+        key = (str(property_id), visitor)
+        with self._lock:
+            if self._seen_date != today or len(self._seen) >= MAX_SEEN_VISITORS:
+                self._seen.clear()
+                self._seen_date = today
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+        digest = hashlib.sha1(f'{today}|{key[0]}|{visitor}'.encode()).hexdigest()
+        return cache.add(f'property-unique-view:{digest}', 1, UNIQUE_VIEW_TTL)
+
+    def _add(self, property_id, day, love_delta=0, **deltas):
+        property_id = str(property_id)
+        with self._lock:
+            self._daily[(property_id, day)].update(deltas)
+            if love_delta:
+                self._love_delta[property_id] += love_delta
+            pending = len(self._daily)
+        self.flusher.ensure_started()
+        if pending >= MAX_PENDING_ROWS:
+            self.flusher.wake()
+
+    def flush(self):
+        """Write pending deltas. Returns the number of (property, day) rows written."""
+        with self._lock:
+            daily, self._daily = self._daily, defaultdict(Counter)
+            love_delta, self._love_delta = self._love_delta, Counter()
+        if not daily:
+            return 0
+        try:
+            self._write(daily, love_delta)
+        except Exception:
+            # Put the deltas back so the next flush retries them.
+            with self._lock:
+                for key, deltas in daily.items():
+                    self._daily[key].update(deltas)
+                self._love_delta.update(love_delta)
+            raise
+        return len(daily)
+
+    @staticmethod
+    def _write(daily, love_delta):
+        analytics_rows, analytics_params = [], []
+        totals = defaultdict(Counter)
+        # Sorted so concurrent flushes from other workers lock rows in the same order.
+        for (property_id, day), deltas in sorted(daily.items()):
+            analytics_rows.append('(%s, %s, %s, %s, %s, %s)')
+            analytics_params += [
+                property_id, day, deltas['views'], deltas['unique_views'],
+                deltas['inquiries'], deltas['loves'],
+            ]
+            totals[property_id].update(views=deltas['views'], inquiries=deltas['inquiries'])
+
+        counter_rows, counter_params = [], []
+        for property_id in sorted(totals):
+            counter_rows.append('(%s, %s, %s, %s)')
+            counter_params += [
+                property_id, totals[property_id]['views'],
+                totals[property_id]['inquiries'], love_delta.get(property_id, 0),
+            ]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(_ANALYTICS_SQL.format(rows=', '.join(analytics_rows)), analytics_params)
+            cursor.execute(_PROPERTY_COUNTERS_SQL.format(rows=', '.join(counter_rows)), counter_params)
+            refresh_rollups(daily.keys())
+
+
+counters = CounterBuffer()
@@ -3,3 +3,10 @@ from django.apps import AppConfig
 class PropertiesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'properties'
+
+    def ready(self):
+        from core import refdata
+        from . import signals  # noqa: F401
+        from .models import PropertyStatus, PropertyType
+        refdata.register(PropertyType)
+        refdata.register(PropertyStatus)
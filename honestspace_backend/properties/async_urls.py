@@ -0,0 +1,9 @@
+# properties/async_urls.py
+from django.urls import path
+from .async_views import AsyncLovedPropertyListView, AsyncPropertyDetailView, AsyncPropertyListView
+
+urlpatterns = [
+    path('', AsyncPropertyListView.as_view(), name='async-property-list'),
+    path('<uuid:pk>/', AsyncPropertyDetailView.as_view(), name='async-property-detail'),
+    path('loved/', AsyncLovedPropertyListView.as_view(), name='async-loved-property-list'),
+]
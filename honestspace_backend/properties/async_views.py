@@ -0,0 +1,99 @@
+# properties/async_views.py
+"""
+Async counterparts of the listing read endpoints (see ``core.async_views``).
+Responses match the sync endpoints field for field.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+from django_filters.utils import translate_validation
+
+from core.async_views import AsyncAPIView, prefetch
+from .analytics import counters, visitor_key
+from .cards import CardBuilder, card_values, datetime_str
+from .conditional import alisting_validators, aproperty_validators
+from .filters import PropertyFilter
+from .models import LovedProperty, Property, PropertyAmenity, PropertyMedia, PropertyQuerySet
+from .pagination import LovedPropertyCursorPagination, PropertyCursorPagination
+from .serializers import PropertyDetailSerializer
+
+
+def filter_properties(request, queryset):
+    """``PropertyFilter`` applied as ``DjangoFilterBackend`` does; it reads the reference cache."""
+    filterset = PropertyFilter(request.query_params, queryset, request=request)
+    if not filterset.is_valid():
+        raise translate_validation(filterset.errors)
+    return filterset.qs
+
+
+class AsyncPropertyListView(AsyncAPIView):
+    """Async ``PropertyListCreateView`` (reads only)"""
+    validate_unconditional = False
+
+    async def get_validators(self, request):
+        queryset = await sync_to_async(filter_properties)(request, Property.objects.publicly_searchable())
+        return await alisting_validators(queryset, request.user)
+
+    async def get(self, request):
+        queryset = await sync_to_async(filter_properties)(
+            request, Property.objects.publicly_searchable().for_listing(request.user),
+        )
+        paginator = PropertyCursorPagination()
+        page = await paginator.apaginate_queryset(card_values(queryset, request.user), request)
+        cards = await CardBuilder(request).abuild(page)
+        return paginator.get_paginated_response(cards).data
+
+
+class AsyncPropertyDetailView(AsyncAPIView):
+    """Async ``PropertyDetailView``; each read is recorded as a (buffered) view"""
+    queryset = Property.objects.select_related(
+        'landlord__user_type', 'property_type', 'status', 'location__neighborhood__city__county',
+        'rating_aggregate',
+    )
+
+    async def get_validators(self, request, pk):
+        validators = await aproperty_validators(pk, request.user)
+        if validators is None:
+            raise Http404
+        return validators
+
+    async def conditional_get(self, request, pk):
+        response = await super().conditional_get(request, pk=pk)
+        # A revalidated (304) read is still a view.
+        counters.record_view(pk, visitor_key(request))
+        return response
+
+    async def get(self, request, pk):
+        queryset = self.queryset.annotate(is_loved=PropertyQuerySet.is_loved_by(request.user))
+        obj = await queryset.visible_to(request.user).filter(pk=pk).afirst()
+        if obj is None:
+            raise Http404
+        await prefetch([obj], 'media', PropertyMedia.objects.select_related('media_type'))
+        await prefetch([obj], 'property_amenities', PropertyAmenity.objects.select_related(
+            'amenity__category', 'verified_by',
+        ))
+        return PropertyDetailSerializer(obj, context={'request': request}).data
+
+
+class AsyncLovedPropertyListView(AsyncAPIView):
+    """The user's loved listings, most recent first, in ``LovedPropertySerializer``'s shape"""
+    authentication_required = True
+
+    async def get(self, request):
+        paginator = LovedPropertyCursorPagination()
+        loves = LovedProperty.objects.filter(user=request.user).values('id', 'property_id', 'loved_at', 'notes')
+        page = await paginator.apaginate_queryset(loves, request)
+        rows = card_values(
+            Property.objects.filter(pk__in=[love['property_id'] for love in page]), request.user,
+        )
+        cards = await CardBuilder(request).abuild([row async for row in rows])
+        cards = {card['id']: card for card in cards}
+        return paginator.get_paginated_response([
+            {
+                'id': love['id'],
+                'property': str(love['property_id']),
+                'property_details': cards.get(str(love['property_id'])),
+                'loved_at': datetime_str(love['loved_at']),
+                'notes': love['notes'],
+            }
+            for love in page
+        ]).data
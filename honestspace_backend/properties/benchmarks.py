@@ -0,0 +1,235 @@
+# properties/benchmarks.py
+"""
+Latency and query-count benchmarks for the main API paths.
+
+Each scenario is a callable timed ``repeat`` times after ``warmup``
+untimed runs. Endpoints go through Django's test ``Client`` (the full
+middleware, view, serializer and renderer stack, without a network
+hop); serializer scenarios time serialization and rendering of objects
+already loaded. Writes (registration) run in a transaction that is rolled
+back, so the dataset is the same before and after a run. Results carry
+p50/p95/mean latency in milliseconds and the median query count, and are
+saved as JSON so two runs can be compared with ``compare()``.
+
+Run against data from ``properties.seed``; the scenarios pick their
+parameters from it.
+"""
+import json
+import platform
+import statistics
+import time
+from itertools import cycle
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection, transaction
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.models import Amenity, Neighborhood
+from . import seed
+from .cards import CardBuilder, card_values
+from .models import Property, PropertyType
+from .serializers import PropertyDetailSerializer, PropertyListSerializer
+from .views import PropertyDetailView
+
+PAGE_SIZE = 20
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+def percentile(sorted_values, fraction):
+    """Linear-interpolated percentile of an already sorted list"""
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def measure(func, repeat=50, warmup=5):
+    """Time ``func``; returns latency percentiles (ms) and the median query count."""
+    for _ in range(warmup):
+        func()
+    timings, queries = [], []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        queries.append(len(captured.captured_queries))
+    timings.sort()
+    return {
+        'runs': repeat,
+        'p50_ms': round(percentile(timings, 0.5), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'min_ms': round(timings[0], 3),
+        'max_ms': round(timings[-1], 3),
+        'queries': int(statistics.median(queries)),
+    }
+
+
+class Scenarios:
+    """Benchmark callables, keyed by name, built from the seeded dataset."""
+
+    def __init__(self):
+        tenant = seed.seed_users().filter(user_type__type_name='tenant').order_by('pk').first()
+        if tenant is None:
+            raise BenchmarkError('No seeded data found; run seed_benchmark_data first.')
+        self.tenant = tenant
+        self.anonymous = Client()
+        self.authenticated = Client(
+            HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(tenant).access_token}',
+        )
+        listings = Property.objects.publicly_searchable().order_by('-published_at', '-id')
+        self.property_ids = cycle([str(pk) for pk in listings.values_list('pk', flat=True)[:200]])
+        self.neighborhood = Neighborhood.objects.filter(name__in=seed.NEIGHBORHOODS).order_by('name').first()
+        self.apartment = PropertyType.objects.get(name='apartment')
+        self.amenities = list(Amenity.objects.filter(name__in=('WiFi', 'Parking')).values_list('pk', flat=True))
+        self.registrations = 0
+
+    def get(self, client, path, data=None):
+        response = client.get(path, data)
+        if response.status_code != 200:
+            raise BenchmarkError(f'GET {path} {data or ""} returned {response.status_code}')
+        return response
+
+    def post(self, path, data):
+        response = self.anonymous.post(path, data, content_type='application/json')
+        if response.status_code not in (200, 201):
+            raise BenchmarkError(f'POST {path} returned {response.status_code}: {response.content[:200]!r}')
+        return response
+
+    def filters(self):
+        lat, lng, _ = seed.NEIGHBORHOODS[self.neighborhood.name]
+        return {
+            'price_range': {'min_price': 30000, 'max_price': 80000},
+            'neighborhood_furnished': {'neighborhood': self.neighborhood.name, 'is_furnished': 'true'},
+            'type_amenities': {
+                'property_types': self.apartment.pk,
+                'amenities': self.amenities,
+            },
+            'verified_by_price': {'is_verified': 'true', 'ordering': 'price'},
+            'near_radius': {'near': f'{lat},{lng}', 'radius_m': 2000, 'ordering': 'distance'},
+            'text_search': {'q': f'apartment {self.neighborhood.name}'},
+        }
+
+    def endpoints(self):
+        scenarios = {
+            'property_list': lambda: self.get(self.anonymous, '/api/properties/'),
+            'property_list_authenticated': lambda: self.get(self.authenticated, '/api/properties/'),
+            'property_list_page_size_100': lambda: self.get(self.anonymous, '/api/properties/', {'page_size': 100}),
+            'property_detail': lambda: self.get(self.anonymous, f'/api/properties/{next(self.property_ids)}/'),
+            'property_facets': lambda: self.get(self.authenticated, '/api/properties/facets/'),
+            'neighborhood_list': lambda: self.get(self.anonymous, '/api/core/neighborhoods/'),
+            'neighborhood_list_stats': lambda: self.get(
+                self.anonymous, '/api/core/neighborhoods/', {'include': 'stats'},
+            ),
+            'register': self.register,
+            'jwt_create': lambda: self.post(
+                '/api/auth/jwt/create/', {'email': self.tenant.email, 'password': seed.SEED_PASSWORD},
+            ),
+        }
+        for name, params in self.filters().items():
+            scenarios[f'property_list_filter_{name}'] = (
+                lambda params=params: self.get(self.anonymous, '/api/properties/', params)
+            )
+        return scenarios
+
+    def register(self):
+        self.registrations += 1
+        with transaction.atomic():
+            self.post('/api/accounts/register/', {
+                'email': f'bench{self.registrations}@{seed.SEED_EMAIL_DOMAIN}',
+                'username': f'bench-{self.registrations}',
+                'first_name': 'Bench',
+                'last_name': 'User',
+                'password': 'Bench-pass-2024!',
+                'password_confirm': 'Bench-pass-2024!',
+            })
+            transaction.set_rollback(True)
+
+    def serializers(self):
+        page = Property.objects.publicly_searchable().order_by('-published_at', '-id')[:PAGE_SIZE]
+        ids = list(page.values_list('pk', flat=True))
+        listing = Property.objects.filter(pk__in=ids).order_by('-published_at', '-id')
+        objects = list(listing.for_listing())
+        detail = PropertyDetailView.queryset.get(pk=ids[0])
+        request = RequestFactory().get('/api/properties/')
+        request.user = AnonymousUser()
+        context = {'request': request}
+        renderer = JSONRenderer()
+        builder = CardBuilder(request)
+        return {
+            'serialize_list_page': lambda: renderer.render(
+                PropertyListSerializer(objects, many=True, context=context).data
+            ),
+            'serialize_list_page_cards': lambda: renderer.render(builder.build(card_values(listing))),
+            'serialize_detail': lambda: renderer.render(PropertyDetailSerializer(detail, context=context).data),
+        }
+
+    def all(self):
+        return {**self.endpoints(), **self.serializers()}
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'database_name': settings.DATABASES['default'].get('NAME'),
+        'debug': settings.DEBUG,
+        'dataset': {
+            'properties': Property.objects.count(),
+            'seeded_users': seed.seed_users().count(),
+        },
+    }
+
+
+def run(repeat=50, warmup=5, only=None, on_result=None):
+    """Run every scenario (or those named in ``only``). Returns the report dict."""
+    scenarios = Scenarios().all()
+    unknown = set(only or ()) - set(scenarios)
+    if unknown:
+        raise BenchmarkError(f'Unknown scenarios: {", ".join(sorted(unknown))}')
+    results = {}
+    for name, func in scenarios.items():
+        if only and name not in only:
+            continue
+        results[name] = measure(func, repeat=repeat, warmup=warmup)
+        if on_result:
+            on_result(name, results[name])
+    return {
+        'created_at': timezone.now().isoformat(),
+        'repeat': repeat,
+        'warmup': warmup,
+        'environment': environment(),
+        'results': results,
+    }
+
+
+def save(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current):
+    """``(name, metric, before, after, change)`` rows for scenarios in both reports."""
+    rows = []
+    for name, after in current['results'].items():
+        before = baseline['results'].get(name)
+        if before is None:
+            continue
+        for metric in ('p50_ms', 'p95_ms', 'queries'):
+            change = (after[metric] - before[metric]) / before[metric] if before[metric] else None
+            rows.append((name, metric, before[metric], after[metric], change))
+    return rows
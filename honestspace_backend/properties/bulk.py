@@ -0,0 +1,274 @@
+# properties/bulk.py
+"""
+Bulk creation and update of listings for imports and batch requests.
+
+Rows are validated one by one with ``PropertyCreateSerializer`` (its
+foreign keys resolve from the reference cache, so validation costs no
+queries) and written in chunks: one ``bulk_create`` each for
+``Property``, ``PropertyLocation`` and ``PropertyAmenity`` inside one
+transaction per chunk. Work that signals would normally trigger per row
+(search vectors, landmark distances, the facet index) runs once per chunk
+after commit. If a chunk fails to insert, its rows are retried one at a
+time so a single bad row only fails itself.
+"""
+import csv
+import io
+import json
+from collections import namedtuple
+from itertools import islice
+
+from django.contrib.gis.geos import Point
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from core import refdata
+from core.models import Amenity
+from . import facets, landmarks, market, search
+from .models import Property, PropertyAmenity, PropertyLocation
+from .serializers import PropertyCreateSerializer, get_pending_status
+
+CHUNK_SIZE = 500
+
+LOCATION_FIELDS = (
+    'address_line_1', 'address_line_2', 'neighborhood', 'postal_code',
+    'google_maps_link', 'public_transport_distance_m', 'main_road_distance_m',
+)
+
+RowError = namedtuple('RowError', 'row errors')
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = []
+        self.errors = []
+        self.rows = 0
+
+    def as_dict(self, max_errors=None):
+        errors = self.errors if max_errors is None else self.errors[:max_errors]
+        return {
+            'rows': self.rows,
+            'created': len(self.created),
+            'failed': len(self.errors),
+            'errors': [{'row': error.row, 'errors': error.errors} for error in errors],
+        }
+
+
+# Input formats
+
+def read_csv(stream):
+    """
+    Yield ``(row_number, payload)`` from CSV with one column per field.
+    Location fields are plain columns and ``amenities`` is ``;``-separated.
+    """
+    for row_number, row in enumerate(csv.DictReader(stream), start=1):
+        payload = {key: value for key, value in row.items() if key and value not in (None, '')}
+        payload['location'] = {
+            field: payload.pop(field) for field in LOCATION_FIELDS if field in payload
+        }
+        if 'amenities' in payload:
+            payload['amenities'] = [a.strip() for a in payload['amenities'].split(';') if a.strip()]
+        yield row_number, payload
+
+
+def read_jsonl(stream):
+    """Yield ``(row_number, payload)`` from JSON lines shaped like the create API."""
+    for row_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield row_number, json.loads(line)
+        except ValueError as exc:
+            yield row_number, exc
+
+
+READERS = {'csv': read_csv, 'jsonl': read_jsonl}
+
+
+def open_text(binary_stream):
+    return io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline='')
+
+
+# Validation and insertion
+
+def validate(payload, context=None):
+    """Return ``(validated_data, None)`` or ``(None, errors)`` for one payload."""
+    if isinstance(payload, Exception):
+        return None, {'non_field_errors': [f'Invalid JSON: {payload}']}
+    serializer = PropertyCreateSerializer(data=payload, context=context or {})
+    if serializer.is_valid():
+        return serializer.validated_data, None
+    return None, serializer.errors
+
+
+def build(validated_data, landlord, status):
+    """Unsaved ``Property``, ``PropertyLocation`` and ``PropertyAmenity`` objects."""
+    data = dict(validated_data)
+    location_data = dict(data.pop('location'))
+    amenity_ids = data.pop('amenities', [])
+
+    prop = Property(landlord=landlord, status=status, **data)
+    # As in Property.save()
+    prop.slug = slugify(f"{prop.title}-{prop.id}")
+    prop.sync_public_flag()
+
+    location = PropertyLocation(property=prop, **location_data)
+    sync_coordinates(location)
+    return prop, location, amenity_links(prop, amenity_ids)
+
+
+def sync_coordinates(location):
+    # As in PropertyLocation.save(), which bulk writes bypass
+    location.is_publicly_searchable = location.property.is_publicly_searchable
+    if location.latitude and location.longitude:
+        location.location = Point(float(location.longitude), float(location.latitude))
+    elif location.location:
+        location.latitude = location.location.y
+        location.longitude = location.location.x
+
+
+def amenity_links(prop, amenity_ids):
+    """Unsaved links for the known ids among ``amenity_ids``"""
+    return [
+        PropertyAmenity(property=prop, amenity=amenity)
+        for amenity in (refdata.by_id(Amenity, pk) for pk in dict.fromkeys(amenity_ids))
+        if amenity is not None
+    ]
+
+
+@transaction.atomic
+def insert(built):
+    """Insert ``build()`` results in three bulk statements. Returns the properties."""
+    properties = [prop for prop, _, _ in built]
+    Property.objects.bulk_create(properties)
+    PropertyLocation.objects.bulk_create([location for _, location, _ in built])
+    PropertyAmenity.objects.bulk_create([link for _, _, links in built for link in links])
+    schedule_maintenance([prop.pk for prop in properties])
+    return properties
+
+
+@transaction.atomic
+def update(changes):
+    """
+    Apply ``(property, validated_data)`` pairs (partial create-serializer data)
+    with one ``bulk_update`` per table. A given ``amenities`` list replaces
+    the property's amenities.
+    """
+    now = timezone.now()
+    property_fields, location_fields = {'updated_at'}, set()
+    properties, locations, new_locations, replaced, links = [], [], [], [], []
+    # Old and new neighborhoods of listings whose market stats inputs change
+    neighborhood_ids = set()
+
+    for prop, validated_data in changes:
+        data = dict(validated_data)
+        location_data = data.pop('location', None)
+        amenity_ids = data.pop('amenities', None)
+        try:
+            old_neighborhood_id = prop.location.neighborhood_id
+        except PropertyLocation.DoesNotExist:
+            old_neighborhood_id = None
+
+        for field, value in data.items():
+            setattr(prop, field, value)
+        property_fields.update(data)
+        prop.updated_at = now
+        properties.append(prop)
+
+        if location_data:
+            try:
+                location = prop.location
+            except PropertyLocation.DoesNotExist:
+                location = PropertyLocation(property=prop, **location_data)
+                sync_coordinates(location)
+                new_locations.append(location)
+            else:
+                if 'location' in location_data:
+                    # A new map link wins over the stored coordinates
+                    location.latitude = location.longitude = None
+                for field, value in location_data.items():
+                    setattr(location, field, value)
+                sync_coordinates(location)
+                location.updated_at = now
+                location_fields.update(location_data, {'location', 'latitude', 'longitude', 'updated_at'})
+                locations.append(location)
+
+        if set(data) & set(market.MARKET_FIELDS) or 'neighborhood' in (location_data or {}):
+            neighborhood_ids.add(old_neighborhood_id)
+            if location_data:
+                neighborhood_ids.add(location.neighborhood_id)
+
+        if amenity_ids is not None:
+            replaced.append(prop.pk)
+            links.extend(amenity_links(prop, amenity_ids))
+
+    if properties:
+        Property.objects.bulk_update(properties, sorted(property_fields))
+    if locations:
+        PropertyLocation.objects.bulk_update(locations, sorted(location_fields))
+    if new_locations:
+        PropertyLocation.objects.bulk_create(new_locations)
+    if replaced:
+        PropertyAmenity.objects.filter(property_id__in=replaced).delete()
+        PropertyAmenity.objects.bulk_create(links)
+    schedule_maintenance([prop.pk for prop in properties])
+    market.schedule_market_refresh(neighborhood_ids)
+    return properties
+
+
+def schedule_maintenance(property_ids):
+    """Per-row signal work, done once for a batch after commit."""
+    search.schedule_search_update(property_ids=property_ids)
+    property_ids = list(property_ids)
+    transaction.on_commit(lambda: landmarks.refresh_property_landmarks(property_ids=property_ids))
+    for pk in property_ids:
+        facets.schedule_facet_refresh(pk)
+
+
+def insert_chunk(items, landlord, status, result):
+    """
+    ``items`` is a list of ``(row, validated_data)``. Inserts them together,
+    falling back to one transaction per row if the chunk fails.
+    """
+    built = [(row, build(data, landlord, status)) for row, data in items]
+    try:
+        properties = insert([b for _, b in built])
+        result.created.extend((row, prop) for (row, _), prop in zip(built, properties))
+        return
+    except DatabaseError:
+        pass
+
+    for row, data in items:
+        try:
+            prop = insert([build(data, landlord, status)])[0]
+        except DatabaseError as exc:
+            result.errors.append(RowError(row, {'non_field_errors': [str(exc).strip()]}))
+        else:
+            result.created.append((row, prop))
+
+
+def import_rows(rows, landlord, chunk_size=CHUNK_SIZE, context=None, on_progress=None):
+    """
+    Validate and insert ``(row_number, payload)`` pairs in chunks. Invalid rows
+    are reported in the result and do not stop the import.
+    """
+    result = ImportResult()
+    status = get_pending_status()
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        valid = []
+        for row, payload in chunk:
+            data, errors = validate(payload, context)
+            if errors:
+                result.errors.append(RowError(row, errors))
+            else:
+                valid.append((row, data))
+        if valid:
+            insert_chunk(valid, landlord, status, result)
+        result.rows += len(chunk)
+        if on_progress is not None:
+            on_progress(result)
+    return result
@@ -0,0 +1,212 @@
+# properties/cards.py
+"""
+Listing cards built from ``.values()`` rows.
+
+``PropertyListSerializer`` walks a nested serializer tree and a dozen
+field objects for every property on a page. The list and facet endpoints
+instead fetch the page with ``card_values()`` (one row of plain columns
+per listing, joins included) and the featured images with one more
+``.values()`` query, then assemble the same JSON shape with plain dict
+construction. The output is kept identical to the serializer's; the
+parity test in ``properties.tests`` compares them field by field.
+"""
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from core import refdata
+from core.profiling import section
+from .media import pick_rendition
+from .models import PropertyMedia, PropertyQuerySet, PropertyStatus, PropertyType
+
+PROPERTY_TYPE_NAMES = dict(PropertyType._meta.get_field('name').flatchoices)
+STATUS_NAMES = dict(PropertyStatus._meta.get_field('name').flatchoices)
+
+CARD_COLUMNS = (
+    'id', 'title', 'rent_amount', 'deposit_amount', 'property_type_id', 'property_type__name',
+    'status_id', 'is_verified', 'is_furnished', 'is_pet_friendly',
+    'availability_date', 'landlord_id', 'landlord__first_name', 'landlord__last_name',
+    'view_count', 'created_at', 'published_at', 'is_loved',
+    'rating_aggregate__review_count', 'rating_aggregate__average_rating',
+    'location__id', 'location__address_line_1', 'location__address_line_2',
+    'location__neighborhood_id', 'location__neighborhood__name',
+    'location__neighborhood__city__name', 'location__neighborhood__city__county__name',
+    'location__neighborhood__average_rent_range', 'location__neighborhood__safety_rating',
+    'location__postal_code', 'location__location', 'location__address_verified',
+    'location__coordinates_verified', 'location__public_transport_distance_m',
+    'location__main_road_distance_m',
+)
+
+IMAGE_COLUMNS = (
+    'id', 'property_id', 'media_type_id', 'media_type__name', 'media_type__max_file_size_mb',
+    'media_type__allowed_formats', 'file', 'thumbnail', 'sort_order', 'alt_text',
+    'file_size_bytes', 'original_filename', 'processing_status', 'renditions', 'uploaded_at',
+)
+
+TWO_PLACES = Decimal('0.01')
+
+
+def card_values(queryset, user=None):
+    """``queryset`` (any ``Property`` queryset) as card rows, keeping its filters and order."""
+    queryset = queryset.prefetch_related(None)
+    if 'is_loved' not in queryset.query.annotations:
+        queryset = queryset.annotate(is_loved=PropertyQuerySet.is_loved_by(user))
+    columns = CARD_COLUMNS
+    if 'distance_m' in queryset.query.annotations:
+        columns += ('distance_m',)
+    return queryset.values(*columns)
+
+
+# The same representations DRF's fields produce
+
+def decimal_str(value):
+    return None if value is None else f'{value.quantize(TWO_PLACES):f}'
+
+
+def datetime_str(value):
+    if value is None:
+        return None
+    if settings.USE_TZ and timezone.is_aware(value):
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+
+def date_str(value):
+    return None if value is None else value.isoformat()
+
+
+class CardBuilder:
+    def __init__(self, request=None):
+        self.request = request
+        self.storage = PropertyMedia._meta.get_field('file').storage
+
+    def url(self, name):
+        if not name:
+            return None
+        url = self.storage.url(name)
+        return self.request.build_absolute_uri(url) if self.request else url
+
+    def build(self, rows):
+        """Card dicts for ``card_values()`` rows, in order."""
+        rows = list(rows)
+        with section('serialize'):
+            images = self.featured_images([row['id'] for row in rows])
+            return [self.card(row, images.get(row['id'])) for row in rows]
+
+    async def abuild(self, rows):
+        """``build()`` for async views; the featured images come from the async ORM."""
+        with section('serialize'):
+            ids = [row['id'] for row in rows]
+            images = {row['property_id']: self.image(row) async for row in self.image_rows(ids)} if ids else {}
+            return [self.card(row, images.get(row['id'])) for row in rows]
+
+    def featured_images(self, property_ids):
+        if not property_ids:
+            return {}
+        return {row['property_id']: self.image(row) for row in self.image_rows(property_ids)}
+
+    def image_rows(self, property_ids):
+        return PropertyQuerySet.primary_images().filter(property_id__in=property_ids).values(*IMAGE_COLUMNS)
+
+    def image(self, row):
+        renditions = row['renditions'] or {}
+        card_jpeg = pick_rendition(renditions, 'jpeg')
+        return {
+            'id': row['id'],
+            'media_type': row['media_type_id'],
+            'media_type_details': {
+                'id': row['media_type_id'],
+                'name': row['media_type__name'],
+                'max_file_size_mb': row['media_type__max_file_size_mb'],
+                'allowed_formats': row['media_type__allowed_formats'],
+            },
+            'file_url': self.url(row['file']),
+            'thumbnail_url': self.url(row['thumbnail']),
+            'sort_order': row['sort_order'],
+            'alt_text': row['alt_text'],
+            'file_size_bytes': row['file_size_bytes'],
+            'original_filename': row['original_filename'],
+            'processing_status': row['processing_status'],
+            'renditions': {
+                fmt: [
+                    {
+                        'width': info['width'], 'height': info['height'],
+                        'size_bytes': info['size_bytes'], 'url': self.url(info['name']),
+                    }
+                    for _, info in sorted(sizes.items(), key=lambda item: int(item[0]))
+                ]
+                for fmt, sizes in renditions.items()
+            },
+            'uploaded_at': datetime_str(row['uploaded_at']),
+            'card_url': self.url(card_jpeg) if card_jpeg else self.url(row['file']),
+            'card_webp_url': self.url(pick_rendition(renditions, 'webp')),
+        }
+
+    def location(self, row):
+        if row['location__id'] is None:
+            return None
+        neighborhood_id = row['location__neighborhood_id']
+        neighborhood = None
+        if neighborhood_id is not None:
+            neighborhood = {
+                'id': neighborhood_id,
+                'name': row['location__neighborhood__name'],
+                'city_name': row['location__neighborhood__city__name'],
+                'county_name': row['location__neighborhood__city__county__name'],
+                'average_rent_range': row['location__neighborhood__average_rent_range'],
+                'safety_rating': decimal_str(row['location__neighborhood__safety_rating']),
+            }
+        point = row['location__location']
+        address = [row['location__address_line_1'], row['location__address_line_2']]
+        if neighborhood is not None:
+            address += [neighborhood['name'], neighborhood['city_name'], neighborhood['county_name']]
+        return {
+            'id': row['location__id'],
+            'address_line_1': row['location__address_line_1'],
+            'address_line_2': row['location__address_line_2'],
+            'neighborhood': neighborhood_id,
+            'neighborhood_details': neighborhood,
+            'postal_code': row['location__postal_code'],
+            'latitude': point.y if point else None,
+            'longitude': point.x if point else None,
+            'address_verified': row['location__address_verified'],
+            'coordinates_verified': row['location__coordinates_verified'],
+            'public_transport_distance_m': row['location__public_transport_distance_m'],
+            'main_road_distance_m': row['location__main_road_distance_m'],
+            'full_address': ', '.join(part for part in address if part),
+        }
+
+    def status_display(self, status_id):
+        # From the reference cache, so listing queries need no join to property_status
+        status = refdata.by_id(PropertyStatus, status_id)
+        return STATUS_NAMES.get(status.name, status.name) if status is not None else None
+
+    def card(self, row, image):
+        distance = row.get('distance_m')
+        average = row['rating_aggregate__average_rating']
+        return {
+            'id': str(row['id']),
+            'title': row['title'],
+            'rent_amount': decimal_str(row['rent_amount']),
+            'deposit_amount': decimal_str(row['deposit_amount']),
+            'property_type': row['property_type_id'],
+            'property_type_display': PROPERTY_TYPE_NAMES.get(row['property_type__name'], row['property_type__name']),
+            'status': row['status_id'],
+            'status_display': self.status_display(row['status_id']),
+            'is_verified': row['is_verified'],
+            'is_furnished': row['is_furnished'],
+            'is_pet_friendly': row['is_pet_friendly'],
+            'availability_date': date_str(row['availability_date']),
+            'landlord': row['landlord_id'],
+            'landlord_name': f"{row['landlord__first_name']} {row['landlord__last_name']}".strip(),
+            'location': self.location(row),
+            'featured_image': image,
+            'views_count': row['view_count'],
+            'created_at': datetime_str(row['created_at']),
+            'is_loved': bool(row['is_loved']),
+            'distance_m': round(distance, 1) if distance is not None else None,
+            'reviews_count': row['rating_aggregate__review_count'] or 0,
+            'average_rating': float(average) if average is not None else 0.0,
+        }
@@ -0,0 +1,107 @@
+# properties/conditional.py
+"""
+Validators for conditional GETs of listings (see ``core.conditional``).
+
+Each function costs one or two aggregate queries and reads the timestamps
+of everything the serializers render: the property row and its view
+count, location, media, amenity links and rating aggregate, the viewer's
+loved listings and the versions of the cached reference tables. Counts
+are included so deleted rows change the validators too. The ``a``-prefixed
+variants run the same queries with the async ORM. The listing validators
+scan the whole filtered queryset, so the list endpoints only compute them
+when a client revalidates.
+"""
+from django.db.models import Count, Exists, Max, OuterRef, Subquery, Sum
+
+from core import refdata
+from core.conditional import latest
+from core.models import Amenity, City, County, MediaType, Neighborhood
+from .models import LovedProperty, Property, PropertyAmenity, PropertyMedia, PropertyStatus, PropertyType
+
+REFERENCE_MODELS = (PropertyType, PropertyStatus, Neighborhood, City, County, Amenity, MediaType)
+
+
+def _per_property(model, aggregate):
+    return Subquery(
+        model.objects.filter(property=OuterRef('pk')).order_by()
+        .values('property').annotate(value=aggregate).values('value')
+    )
+
+
+def _property_row(pk, user):
+    annotations = {
+        'media_updated': _per_property(PropertyMedia, Max('updated_at')),
+        'media_count': _per_property(PropertyMedia, Count('pk')),
+        'amenities_updated': _per_property(PropertyAmenity, Max('created_at')),
+        'amenities_count': _per_property(PropertyAmenity, Count('pk')),
+    }
+    if user.is_authenticated:
+        annotations['is_loved'] = Exists(LovedProperty.objects.filter(user=user, property=OuterRef('pk')))
+    return (
+        Property.objects.visible_to(user).filter(pk=pk).annotate(**annotations)
+        .values(
+            'updated_at', 'view_count', 'location__updated_at', 'rating_aggregate__updated_at',
+            *annotations,
+        )
+    )
+
+
+def _property_result(row):
+    if row is None:
+        return None
+    last_modified = latest(
+        row['updated_at'], row['location__updated_at'], row['rating_aggregate__updated_at'],
+        row['media_updated'], row['amenities_updated'],
+    )
+    return [sorted(row.items()), refdata.versions(*REFERENCE_MODELS)], last_modified
+
+
+def property_validators(pk, user):
+    """Validators for one listing, or None if it does not exist or ``user`` may not see it."""
+    return _property_result(_property_row(pk, user).first())
+
+
+async def aproperty_validators(pk, user):
+    return _property_result(await _property_row(pk, user).afirst())
+
+
+def _listing_aggregates(queryset, user):
+    """``(queryset, aggregates)`` pairs whose results make up a listing's validators"""
+    aggregates = [
+        (queryset.order_by(), {
+            'count': Count('pk'),
+            'updated': Max('updated_at'),
+            'views': Sum('view_count'),
+            'location': Max('location__updated_at'),
+            'ratings': Max('rating_aggregate__updated_at'),
+        }),
+        (PropertyMedia.objects.filter(property__in=queryset.values('pk')), {
+            'count': Count('pk'), 'updated': Max('updated_at'),
+        }),
+    ]
+    if user.is_authenticated:
+        aggregates.append((LovedProperty.objects.filter(user=user), {
+            'count': Count('pk'), 'latest': Max('loved_at'),
+        }))
+    return aggregates
+
+
+def _listing_result(results):
+    totals, media, *loves = results
+    parts = [sorted(totals.items()), sorted(media.items()), refdata.versions(*REFERENCE_MODELS)]
+    parts.extend(sorted(result.items()) for result in loves)
+    last_modified = latest(totals['updated'], totals['location'], totals['ratings'], media['updated'])
+    return parts, last_modified
+
+
+def listing_validators(queryset, user):
+    """Validators for a filtered listing queryset (every page of it)."""
+    return _listing_result([
+        qs.aggregate(**aggregates) for qs, aggregates in _listing_aggregates(queryset, user)
+    ])
+
+
+async def alisting_validators(queryset, user):
+    return _listing_result([
+        await qs.aaggregate(**aggregates) for qs, aggregates in _listing_aggregates(queryset, user)
+    ])
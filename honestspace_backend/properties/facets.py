@@ -0,0 +1,306 @@
+# properties/facets.py
+"""
+In-process bitmap index for filtering and facet counts over live listings.
+
+Every publicly searchable property gets a dense ordinal, and each facet
+value (property type, amenity, boolean feature, rent bucket) keeps a
+bitset of the ordinals that have it. Python integers are used as the
+bitsets: AND/OR/ANDNOT are single big-int operations and counts are a
+popcount, so a filter-plus-facets request never touches Postgres; only
+the resulting page of ids is fetched from the database.
+
+Ordinals are handed out oldest-first, so walking a result bitset from
+the highest bit down yields newest listings first. Removed listings leave
+holes that are compacted on the next full rebuild, which also bounds how
+stale a worker's copy can get (``PROPERTY_FACET_INDEX_MAX_AGE`` seconds).
+Only the first build happens in a request; later rebuilds run on a
+background thread while requests keep reading the old index.
+"""
+import threading
+import time
+from collections import defaultdict, namedtuple
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+
+from core.background import PeriodicFlusher
+from .models import Property, PropertyAmenity
+
+BOOLEAN_FEATURES = (
+    'is_furnished', 'is_pet_friendly', 'utilities_included', 'is_verified',
+    'has_garden', 'has_pool', 'has_gym',
+)
+
+# Monthly rent buckets in KES: (lower bound inclusive, upper bound exclusive)
+RENT_BUCKETS = (
+    (Decimal('0'), Decimal('10000')),
+    (Decimal('10000'), Decimal('20000')),
+    (Decimal('20000'), Decimal('35000')),
+    (Decimal('35000'), Decimal('50000')),
+    (Decimal('50000'), Decimal('75000')),
+    (Decimal('75000'), Decimal('100000')),
+    (Decimal('100000'), Decimal('150000')),
+    (Decimal('150000'), None),
+)
+
+FacetDocument = namedtuple('FacetDocument', 'property_type_id amenity_ids features rent_bucket')
+FacetResult = namedtuple('FacetResult', 'count ids facets')
+
+
+def rent_bucket(amount):
+    for index, (low, high) in enumerate(RENT_BUCKETS):
+        if amount >= low and (high is None or amount < high):
+            return index
+    return 0
+
+
+def popcount(bits):
+    return bits.bit_count() if hasattr(bits, 'bit_count') else bin(bits).count('1')
+
+
+def iter_bits_descending(bits):
+    while bits:
+        top = bits.bit_length() - 1
+        yield top
+        bits ^= 1 << top
+
+
+def searchable_properties():
+    return Property.objects.publicly_searchable()
+
+
+class FacetIndex:
+    """Bitsets per facet value over the ordinals of live listings"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.ordinals = {}
+        self.property_ids = []
+        self.documents = {}
+        self.live = 0
+        self.by_type = defaultdict(int)
+        self.by_amenity = defaultdict(int)
+        self.by_feature = defaultdict(int)
+        self.by_bucket = defaultdict(int)
+        self.built_at = None
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def is_stale(self):
+        max_age = getattr(settings, 'PROPERTY_FACET_INDEX_MAX_AGE', 300)
+        return not self.is_built or time.monotonic() - self.built_at > max_age
+
+    # Maintenance
+
+    def rebuild(self):
+        rows = (
+            searchable_properties()
+            .order_by(F('published_at').asc(nulls_first=True), 'created_at', 'pk')
+            .values_list('pk', 'property_type_id', 'rent_amount', *BOOLEAN_FEATURES)
+        )
+        documents = {}
+        for pk, type_id, rent, *flags in rows.iterator(chunk_size=5000):
+            features = frozenset(name for name, flag in zip(BOOLEAN_FEATURES, flags) if flag)
+            documents[pk] = FacetDocument(type_id, set(), features, rent_bucket(rent))
+
+        links = PropertyAmenity.objects.filter(
+            property__in=searchable_properties()
+        ).values_list('property_id', 'amenity_id')
+        for pk, amenity_id in links.iterator(chunk_size=5000):
+            if pk in documents:
+                documents[pk].amenity_ids.add(amenity_id)
+
+        with self._lock:
+            self._reset()
+            for pk, document in documents.items():
+                self._insert(pk, document)
+            self.built_at = time.monotonic()
+
+    def upsert(self, property_id, document):
+        with self._lock:
+            self._discard(property_id, forget=False)
+            self._insert(property_id, document)
+
+    def remove(self, property_id):
+        with self._lock:
+            self._discard(property_id, forget=True)
+
+    def refresh_property(self, property_id):
+        """Re-read one property after a change (two small queries)."""
+        if not self.is_built:
+            return
+        row = (
+            searchable_properties().filter(pk=property_id)
+            .values_list('property_type_id', 'rent_amount', *BOOLEAN_FEATURES)
+            .first()
+        )
+        if row is None:
+            self.remove(property_id)
+            return
+        type_id, rent, *flags = row
+        amenity_ids = set(
+            PropertyAmenity.objects.filter(property_id=property_id).values_list('amenity_id', flat=True)
+        )
+        features = frozenset(name for name, flag in zip(BOOLEAN_FEATURES, flags) if flag)
+        self.upsert(property_id, FacetDocument(type_id, amenity_ids, features, rent_bucket(rent)))
+
+    def _insert(self, property_id, document):
+        ordinal = self.ordinals.get(property_id)
+        if ordinal is None:
+            ordinal = len(self.property_ids)
+            self.property_ids.append(property_id)
+            self.ordinals[property_id] = ordinal
+        bit = 1 << ordinal
+        self.documents[ordinal] = document
+        self.live |= bit
+        self.by_type[document.property_type_id] |= bit
+        self.by_bucket[document.rent_bucket] |= bit
+        for amenity_id in document.amenity_ids:
+            self.by_amenity[amenity_id] |= bit
+        for feature in document.features:
+            self.by_feature[feature] |= bit
+
+    def _discard(self, property_id, forget):
+        ordinal = self.ordinals.get(property_id)
+        if ordinal is None:
+            return
+        document = self.documents.pop(ordinal, None)
+        if document is not None:
+            clear = ~(1 << ordinal)
+            self.live &= clear
+            self.by_type[document.property_type_id] &= clear
+            self.by_bucket[document.rent_bucket] &= clear
+            for amenity_id in document.amenity_ids:
+                self.by_amenity[amenity_id] &= clear
+            for feature in document.features:
+                self.by_feature[feature] &= clear
+        if forget:
+            del self.ordinals[property_id]
+            self.property_ids[ordinal] = None
+
+    # Queries
+
+    def query(self, property_types=(), amenities=(), features=None, rent_buckets=(),
+              offset=0, limit=20):
+        """
+        ``property_types`` and ``rent_buckets`` match any of the given values,
+        ``amenities`` must all be present and ``features`` maps a boolean
+        feature name to the required value.
+        """
+        features = features or {}
+        with self._lock:
+            clauses = {
+                'property_type': self._any(self.by_type, property_types),
+                'rent_bucket': self._any(self.by_bucket, rent_buckets),
+                'amenities': self._all(self.by_amenity, amenities),
+                'features': self._features(features),
+            }
+            result = self._combine(clauses.values())
+
+            facets = {
+                # Disjunctive facets count against every other active filter.
+                'property_type': self._counts(
+                    self._combine(v for k, v in clauses.items() if k != 'property_type'),
+                    self.by_type,
+                ),
+                'rent_bucket': self._counts(
+                    self._combine(v for k, v in clauses.items() if k != 'rent_bucket'),
+                    self.by_bucket,
+                ),
+                'amenities': self._counts(result, self.by_amenity),
+                'features': self._counts(result, self.by_feature),
+            }
+
+            ids = []
+            for position, ordinal in enumerate(iter_bits_descending(result)):
+                if position >= offset + limit:
+                    break
+                if position >= offset:
+                    ids.append(self.property_ids[ordinal])
+
+        return FacetResult(popcount(result), ids, facets)
+
+    def _combine(self, clauses):
+        bits = self.live
+        for clause in clauses:
+            if clause is not None:
+                bits &= clause
+        return bits
+
+    @staticmethod
+    def _any(bitmaps, values):
+        if not values:
+            return None
+        bits = 0
+        for value in values:
+            bits |= bitmaps.get(value, 0)
+        return bits
+
+    @staticmethod
+    def _all(bitmaps, values):
+        if not values:
+            return None
+        bits = -1
+        for value in values:
+            bits &= bitmaps.get(value, 0)
+        return bits
+
+    def _features(self, features):
+        if not features:
+            return None
+        bits = -1
+        for name, wanted in features.items():
+            bitmap = self.by_feature.get(name, 0)
+            bits &= bitmap if wanted else ~bitmap
+        return bits
+
+    @staticmethod
+    def _counts(base, bitmaps):
+        counts = {}
+        for value, bitmap in bitmaps.items():
+            count = popcount(base & bitmap)
+            if count:
+                counts[value] = count
+        return counts
+
+
+facet_index = FacetIndex()
+_build_lock = threading.Lock()
+
+
+def _rebuild_if_stale():
+    with _build_lock:
+        if facet_index.is_stale():
+            facet_index.rebuild()
+
+
+# No exit flush: a rebuild while the worker shuts down is wasted.
+_rebuilder = PeriodicFlusher(
+    'facet-index', _rebuild_if_stale, getattr(settings, 'PROPERTY_FACET_INDEX_MAX_AGE', 300),
+    flush_at_exit=False,
+)
+
+
+def get_facet_index():
+    """
+    The process-wide index. The first use builds it; after that a stale
+    index keeps being served while a background thread rebuilds it.
+    """
+    if not facet_index.is_built:
+        _rebuild_if_stale()
+    elif facet_index.is_stale():
+        _rebuilder.ensure_started()
+        _rebuilder.wake()
+    return facet_index
+
+
+def schedule_facet_refresh(property_id):
+    if facet_index.is_built:
+        transaction.on_commit(lambda: facet_index.refresh_property(property_id))
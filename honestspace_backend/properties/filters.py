@@ -1,10 +1,40 @@
 # properties/filters.py
 import django_filters
 from django.db import models
-from .models import Property, PropertyType, Amenity
+from core.geo import distance_to, within_bbox, within_radius
+from core.refdata import ReferenceChoiceFilter, ReferenceMultipleChoiceFilter
+from core.models import Amenity
+from .geo import DEFAULT_RADIUS_M, MAX_RADIUS_M, BBoxField, LatLngField
+from .models import Property, PropertyType
+from .search import search_properties
+
+
+class LatLngFilter(django_filters.Filter):
+    field_class = LatLngField
+
+
+class BBoxFilter(django_filters.Filter):
+    field_class = BBoxField
+
+
+class PropertyOrderingFilter(django_filters.OrderingFilter):
+    """Ordering that ignores ``distance`` unless a ``near`` point was given"""
+
+    def filter(self, qs, value):
+        if value and 'distance_m' not in qs.query.annotations:
+            value = [v for v in value if v.lstrip('-') != 'distance']
+        return super().filter(qs, value)
+
 
 class PropertyFilter(django_filters.FilterSet):
-    """Advanced filtering for properties"""
+    """
+    Advanced filtering for public listing searches. Geographic filters
+    also match on the location's copy of ``is_publicly_searchable`` so the
+    partial GiST index on live listings applies.
+    """
+    
+    # Full-text search, ranked by relevance unless another ordering is requested
+    q = django_filters.CharFilter(method='filter_search', label='Search')
     
     # Price range filters
     min_price = django_filters.NumberFilter(field_name="rent_amount", lookup_expr='gte')
@@ -24,11 +54,16 @@ class PropertyFilter(django_filters.FilterSet):
         lookup_expr='icontains'
     )
     
+    # Geographic filters: near=lat,lng[&radius_m=] and bbox=min_lng,min_lat,max_lng,max_lat
+    near = LatLngFilter(method='filter_near', label='lat,lng')
+    radius_m = django_filters.NumberFilter(method='filter_radius')
+    bbox = BBoxFilter(method='filter_bbox', label='min_lng,min_lat,max_lng,max_lat')
+    
     # Property type filter
-    property_type = django_filters.ModelChoiceFilter(
+    property_type = ReferenceChoiceFilter(
         queryset=PropertyType.objects.all()
     )
-    property_types = django_filters.ModelMultipleChoiceFilter(
+    property_types = ReferenceMultipleChoiceFilter(
         field_name="property_type",
         queryset=PropertyType.objects.all()
     )
@@ -44,8 +79,8 @@ class PropertyFilter(django_filters.FilterSet):
     max_size = django_filters.NumberFilter(field_name="property_size_sqft", lookup_expr='lte')
     
     # Amenities filter
-    amenities = django_filters.ModelMultipleChoiceFilter(
-        field_name="propertyamenity__amenity",
+    amenities = ReferenceMultipleChoiceFilter(
+        field_name="property_amenities__amenity",
         queryset=Amenity.objects.all(),
         method='filter_amenities'
     )
@@ -55,18 +90,20 @@ class PropertyFilter(django_filters.FilterSet):
     available_until = django_filters.DateFilter(field_name="availability_date", lookup_expr='lte')
     
     # Ordering
-    ordering = django_filters.OrderingFilter(
+    ordering = PropertyOrderingFilter(
         fields=(
             ('rent_amount', 'price'),
             ('created_at', 'created'),
-            ('views_count', 'popular'),
+            ('view_count', 'popular'),
             ('is_verified', 'verified'),
+            ('distance_m', 'distance'),
         ),
         field_labels={
             'price': 'Price',
             'created': 'Date Listed',
             'popular': 'Popularity',
             'verified': 'Verified',
+            'distance': 'Distance',
         }
     )
     
@@ -81,6 +118,27 @@ class PropertyFilter(django_filters.FilterSet):
         """Custom filter for amenities - properties must have ALL selected amenities"""
         if value:
             for amenity in value:
-                queryset = queryset.filter(propertyamenity__amenity=amenity)
+                queryset = queryset.filter(property_amenities__amenity=amenity)
             queryset = queryset.distinct()
-        return queryset
\ No newline at end of file
+        return queryset
+    
+    def filter_search(self, queryset, name, value):
+        return search_properties(queryset, value).order_by('-search_rank')
+    
+    def filter_near(self, queryset, name, value):
+        """Listings within radius_m metres of the point, annotated with distance_m"""
+        lat, lng = value
+        radius = self.form.cleaned_data.get('radius_m') or DEFAULT_RADIUS_M
+        radius = min(max(float(radius), 0), MAX_RADIUS_M)
+        return (
+            queryset
+            .filter(within_radius('location__location', lng, lat, radius), location__is_publicly_searchable=True)
+            .annotate(distance_m=distance_to('location__location', lng, lat))
+        )
+    
+    def filter_radius(self, queryset, name, value):
+        # Consumed by filter_near
+        return queryset
+    
+    def filter_bbox(self, queryset, name, value):
+        return queryset.filter(within_bbox('location__location', *value), location__is_publicly_searchable=True)
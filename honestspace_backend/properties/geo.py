@@ -0,0 +1,48 @@
+# properties/geo.py
+"""Request parsing for the geographic property search filters"""
+from django import forms
+
+DEFAULT_RADIUS_M = 5000
+MAX_RADIUS_M = 50000
+
+
+def _parse_floats(value, count):
+    parts = [part.strip() for part in value.split(',')]
+    if len(parts) != count:
+        raise forms.ValidationError(f'Expected {count} comma-separated numbers.')
+    try:
+        return [float(part) for part in parts]
+    except ValueError:
+        raise forms.ValidationError('Coordinates must be numbers.')
+
+
+def _check_lat_lng(lat, lng):
+    if not -90 <= lat <= 90 or not -180 <= lng <= 180:
+        raise forms.ValidationError('Coordinates are out of range.')
+
+
+class LatLngField(forms.CharField):
+    """Parses ``lat,lng`` into a ``(lat, lng)`` tuple"""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        lat, lng = _parse_floats(value, 2)
+        _check_lat_lng(lat, lng)
+        return lat, lng
+
+
+class BBoxField(forms.CharField):
+    """Parses ``min_lng,min_lat,max_lng,max_lat``"""
+
+    def to_python(self, value):
+        value = super().to_python(value)
+        if not value:
+            return None
+        min_lng, min_lat, max_lng, max_lat = _parse_floats(value, 4)
+        _check_lat_lng(min_lat, min_lng)
+        _check_lat_lng(max_lat, max_lng)
+        if min_lng > max_lng or min_lat > max_lat:
+            raise forms.ValidationError('Bounding box corners are out of order.')
+        return min_lng, min_lat, max_lng, max_lat
@@ -0,0 +1,50 @@
+# properties/imaging.py
+"""
+Image decoding and resizing for media renditions.
+
+This module runs inside the media process pool, so it must not import
+Django: workers start with ``spawn`` and only import what the submitted
+function needs.
+"""
+import io
+
+from PIL import Image, ImageOps
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Refuse decompression bombs before they are decoded.
+Image.MAX_IMAGE_PIXELS = 60_000_000
+
+
+def _encode(image, fmt):
+    pil_format, options = FORMATS[fmt]
+    buffer = io.BytesIO()
+    image.save(buffer, pil_format, **options)
+    return buffer.getvalue()
+
+
+def render(data, widths, thumbnail_size):
+    """
+    Decode ``data`` and return ``(renditions, thumbnail)``. ``renditions`` is
+    a list of ``(format, width, height, bytes)`` for every width in
+    ``widths`` up to the original width (the original width is used when it
+    is smaller than all of them); ``thumbnail`` is a JPEG cropped to
+    ``thumbnail_size``.
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        source.draft('RGB', (max(widths), max(widths)))
+        image = ImageOps.exif_transpose(source).convert('RGB')
+
+    targets = sorted({min(width, image.width) for width in widths})
+    renditions = []
+    for width in targets:
+        height = max(round(image.height * width / image.width), 1)
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in FORMATS:
+            renditions.append((fmt, width, height, _encode(resized, fmt)))
+
+    thumbnail = ImageOps.fit(image, thumbnail_size, Image.LANCZOS)
+    return renditions, _encode(thumbnail, 'jpeg')
@@ -0,0 +1,112 @@
+# properties/landmarks.py
+"""
+Set-based maintenance of ``PropertyLandmark`` distances.
+
+Pairs come from a single spatial join between ``property_locations`` and
+``landmarks`` (``ST_DWithin`` on geography, radius taken from the
+landmark's ``LandmarkType.search_radius_m``) and are written back with
+``INSERT ... ON CONFLICT DO UPDATE``. Scoping the join to a handful of
+properties or landmarks keeps incremental updates proportional to their
+neighbourhood rather than to properties x landmarks.
+"""
+from django.db import connection, transaction
+
+# Straight-line distance understates street distance; these turn it into
+# rough travel times for display.
+ROUTE_FACTOR = 1.3
+WALKING_METRES_PER_MINUTE = 80     # ~4.8 km/h
+DRIVING_METRES_PER_MINUTE = 400    # ~24 km/h urban average
+
+_PAIRS_SQL = """
+    SELECT pl.property_id, l.id AS landmark_id,
+           ROUND(ST_Distance((pl.location)::geography, (l.location)::geography))::integer AS distance
+    FROM landmarks l
+    JOIN landmark_types lt ON lt.id = l.landmark_type_id
+    JOIN property_locations pl
+      ON ST_DWithin((pl.location)::geography, (l.location)::geography, lt.search_radius_m)
+    WHERE l.is_active AND pl.location IS NOT NULL {scope}
+"""
+
+_UPSERT_SQL = """
+INSERT INTO property_landmarks (
+    property_id, landmark_id, distance_meters, walking_time_minutes,
+    driving_time_minutes, notes, is_highlighted, distance_verified, created_at
+)
+SELECT pairs.property_id, pairs.landmark_id, pairs.distance,
+       CEIL(pairs.distance * %(route_factor)s / %(walking)s)::integer,
+       CEIL(pairs.distance * %(route_factor)s / %(driving)s)::integer,
+       '', FALSE, FALSE, NOW()
+FROM ({pairs}) pairs
+ON CONFLICT (property_id, landmark_id) DO UPDATE SET
+    distance_meters = EXCLUDED.distance_meters,
+    walking_time_minutes = EXCLUDED.walking_time_minutes,
+    driving_time_minutes = EXCLUDED.driving_time_minutes
+WHERE NOT property_landmarks.distance_verified
+"""
+
+# Unverified pairs in scope that are no longer within range.
+_DELETE_STALE_SQL = """
+DELETE FROM property_landmarks plm
+WHERE NOT plm.distance_verified {scope}
+  AND NOT EXISTS (
+      SELECT 1
+      FROM property_locations pl
+      JOIN landmarks l ON l.id = plm.landmark_id
+      JOIN landmark_types lt ON lt.id = l.landmark_type_id
+      WHERE pl.property_id = plm.property_id
+        AND l.is_active AND pl.location IS NOT NULL
+        AND ST_DWithin((pl.location)::geography, (l.location)::geography, lt.search_radius_m)
+  )
+"""
+
+
+def _scope(alias_property, alias_landmark, property_ids, landmark_ids, landmark_id_range):
+    clauses, params = [], {}
+    if property_ids is not None:
+        clauses.append(f'AND {alias_property}.property_id = ANY(%(property_ids)s::uuid[])')
+        params['property_ids'] = [str(pk) for pk in property_ids]
+    if landmark_ids is not None:
+        clauses.append(f'AND {alias_landmark} = ANY(%(landmark_ids)s)')
+        params['landmark_ids'] = list(landmark_ids)
+    if landmark_id_range is not None:
+        clauses.append(f'AND {alias_landmark} BETWEEN %(landmark_min)s AND %(landmark_max)s')
+        params['landmark_min'], params['landmark_max'] = landmark_id_range
+    return ' '.join(clauses), params
+
+
+@transaction.atomic
+def refresh_property_landmarks(property_ids=None, landmark_ids=None, landmark_id_range=None):
+    """
+    Recompute nearby landmarks for the given properties and/or landmarks
+    (everything when both are None). Returns ``(upserted, deleted)``.
+    """
+    if property_ids is not None and not property_ids:
+        return 0, 0
+    if landmark_ids is not None and not landmark_ids:
+        return 0, 0
+
+    scope, params = _scope('pl', 'l.id', property_ids, landmark_ids, landmark_id_range)
+    params.update(
+        route_factor=ROUTE_FACTOR,
+        walking=WALKING_METRES_PER_MINUTE,
+        driving=DRIVING_METRES_PER_MINUTE,
+    )
+    stale_scope, stale_params = _scope(
+        'plm', 'plm.landmark_id', property_ids, landmark_ids, landmark_id_range
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(_UPSERT_SQL.format(pairs=_PAIRS_SQL.format(scope=scope)), params)
+        upserted = cursor.rowcount
+        cursor.execute(_DELETE_STALE_SQL.format(scope=stale_scope), stale_params)
+        deleted = cursor.rowcount
+    return upserted, deleted
+
+
+def schedule_property_refresh(property_id):
+    transaction.on_commit(lambda: refresh_property_landmarks(property_ids=[property_id]))
+
+
+def schedule_landmark_refresh(landmark_ids):
+    landmark_ids = list(landmark_ids)
+    transaction.on_commit(lambda: refresh_property_landmarks(landmark_ids=landmark_ids))
@@ -0,0 +1,138 @@
+# properties/lifecycle.py
+"""
+Expiry sweeps for time-limited rows, run by the ``sweep_lifecycle`` command.
+
+Each sweep works in batches of ``BATCH_SIZE`` rows. Every batch is its own
+short transaction: claim up to ``BATCH_SIZE`` ids with ``SELECT ... LIMIT
+... FOR UPDATE SKIP LOCKED``, then ``UPDATE`` or ``DELETE`` just those ids.
+Locks are therefore held for one small batch at a time. Rows being written
+by requests are skipped until the next run, and several sweepers can run
+side by side. Batches repeat until a sweep finds nothing left to do.
+
+- Listings whose ``expires_at`` has passed move from ``active`` to
+  ``expired`` and leave public searches. The market stats of their
+  neighborhoods are refreshed.
+- Trust badges whose ``expires_at`` has passed are deactivated.
+- Email verification and password reset tokens that are used or expired
+  are deleted.
+
+Configuration lives in ``settings.PROPERTY_LIFECYCLE``.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from accounts.models import EmailVerificationToken, PasswordResetToken
+from core import refdata
+from . import facets, market
+from .models import Property, PropertyLocation, PropertyStatus, PropertyTrustBadge
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'BATCH_SIZE': 1000,
+    # Pause between batches, in seconds, to leave room for other writers.
+    'BATCH_PAUSE': 0,
+}
+
+
+def lifecycle_settings():
+    return {**DEFAULTS, **getattr(settings, 'PROPERTY_LIFECYCLE', {})}
+
+
+def in_batches(queryset, apply, batch_size, pause=0):
+    """
+    Call ``apply(ids)`` on the rows of ``queryset``, at most ``batch_size`` at
+    a time and each batch in its own transaction. ``apply`` must take the
+    rows out of ``queryset``. Returns the total of what ``apply`` returned.
+    """
+    total = 0
+    while True:
+        with transaction.atomic():
+            ids = list(
+                queryset.select_for_update(skip_locked=True, of=('self',))
+                .order_by().values_list('pk', flat=True)[:batch_size]
+            )
+            if ids:
+                total += apply(ids)
+        if len(ids) < batch_size:
+            return total
+        if pause:
+            time.sleep(pause)
+
+
+def expired_status():
+    status = refdata.by_name(PropertyStatus, 'expired')
+    if status is None:
+        status, _ = PropertyStatus.objects.get_or_create(
+            name='expired', defaults={'display_name': 'Expired', 'is_public': False},
+        )
+    return status
+
+
+def expire_listings(batch_size, pause=0, now=None):
+    """Move active listings past ``expires_at`` to the ``expired`` status."""
+    now = now or timezone.now()
+    active = refdata.by_name(PropertyStatus, 'active')
+    if active is None:
+        return 0
+    status = expired_status()
+    neighborhood_ids = set()
+
+    def expire(ids):
+        updated = Property.objects.filter(pk__in=ids).update(
+            status=status, is_publicly_searchable=status.is_searchable, updated_at=now,
+        )
+        locations = PropertyLocation.objects.filter(property_id__in=ids)
+        neighborhood_ids.update(locations.values_list('neighborhood_id', flat=True))
+        locations.update(is_publicly_searchable=status.is_searchable)
+        for pk in ids:
+            facets.schedule_facet_refresh(pk)
+        return updated
+
+    expired = in_batches(
+        Property.objects.filter(status=active, expires_at__lte=now), expire, batch_size, pause,
+    )
+    if neighborhood_ids:
+        market.refresh_market_stats(neighborhood_ids)
+    return expired
+
+
+def deactivate_trust_badges(batch_size, pause=0, now=None):
+    """Deactivate trust badges past ``expires_at``."""
+    now = now or timezone.now()
+    return in_batches(
+        PropertyTrustBadge.objects.filter(is_active=True, expires_at__lte=now),
+        lambda ids: PropertyTrustBadge.objects.filter(pk__in=ids).update(is_active=False),
+        batch_size, pause,
+    )
+
+
+def purge_tokens(model, batch_size, pause=0, now=None):
+    """Delete used or expired tokens of ``model``."""
+    now = now or timezone.now()
+    return in_batches(
+        model.objects.filter(Q(is_used=True) | Q(expires_at__lte=now)),
+        lambda ids: model.objects.filter(pk__in=ids).delete()[0],
+        batch_size, pause,
+    )
+
+
+def sweep(batch_size=None, pause=None):
+    """Run every sweep once. Returns the number of rows each one changed."""
+    config = lifecycle_settings()
+    batch_size = batch_size or config['BATCH_SIZE']
+    pause = config['BATCH_PAUSE'] if pause is None else pause
+    now = timezone.now()
+    counts = {
+        'listings_expired': expire_listings(batch_size, pause, now),
+        'badges_deactivated': deactivate_trust_badges(batch_size, pause, now),
+        'email_tokens_purged': purge_tokens(EmailVerificationToken, batch_size, pause, now),
+        'reset_tokens_purged': purge_tokens(PasswordResetToken, batch_size, pause, now),
+    }
+    logger.info('Lifecycle sweep: %s', ', '.join(f'{name}={count}' for name, count in counts.items()))
+    return counts
@@ -0,0 +1,124 @@
+# properties/loadtest.py
+"""
+Concurrent-connection load test of running deployments.
+
+Where ``properties.benchmarks`` times single requests in-process, this
+drives a running server over HTTP with ``concurrency`` keep-alive
+connections for ``duration`` seconds and reports throughput, latency
+percentiles and errors. The same paths are sent to the WSGI deployment
+(gunicorn, sync workers or threads) and, rewritten under ``/api/async/``,
+to the ASGI one (uvicorn workers), so the sync and async views are
+compared like for like. Given the server's process id, the resident
+memory of the process and its workers is sampled while idle and under
+load; the growth divided by the connection count is the memory cost per
+connection.
+
+Run the load generator on another machine or on cores the server does
+not use, or it competes with the server for CPU.
+"""
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+from .benchmarks import percentile
+
+DEFAULT_PATHS = ('/api/properties/', '/api/properties/{property}/', '/api/core/neighborhoods/')
+
+
+def async_path(path):
+    """The async endpoint mirroring sync ``path`` (``/api/x/`` -> ``/api/async/x/``)"""
+    return '/api/async/' + path[len('/api/'):]
+
+
+def rss_kb(pid):
+    """Resident memory of ``pid`` and all of its descendants, in KiB (Linux only)"""
+    total = 0
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    total += int(line.split()[1])
+                    break
+        for task in os.listdir(f'/proc/{pid}/task'):
+            with open(f'/proc/{pid}/task/{task}/children') as f:
+                total += sum(rss_kb(int(child)) for child in f.read().split())
+    except (FileNotFoundError, ProcessLookupError):
+        pass
+    return total
+
+
+async def sample_rss(pid, samples, interval=0.25):
+    while True:
+        samples.append(rss_kb(pid))
+        await asyncio.sleep(interval)
+
+
+async def run_level(base_url, paths, concurrency, duration, pid=None, headers=None):
+    """Load ``base_url`` with ``concurrency`` connections cycling through ``paths``."""
+    latencies, failures = [], []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30, headers=headers) as client:
+        idle_kb = rss_kb(pid) if pid else None
+
+        async def worker(offset):
+            n = offset
+            while time.perf_counter() < deadline:
+                path = paths[n % len(paths)]
+                n += 1
+                start = time.perf_counter()
+                try:
+                    response = await client.get(path)
+                except httpx.HTTPError as exc:
+                    failures.append(type(exc).__name__)
+                    continue
+                if response.status_code == 200:
+                    latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    failures.append(response.status_code)
+
+        samples = []
+        sampler = asyncio.create_task(sample_rss(pid, samples)) if pid else None
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        if sampler is not None:
+            sampler.cancel()
+
+    latencies.sort()
+    result = {
+        'concurrency': concurrency,
+        'requests': len(latencies),
+        'errors': len(failures),
+        'requests_per_s': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 0.5), 2) if latencies else None,
+        'p95_ms': round(percentile(latencies, 0.95), 2) if latencies else None,
+        'mean_ms': round(statistics.fmean(latencies), 2) if latencies else None,
+    }
+    if pid:
+        peak_kb = max(samples, default=idle_kb)
+        result.update({
+            'idle_rss_mb': round(idle_kb / 1024, 1),
+            'peak_rss_mb': round(peak_kb / 1024, 1),
+            'kb_per_connection': round(max(peak_kb - idle_kb, 0) / concurrency, 1),
+        })
+    return result
+
+
+def run(deployments, paths, levels, duration, headers=None, on_result=None):
+    """
+    Load every deployment at every concurrency level. ``deployments`` maps a
+    name to ``(base_url, paths, pid)``. Returns the report dict.
+    """
+    results = {}
+    for name, (base_url, deployment_paths, pid) in deployments.items():
+        results[name] = []
+        for concurrency in levels:
+            result = asyncio.run(run_level(base_url, deployment_paths, concurrency, duration, pid, headers))
+            results[name].append(result)
+            if on_result:
+                on_result(name, result)
+    return {'paths': list(paths), 'duration_s': duration, 'results': results}
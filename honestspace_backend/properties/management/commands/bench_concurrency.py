@@ -0,0 +1,71 @@
+from itertools import cycle
+
+from django.core.management.base import BaseCommand, CommandError
+
+from properties import benchmarks, loadtest
+from properties.models import Property
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare throughput and memory per connection of running WSGI and ASGI "
+        "deployments under concurrent load (see properties.loadtest)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--wsgi-url', help="Base URL of the WSGI deployment, e.g. http://127.0.0.1:8000")
+        parser.add_argument('--asgi-url', help="Base URL of the ASGI deployment, e.g. http://127.0.0.1:8001")
+        parser.add_argument('--wsgi-pid', type=int, help="Master process id of the WSGI server, to sample memory")
+        parser.add_argument('--asgi-pid', type=int, help="Master process id of the ASGI server, to sample memory")
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[10, 50, 200],
+                            help="Concurrent connections per run")
+        parser.add_argument('--duration', type=float, default=15, help="Seconds per run")
+        parser.add_argument('--paths', nargs='+', default=list(loadtest.DEFAULT_PATHS),
+                            help="Sync API paths; {property} is replaced with seeded listing ids")
+        parser.add_argument('--token', help="JWT access token sent as a bearer token")
+        parser.add_argument('--output', help="Write the report to this JSON file")
+
+    def handle(self, *args, **options):
+        if not (options['wsgi_url'] or options['asgi_url']):
+            raise CommandError("Give --wsgi-url, --asgi-url or both.")
+        paths = self.expand(options['paths'])
+        deployments = {}
+        if options['wsgi_url']:
+            deployments['wsgi'] = (options['wsgi_url'], paths, options['wsgi_pid'])
+        if options['asgi_url']:
+            deployments['asgi'] = (options['asgi_url'], [loadtest.async_path(p) for p in paths], options['asgi_pid'])
+        headers = {'Authorization': f"Bearer {options['token']}"} if options['token'] else None
+
+        self.stdout.write(
+            f"{'deployment':<11} {'conns':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9}"
+            f" {'errors':>7} {'KiB/conn':>9}"
+        )
+
+        def show(name, result):
+            per_connection = result.get('kb_per_connection')
+            self.stdout.write(
+                f"{name:<11} {result['concurrency']:>6} {result['requests_per_s']:>9}"
+                f" {result['p50_ms'] or '-':>9} {result['p95_ms'] or '-':>9} {result['errors']:>7}"
+                f" {per_connection if per_connection is not None else '-':>9}"
+            )
+
+        report = loadtest.run(
+            deployments, options['paths'], options['concurrency'], options['duration'], headers, on_result=show,
+        )
+        if options['output']:
+            benchmarks.save(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Report written to {options['output']}."))
+
+    def expand(self, paths):
+        """Spread ``{property}`` paths over up to 50 active listings, keeping the path mix."""
+        if not any('{property}' in path for path in paths):
+            return paths
+        ids = [str(pk) for pk in Property.objects.publicly_searchable()
+               .order_by('-published_at', '-id').values_list('pk', flat=True)[:50]]
+        if not ids:
+            raise CommandError("No active listings found; run seed_benchmark_data first.")
+        ids = cycle(ids)
+        expanded = []
+        for _ in range(50):
+            expanded += [path.format(property=next(ids)) if '{property}' in path else path for path in paths]
+        return expanded
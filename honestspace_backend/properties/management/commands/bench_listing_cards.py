@@ -0,0 +1,71 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import FastJSONRenderer
+from properties.cards import IMAGE_COLUMNS, CardBuilder, card_values
+from properties.models import Property, PropertyQuerySet
+from properties.serializers import PropertyListSerializer
+
+
+def best_of(repeat, func):
+    """Fastest of ``repeat`` runs, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+
+class Command(BaseCommand):
+    help = "Compare PropertyListSerializer with the values-based card builder per listing page"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[20, 100], help="Page sizes")
+        parser.add_argument('--repeat', type=int, default=30, help="Runs per measurement (best is kept)")
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/api/properties/')
+        request.user = AnonymousUser()
+        repeat = options['repeat']
+
+        self.stdout.write(
+            f"{'page':>5} {'DRF ser+render':>15} {'cards ser+render':>17} {'speedup':>8}"
+            f" {'DRF end-to-end':>15} {'cards end-to-end':>17} {'speedup':>8}"
+        )
+        for size in options['sizes']:
+            queryset = Property.objects.order_by('-published_at', '-id')
+            ids = list(queryset.values_list('pk', flat=True)[:size])
+            if len(ids) < size:
+                raise CommandError(
+                    f"Need at least {size} properties, found {len(ids)}; seed some data first."
+                )
+            page = Property.objects.filter(pk__in=ids).order_by('-published_at', '-id')
+            objects = list(page.for_listing())
+            rows = list(card_values(page))
+            image_rows = list(
+                PropertyQuerySet.primary_images().filter(property_id__in=ids).values(*IMAGE_COLUMNS)
+            )
+            builder = CardBuilder(request)
+
+            def drf_serialize(objects):
+                data = PropertyListSerializer(objects, many=True, context={'request': request}).data
+                return JSONRenderer().render(data)
+
+            def fast_serialize(rows, image_rows):
+                images = {row['property_id']: builder.image(row) for row in image_rows}
+                cards = [builder.card(row, images.get(row['id'])) for row in rows]
+                return FastJSONRenderer().render(cards)
+
+            drf = best_of(repeat, lambda: drf_serialize(objects))
+            fast = best_of(repeat, lambda: fast_serialize(rows, image_rows))
+            drf_total = best_of(repeat, lambda: drf_serialize(list(page.for_listing())))
+            fast_total = best_of(repeat, lambda: FastJSONRenderer().render(builder.build(card_values(page))))
+            self.stdout.write(
+                f"{size:>5} {drf:>12.2f} ms {fast:>14.2f} ms {drf / fast:>7.1f}x"
+                f" {drf_total:>12.2f} ms {fast_total:>14.2f} ms {drf_total / fast_total:>7.1f}x"
+            )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min
+
+from core.models import Landmark
+from properties.landmarks import refresh_property_landmarks
+
+
+class Command(BaseCommand):
+    help = "Compute PropertyLandmark distances with a set-based spatial join"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--property', dest='property_ids', action='append', default=None,
+            help="Only recompute this property (repeatable)",
+        )
+        parser.add_argument(
+            '--landmark', dest='landmark_ids', action='append', type=int, default=None,
+            help="Only recompute this landmark (repeatable)",
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help="Landmark id range handled per statement on a full run",
+        )
+
+    def handle(self, *args, **options):
+        property_ids = options['property_ids']
+        landmark_ids = options['landmark_ids']
+
+        if property_ids or landmark_ids:
+            upserted, deleted = refresh_property_landmarks(
+                property_ids=property_ids, landmark_ids=landmark_ids
+            )
+            self._report(upserted, deleted)
+            return
+
+        bounds = Landmark.objects.aggregate(low=Min('id'), high=Max('id'))
+        if bounds['low'] is None:
+            self.stdout.write(self.style.WARNING("No landmarks to process."))
+            return
+
+        total_upserted = total_deleted = 0
+        batch_size = max(options['batch_size'], 1)
+        for start in range(bounds['low'], bounds['high'] + 1, batch_size):
+            end = start + batch_size - 1
+            upserted, deleted = refresh_property_landmarks(landmark_id_range=(start, end))
+            total_upserted += upserted
+            total_deleted += deleted
+            self.stdout.write(f"Landmarks {start}-{end}: {upserted} upserted, {deleted} removed")
+        self._report(total_upserted, total_deleted)
+
+    def _report(self, upserted, deleted):
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Landmark distances refreshed: {upserted} upserted, {deleted} removed."
+        ))
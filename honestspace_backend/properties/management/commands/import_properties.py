@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from properties.bulk import CHUNK_SIZE, READERS, import_rows, open_text
+
+
+class Command(BaseCommand):
+    help = "Stream listings from a CSV or JSON lines file into the database in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="CSV or JSONL file, or - for stdin")
+        parser.add_argument('--landlord', required=True, help="Landlord email or id")
+        parser.add_argument(
+            '--format', choices=sorted(READERS), default=None,
+            help="Input format (default: from the file extension)",
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            '--errors', dest='errors_path', default=None,
+            help="Write per-row errors to this JSONL file",
+        )
+
+    def handle(self, *args, **options):
+        landlord = self._landlord(options['landlord'])
+        path = options['path']
+        fmt = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+        if fmt not in READERS:
+            raise CommandError("Pass --format csv or --format jsonl")
+
+        def progress(result):
+            self.stdout.write(
+                f"{result.rows} rows: {len(result.created)} created, {len(result.errors)} failed"
+            )
+
+        stream = open_text(sys.stdin.buffer) if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        with stream:
+            result = import_rows(
+                READERS[fmt](stream), landlord,
+                chunk_size=max(options['chunk_size'], 1),
+                on_progress=progress,
+            )
+
+        if options['errors_path']:
+            with open(options['errors_path'], 'w') as errors_file:
+                for error in result.errors:
+                    errors_file.write(json.dumps({'row': error.row, 'errors': error.errors}) + '\n')
+        else:
+            for error in result.errors[:20]:
+                self.stderr.write(f"Row {error.row}: {json.dumps(error.errors)}")
+            if len(result.errors) > 20:
+                self.stderr.write(f"... {len(result.errors) - 20} more (use --errors to save them all)")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Import finished: {len(result.created)} created, {len(result.errors)} failed."
+        ))
+
+    def _landlord(self, value):
+        User = get_user_model()
+        lookup = {'email': value} if '@' in value else {'pk': value}
+        try:
+            return User.objects.get(**lookup)
+        except (User.DoesNotExist, ValueError):
+            raise CommandError(f"Landlord {value!r} not found")
@@ -0,0 +1,40 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from properties.media import MediaProcessor, requeue_stale
+
+
+class Command(BaseCommand):
+    help = "Generate renditions and thumbnails for pending property media"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Size of the process pool")
+        parser.add_argument(
+            '--watch', type=float, default=None, metavar='SECONDS',
+            help="Keep running, polling for new uploads at this interval",
+        )
+        parser.add_argument(
+            '--requeue-after', type=int, default=30, metavar='MINUTES',
+            help="Retry rows left in 'processing' for this long",
+        )
+
+    def handle(self, *args, **options):
+        processor = MediaProcessor(**({'workers': options['workers']} if options['workers'] else {}))
+        stale_after = timedelta(minutes=options['requeue_after'])
+        try:
+            while True:
+                requeued = requeue_stale(stale_after)
+                if requeued:
+                    self.stdout.write(f"Requeued {requeued} stale media rows.")
+                completed, failed = processor.process_pending()
+                if completed or failed:
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✅ Media processed: {completed} completed, {failed} failed."
+                    ))
+                if options['watch'] is None:
+                    break
+                time.sleep(options['watch'])
+        finally:
+            processor.shutdown()
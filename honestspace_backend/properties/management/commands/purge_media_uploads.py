@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from properties.uploads import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Abort expired resumable media uploads and delete their partial files"
+
+    def handle(self, *args, **options):
+        purged = purge_expired()
+        self.stdout.write(self.style.SUCCESS(f"✅ Expired uploads purged: {purged}."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from properties.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the weekly and monthly analytics rollups from the daily rows"
+
+    def handle(self, *args, **options):
+        written = refresh_rollups()
+        self.stdout.write(self.style.SUCCESS(f"✅ Analytics rollup rows written: {written}."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from properties.market import refresh_market_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute neighborhood market statistics (run nightly)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--neighborhood', dest='neighborhood_ids', action='append', type=int, default=None,
+            help="Only recompute this neighborhood (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        written = refresh_market_stats(options['neighborhood_ids'])
+        self.stdout.write(self.style.SUCCESS(f"✅ Market statistics rebuilt: {written} rows."))
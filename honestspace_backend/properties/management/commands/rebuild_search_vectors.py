@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property
+from properties.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored full-text search vectors for properties"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = max(options['batch_size'], 1)
+        ids = Property.objects.order_by('pk').values_list('pk', flat=True)
+        last_id, total = None, 0
+
+        while True:
+            batch = ids.filter(pk__gt=last_id) if last_id else ids
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+            total += update_search_vectors(property_ids=batch)
+            last_id = batch[-1]
+            self.stdout.write(f"Indexed {total} properties...")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Search vectors rebuilt for {total} properties."))
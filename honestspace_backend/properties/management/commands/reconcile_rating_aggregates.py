@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from properties.models import Property
+from properties.ratings import rebuild
+
+
+class Command(BaseCommand):
+    help = "Rebuild PropertyRatingAggregate rows from reviews and review ratings"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--property', dest='property_ids', action='append', default=None,
+            help="Only rebuild this property (repeatable)",
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['property_ids']:
+            written = rebuild(property_ids=options['property_ids'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Rebuilt {written} rating aggregates."))
+            return
+
+        batch_size = max(options['batch_size'], 1)
+        ids = Property.objects.order_by('pk').values_list('pk', flat=True)
+        last_id, seen, written = None, 0, 0
+
+        while True:
+            batch = ids.filter(pk__gt=last_id) if last_id else ids
+            batch = list(batch[:batch_size])
+            if not batch:
+                break
+            written += rebuild(property_ids=batch)
+            seen += len(batch)
+            last_id = batch[-1]
+            self.stdout.write(f"Reconciled {seen} properties...")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Rating aggregates rebuilt: {written} properties with approved reviews."
+        ))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from properties import benchmarks
+
+
+class Command(BaseCommand):
+    help = "Time the main endpoints and serializers against seeded data (see properties.benchmarks)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=50, help="Timed runs per scenario")
+        parser.add_argument('--warmup', type=int, default=5, help="Untimed runs per scenario")
+        parser.add_argument('--only', nargs='+', default=None, help="Scenario names to run")
+        parser.add_argument('--output', help="Write the report to this JSON file")
+        parser.add_argument('--compare', help="Report changes against an earlier JSON report")
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 2:
+            raise CommandError("--repeat must be at least 2.")
+        baseline = benchmarks.load(options['compare']) if options['compare'] else None
+
+        self.stdout.write(f"{'scenario':<42} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9} {'queries':>8}")
+
+        def show(name, result):
+            self.stdout.write(
+                f"{name:<42} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f}"
+                f" {result['mean_ms']:>9.2f} {result['queries']:>8}"
+            )
+
+        try:
+            report = benchmarks.run(
+                repeat=options['repeat'], warmup=options['warmup'], only=options['only'], on_result=show,
+            )
+        except benchmarks.BenchmarkError as exc:
+            raise CommandError(str(exc))
+
+        if options['output']:
+            benchmarks.save(report, options['output'])
+            self.stdout.write(self.style.SUCCESS(f"✅ Report written to {options['output']}."))
+
+        if baseline is not None:
+            self.stdout.write(f"\nChanges against {options['compare']}:")
+            self.stdout.write(f"{'scenario':<42} {'metric':<8} {'before':>9} {'after':>9} {'change':>8}")
+            for name, metric, before, after, change in benchmarks.compare(baseline, report):
+                change = f"{change:+.1%}" if change is not None else 'n/a'
+                self.stdout.write(f"{name:<42} {metric:<8} {before:>9} {after:>9} {change:>8}")
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from properties.lifecycle import sweep
+
+
+class Command(BaseCommand):
+    help = (
+        "Expire listings and trust badges past their expiry and purge used or expired "
+        "account tokens, in batches (see properties.lifecycle)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None, help="Rows per UPDATE/DELETE")
+        parser.add_argument(
+            '--pause', type=float, default=None, metavar='SECONDS', help="Sleep between batches",
+        )
+        parser.add_argument(
+            '--watch', type=float, default=None, metavar='SECONDS',
+            help="Keep running, sweeping at this interval",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            counts = sweep(options['batch_size'], options['pause'])
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ Lifecycle sweep: {counts['listings_expired']} listings expired, "
+                f"{counts['badges_deactivated']} badges deactivated, "
+                f"{counts['email_tokens_purged']} email and {counts['reset_tokens_purged']} "
+                f"password reset tokens purged."
+            ))
+            if options['watch'] is None:
+                break
+            time.sleep(options['watch'])
@@ -0,0 +1,152 @@
+# properties/market.py
+"""
+Neighborhood market statistics.
+
+``neighborhood_market_stats`` holds one row per neighborhood and property
+type plus an all-types row (``property_type_id`` NULL), computed in one
+``GROUPING SETS`` statement over active public listings. Property and
+location changes recompute only the affected neighborhoods after commit;
+``rebuild_market_stats`` recomputes everything and is meant to run
+nightly, which also picks up review ratings and the passing of time.
+"""
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connection, transaction
+
+from core.models import Neighborhood
+from .models import NeighborhoodMarketStats, PropertyLocation
+
+STATS_CACHE_TIMEOUT = 60 * 10
+# Property fields the stats depend on
+MARKET_FIELDS = (
+    'rent_amount', 'property_size_sqft', 'property_type', 'status', 'published_at', 'expires_at',
+)
+# pg_advisory_xact_lock(namespace, key) namespace for refreshes. A full
+# refresh holds key 0 exclusively; a scoped one holds it shared plus one
+# key per neighborhood, so overlapping refreshes queue instead of both
+# inserting rows.
+_LOCK_NAMESPACE = 7314
+
+_LOCK_NEIGHBORHOODS_SQL = """
+SELECT pg_advisory_xact_lock(%s, (s.id %% 2147483647)::int)
+FROM (SELECT unnest(%s::bigint[]) AS id ORDER BY 1) s
+"""
+
+_REFRESH_SQL = """
+INSERT INTO neighborhood_market_stats (
+    neighborhood_id, property_type_id, active_listings, median_rent, p25_rent,
+    p75_rent, average_rent_per_sqft, average_rating, review_count,
+    average_days_on_market, computed_at
+)
+SELECT pl.neighborhood_id,
+       p.property_type_id,
+       COUNT(*),
+       percentile_cont(0.5) WITHIN GROUP (ORDER BY p.rent_amount),
+       percentile_cont(0.25) WITHIN GROUP (ORDER BY p.rent_amount),
+       percentile_cont(0.75) WITHIN GROUP (ORDER BY p.rent_amount),
+       AVG(p.rent_amount / NULLIF(p.property_size_sqft, 0)),
+       SUM(ra.rating_sum)::numeric / NULLIF(SUM(ra.review_count), 0),
+       COALESCE(SUM(ra.review_count), 0),
+       AVG(EXTRACT(EPOCH FROM NOW() - COALESCE(p.published_at, p.created_at)) / 86400),
+       NOW()
+FROM properties p
+JOIN property_locations pl ON pl.property_id = p.id
+LEFT JOIN property_rating_aggregates ra ON ra.property_id = p.id
+WHERE p.is_publicly_searchable
+  AND (p.expires_at IS NULL OR p.expires_at > NOW())
+  AND pl.neighborhood_id IS NOT NULL {scope}
+GROUP BY GROUPING SETS ((pl.neighborhood_id, p.property_type_id), (pl.neighborhood_id))
+"""
+
+
+def stats_cache_key(neighborhood_id):
+    return f'neighborhood-market-stats:{neighborhood_id}'
+
+
+@transaction.atomic
+def refresh_market_stats(neighborhood_ids=None):
+    """Recompute stats for the given neighborhoods (all when None). Returns rows written."""
+    if neighborhood_ids is not None:
+        neighborhood_ids = sorted(set(neighborhood_ids) - {None})
+        if not neighborhood_ids:
+            return 0
+
+    with connection.cursor() as cursor:
+        if neighborhood_ids is None:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, 0)', [_LOCK_NAMESPACE])
+            cursor.execute('DELETE FROM neighborhood_market_stats')
+            cursor.execute(_REFRESH_SQL.format(scope=''))
+        else:
+            cursor.execute('SELECT pg_advisory_xact_lock_shared(%s, 0)', [_LOCK_NAMESPACE])
+            cursor.execute(_LOCK_NEIGHBORHOODS_SQL, [_LOCK_NAMESPACE, neighborhood_ids])
+            cursor.execute(
+                'DELETE FROM neighborhood_market_stats WHERE neighborhood_id = ANY(%s)',
+                [neighborhood_ids],
+            )
+            cursor.execute(
+                _REFRESH_SQL.format(scope='AND pl.neighborhood_id = ANY(%s)'), [neighborhood_ids]
+            )
+        written = cursor.rowcount
+
+    if neighborhood_ids is None:
+        neighborhood_ids = list(Neighborhood.objects.values_list('pk', flat=True))
+    keys = [stats_cache_key(pk) for pk in neighborhood_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    return written
+
+
+def schedule_market_refresh(neighborhood_ids):
+    neighborhood_ids = [pk for pk in neighborhood_ids if pk is not None]
+    if neighborhood_ids:
+        transaction.on_commit(lambda: refresh_market_stats(neighborhood_ids))
+
+
+def schedule_market_refresh_for_property(property_id):
+    """Refresh the neighborhood the property is located in, after commit."""
+    def refresh():
+        refresh_market_stats(
+            PropertyLocation.objects.filter(property_id=property_id)
+            .values_list('neighborhood_id', flat=True)
+        )
+    transaction.on_commit(refresh)
+
+
+def stats_to_dict(stats):
+    def number(value):
+        return float(value) if value is not None else None
+
+    return {
+        'property_type': stats.property_type_id,
+        'active_listings': stats.active_listings,
+        'median_rent': number(stats.median_rent),
+        'p25_rent': number(stats.p25_rent),
+        'p75_rent': number(stats.p75_rent),
+        'average_rent_per_sqft': number(stats.average_rent_per_sqft),
+        'average_rating': number(stats.average_rating),
+        'review_count': stats.review_count,
+        'average_days_on_market': number(stats.average_days_on_market),
+        'computed_at': stats.computed_at.isoformat(),
+    }
+
+
+def neighborhood_stats(neighborhood_id, rows=None):
+    """``{'overall': ..., 'by_property_type': [...]}`` from stats rows."""
+    if rows is None:
+        # From the primary: this fills the shared cache right after a refresh.
+        rows = NeighborhoodMarketStats.objects.using(DEFAULT_DB_ALIAS).filter(neighborhood_id=neighborhood_id)
+    overall, by_type = None, []
+    for stats in rows:
+        if stats.property_type_id is None:
+            overall = stats_to_dict(stats)
+        else:
+            by_type.append(stats_to_dict(stats))
+    by_type.sort(key=lambda item: item['property_type'])
+    return {'neighborhood': neighborhood_id, 'overall': overall, 'by_property_type': by_type}
+
+
+def cached_neighborhood_stats(neighborhood_id):
+    key = stats_cache_key(neighborhood_id)
+    data = cache.get(key)
+    if data is None:
+        data = neighborhood_stats(neighborhood_id)
+        cache.set(key, data, STATS_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,237 @@
+# properties/media.py
+"""
+Background processing of uploaded property images.
+
+Media rows saved with ``processing_status='pending'`` are picked up after
+commit by a per-process dispatcher thread, or by the ``process_media``
+command when ``PROPERTY_MEDIA_BACKGROUND`` is off and processing runs as
+its own service. Rows are claimed with ``SKIP LOCKED`` so several
+processes can share the queue, and decoding and encoding happen in a
+process pool (``properties.imaging``) so neither request threads nor the
+GIL pay for it. Each image gets WebP and JPEG renditions at
+``RENDITION_WIDTHS`` plus a ``thumbnail``; their storage names, sizes and
+dimensions are recorded in ``PropertyMedia.renditions``.
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.utils import timezone
+
+from core.background import PeriodicFlusher
+from . import imaging
+from .models import PropertyMedia
+
+logger = logging.getLogger(__name__)
+
+RENDITION_WIDTHS = getattr(settings, 'PROPERTY_MEDIA_RENDITION_WIDTHS', (320, 640, 1280))
+THUMBNAIL_SIZE = getattr(settings, 'PROPERTY_MEDIA_THUMBNAIL_SIZE', (240, 240))
+# Width of the rendition listing cards link to.
+CARD_WIDTH = 640
+WORKERS = getattr(settings, 'PROPERTY_MEDIA_WORKERS', None) or min(os.cpu_count() or 1, 4)
+BATCH_SIZE = 20
+POLL_INTERVAL = 60
+
+PROCESSABLE_TYPES = ('image',)
+
+
+def rendition_name(media, fmt, width):
+    return f'property_renditions/{media.property_id}/{media.pk}/{width}.{fmt}'
+
+
+def pick_rendition(renditions, fmt, width=CARD_WIDTH):
+    """Storage name of the widest rendition no wider than ``width`` (else the smallest), or None."""
+    sizes = (renditions or {}).get(fmt) or {}
+    if not sizes:
+        return None
+    widths = sorted(int(w) for w in sizes)
+    chosen = max((w for w in widths if w <= width), default=widths[0])
+    return sizes[str(chosen)]['name']
+
+
+def rendition_url(media, fmt, width=CARD_WIDTH):
+    name = pick_rendition(media.renditions, fmt, width)
+    return media.file.storage.url(name) if name else None
+
+
+def pending_media():
+    return PropertyMedia.objects.filter(
+        processing_status='pending', media_type__name__in=PROCESSABLE_TYPES,
+    )
+
+
+@transaction.atomic
+def claim(limit=BATCH_SIZE):
+    """Mark up to ``limit`` pending rows as processing and return them."""
+    ids = list(
+        pending_media().select_for_update(skip_locked=True, of=('self',))
+        .order_by('uploaded_at').values_list('pk', flat=True)[:limit]
+    )
+    if not ids:
+        return []
+    PropertyMedia.objects.filter(pk__in=ids).update(
+        processing_status='processing', updated_at=timezone.now()
+    )
+    return list(PropertyMedia.objects.filter(pk__in=ids))
+
+
+def requeue(batch):
+    """Return claimed rows to the queue untouched."""
+    if not batch:
+        return 0
+    return PropertyMedia.objects.filter(pk__in=[media.pk for media in batch]).update(
+        processing_status='pending', updated_at=timezone.now(),
+    )
+
+
+def requeue_stale(older_than=timedelta(minutes=30)):
+    """Return rows stuck in ``processing`` (e.g. a killed worker) to the queue."""
+    return PropertyMedia.objects.filter(
+        processing_status='processing', updated_at__lt=timezone.now() - older_than,
+    ).update(processing_status='pending', updated_at=timezone.now())
+
+
+def store(media, renditions, thumbnail):
+    """Save rendered files for ``media`` and mark it completed."""
+    storage = media.file.storage
+    recorded = {}
+    for fmt, width, height, data in renditions:
+        name = rendition_name(media, fmt, width)
+        if storage.exists(name):
+            storage.delete(name)
+        name = storage.save(name, ContentFile(data))
+        recorded.setdefault(fmt, {})[str(width)] = {
+            'name': name, 'width': width, 'height': height, 'size_bytes': len(data),
+        }
+
+    if media.thumbnail:
+        media.thumbnail.delete(save=False)
+    media.thumbnail.save(f'{media.pk}.jpg', ContentFile(thumbnail), save=False)
+    media.renditions = recorded
+    media.processing_status = 'completed'
+    media.save(update_fields=['thumbnail', 'renditions', 'processing_status', 'updated_at'])
+
+
+def mark_failed(media):
+    media.processing_status = 'failed'
+    media.save(update_fields=['processing_status', 'updated_at'])
+
+
+class MediaProcessor:
+    def __init__(self, workers=WORKERS):
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pid = None
+        # Rows requeued after a worker died; retried one per batch to find the culprit.
+        self._suspects = 0
+        # Nothing is buffered in memory, so there is nothing to flush at exit; a
+        # poll there would claim rows the shutting-down pool cannot take.
+        self.flusher = PeriodicFlusher('property-media', self.poll, POLL_INTERVAL, flush_at_exit=False)
+
+    def _executor(self):
+        with self._lock:
+            # A forked web worker must not reuse its parent's pool.
+            if self._pool is None or self._pid != os.getpid():
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'),
+                )
+                self._pid = os.getpid()
+            return self._pool
+
+    def _discard(self, pool):
+        """Drop ``pool`` after a worker died in it; the next batch starts a new one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def schedule(self):
+        """Process pending media soon, off the request thread."""
+        if getattr(settings, 'PROPERTY_MEDIA_BACKGROUND', True):
+            self.flusher.ensure_started()
+            self.flusher.wake()
+
+    def process_batch(self, limit=BATCH_SIZE):
+        """
+        Claim and process one batch. Returns ``(completed, failed)``; rows
+        caught in a crashed worker pool go back to ``pending`` and count as
+        neither, unless the batch was that row alone.
+        """
+        batch = claim(1 if self._suspects else limit)
+        if not batch:
+            return 0, 0
+        pool = self._executor()
+        futures, broken, stopped = [], [], []
+        for media in batch:
+            try:
+                with media.file.open('rb') as f:
+                    data = f.read()
+            except OSError:
+                logger.exception('Cannot read media %s', media.pk)
+                mark_failed(media)
+                continue
+            try:
+                futures.append((media, pool.submit(imaging.render, data, RENDITION_WIDTHS, THUMBNAIL_SIZE)))
+            except BrokenProcessPool:
+                broken.append(media)
+            except RuntimeError:
+                # The pool or the interpreter is shutting down.
+                stopped.append(media)
+
+        completed = 0
+        for media, future in futures:
+            try:
+                store(media, *future.result())
+            except BrokenProcessPool:
+                broken.append(media)
+            except Exception:
+                logger.exception('Processing media %s failed', media.pk)
+                mark_failed(media)
+            else:
+                completed += 1
+
+        requeued = requeue(stopped)
+        if self._suspects:
+            self._suspects -= 1
+        if broken:
+            self._discard(pool)
+            if len(batch) == 1:
+                logger.error('Media %s crashed the worker pool', batch[0].pk)
+                mark_failed(batch[0])
+            else:
+                logger.warning('Worker pool crashed; requeueing %d media rows', len(broken))
+                self._suspects = requeue(broken)
+                requeued += self._suspects
+        return completed, len(batch) - completed - requeued
+
+    def process_pending(self):
+        """Process batches until the queue is empty. Returns ``(completed, failed)``."""
+        totals = [0, 0]
+        while True:
+            completed, failed = self.process_batch()
+            if not completed and not failed:
+                return tuple(totals)
+            totals[0] += completed
+            totals[1] += failed
+
+    def poll(self):
+        """Background pass: recover rows stranded by a killed process, then process the queue."""
+        requeue_stale()
+        return self.process_pending()
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None and self._pid == os.getpid():
+                self._pool.shutdown()
+            self._pool = None
+
+
+processor = MediaProcessor()
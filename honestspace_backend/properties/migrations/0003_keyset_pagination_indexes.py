@@ -0,0 +1,36 @@
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0002_propertylocation_google_maps_link_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(
+                django.db.models.expressions.OrderBy(django.db.models.expressions.F('published_at'), descending=True, nulls_last=True),
+                django.db.models.expressions.OrderBy(django.db.models.expressions.F('id'), descending=True),
+                name='properties_published_id_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='propertyinquiry',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='inquiries_property_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertyinquiry',
+            index=models.Index(fields=['-created_at', '-id'], name='inquiries_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['property', '-created_at', '-id'], name='reviews_property_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['-created_at', '-id'], name='reviews_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+import core.geo
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0003_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='propertylocation',
+            index=django.contrib.postgres.indexes.GistIndex(core.geo.AsGeography('location'), name='property_locations_geog_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_apiusagelog_request_timestamp'),
+        ('properties', '0006_propertyratingaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NeighborhoodMarketStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('active_listings', models.PositiveIntegerField(default=0)),
+                ('median_rent', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('p25_rent', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('p75_rent', models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True)),
+                ('average_rent_per_sqft', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('average_rating', models.DecimalField(blank=True, decimal_places=2, max_digits=3, null=True)),
+                ('review_count', models.PositiveIntegerField(default=0)),
+                ('average_days_on_market', models.DecimalField(blank=True, decimal_places=1, max_digits=7, null=True)),
+                ('computed_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('neighborhood', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='market_stats', to='core.neighborhood')),
+                ('property_type', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='market_stats', to='properties.propertytype')),
+            ],
+            options={
+                'db_table': 'neighborhood_market_stats',
+                'indexes': [models.Index(fields=['neighborhood', 'property_type'], name='market_stats_neighborhood_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0007_neighborhoodmarketstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='propertymedia',
+            name='renditions',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.AddIndex(
+            model_name='propertymedia',
+            index=models.Index(
+                condition=models.Q(('processing_status', 'pending')),
+                fields=['uploaded_at'],
+                name='property_media_pending_idx',
+            ),
+        ),
+    ]
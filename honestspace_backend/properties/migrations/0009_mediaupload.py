@@ -0,0 +1,47 @@
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0004_apiusagelog_request_timestamp'),
+        ('properties', '0008_propertymedia_renditions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaUpload',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('target', models.CharField(choices=[('property', 'Property media'), ('review', 'Review media')], max_length=10)),
+                ('original_filename', models.CharField(max_length=255)),
+                ('total_size_bytes', models.PositiveBigIntegerField()),
+                ('received_bytes', models.PositiveBigIntegerField(default=0)),
+                ('detected_format', models.CharField(blank=True, max_length=10)),
+                ('chunk_hashes', models.JSONField(blank=True, default=list)),
+                ('digest', models.CharField(blank=True, max_length=64)),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('caption', models.CharField(blank=True, max_length=255)),
+                ('alt_text', models.CharField(blank=True, max_length=255)),
+                ('sort_order', models.PositiveIntegerField(default=0)),
+                ('status', models.CharField(choices=[('uploading', 'Uploading'), ('completed', 'Completed'), ('aborted', 'Aborted')], default='uploading', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('expires_at', models.DateTimeField()),
+                ('media_type', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='core.mediatype')),
+                ('property', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='properties.property')),
+                ('property_media', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='properties.propertymedia')),
+                ('review', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to='properties.review')),
+                ('review_media', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload', to='properties.reviewmedia')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_uploads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'media_uploads',
+                'indexes': [models.Index(fields=['status', 'expires_at'], name='media_uploads_expiry_idx')],
+            },
+        ),
+    ]
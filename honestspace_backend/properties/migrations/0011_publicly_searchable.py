@@ -0,0 +1,66 @@
+import core.geo
+import django.contrib.postgres.indexes
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0010_propertylocation_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='property',
+            name='is_publicly_searchable',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.AddField(
+            model_name='propertylocation',
+            name='is_publicly_searchable',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE properties p SET is_publicly_searchable = TRUE
+            FROM property_status s
+            WHERE s.id = p.status_id AND s.name = 'active' AND s.is_public;
+
+            UPDATE property_locations pl SET is_publicly_searchable = TRUE
+            FROM properties p
+            WHERE p.id = pl.property_id AND p.is_publicly_searchable;
+            """,
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(
+                condition=models.Q(is_publicly_searchable=True), fields=['rent_amount', 'id'],
+                name='properties_public_rent_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(
+                django.db.models.expressions.OrderBy(django.db.models.expressions.F('published_at'), descending=True, nulls_last=True),
+                django.db.models.expressions.OrderBy(django.db.models.expressions.F('id'), descending=True),
+                condition=models.Q(is_publicly_searchable=True),
+                name='properties_public_pub_id_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='propertylocation',
+            index=django.contrib.postgres.indexes.GistIndex(
+                core.geo.AsGeography('location'), condition=models.Q(is_publicly_searchable=True),
+                name='prop_locations_public_geog_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='propertylocation',
+            index=django.contrib.postgres.indexes.GistIndex(
+                condition=models.Q(is_publicly_searchable=True), fields=['location'],
+                name='prop_locations_public_geom_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0011_publicly_searchable'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='property',
+            index=models.Index(fields=['status', 'expires_at'], name='properties_status_expiry_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='propertytrustbadge',
+            index=models.Index(
+                condition=models.Q(is_active=True), fields=['expires_at'],
+                name='trust_badges_active_expiry_idx',
+            ),
+        ),
+    ]
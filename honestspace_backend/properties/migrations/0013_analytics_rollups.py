@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('properties', '0012_lifecycle_expiry_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PropertyMonthlyAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_views', models.PositiveIntegerField(default=0)),
+                ('inquiries', models.PositiveIntegerField(default=0)),
+                ('loves', models.PositiveIntegerField(default=0)),
+                ('shares', models.PositiveIntegerField(default=0)),
+                ('search_appearances', models.PositiveIntegerField(default=0)),
+                ('search_clicks', models.PositiveIntegerField(default=0)),
+                ('social_shares', models.PositiveIntegerField(default=0)),
+                ('social_clicks', models.PositiveIntegerField(default=0)),
+                ('view_to_inquiry_rate', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=5)),
+                ('search_ctr', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=5)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property')),
+            ],
+            options={
+                'verbose_name_plural': 'Property monthly analytics',
+                'db_table': 'property_analytics_monthly',
+                'abstract': False,
+                'unique_together': {('property', 'period_start')},
+            },
+        ),
+        migrations.CreateModel(
+            name='PropertyWeeklyAnalytics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_start', models.DateField()),
+                ('views', models.PositiveIntegerField(default=0)),
+                ('unique_views', models.PositiveIntegerField(default=0)),
+                ('inquiries', models.PositiveIntegerField(default=0)),
+                ('loves', models.PositiveIntegerField(default=0)),
+                ('shares', models.PositiveIntegerField(default=0)),
+                ('search_appearances', models.PositiveIntegerField(default=0)),
+                ('search_clicks', models.PositiveIntegerField(default=0)),
+                ('social_shares', models.PositiveIntegerField(default=0)),
+                ('social_clicks', models.PositiveIntegerField(default=0)),
+                ('view_to_inquiry_rate', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=5)),
+                ('search_ctr', models.DecimalField(decimal_places=4, default=Decimal('0.0000'), max_digits=5)),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('property', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='properties.property')),
+            ],
+            options={
+                'verbose_name_plural': 'Property weekly analytics',
+                'db_table': 'property_analytics_weekly',
+                'abstract': False,
+                'unique_together': {('property', 'period_start')},
+            },
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO property_analytics_monthly (
+                property_id, period_start, views, unique_views, inquiries, loves, shares,
+                search_appearances, search_clicks, social_shares, social_clicks,
+                view_to_inquiry_rate, search_ctr, updated_at
+            )
+            SELECT property_id, date_trunc('month', date)::date,
+                   SUM(views), SUM(unique_views), SUM(inquiries), SUM(loves), SUM(shares),
+                   SUM(search_appearances), SUM(search_clicks), SUM(social_shares), SUM(social_clicks),
+                   LEAST(9.9999, COALESCE(ROUND(SUM(inquiries)::numeric / NULLIF(SUM(views), 0), 4), 0)),
+                   LEAST(9.9999, COALESCE(ROUND(SUM(search_clicks)::numeric / NULLIF(SUM(search_appearances), 0), 4), 0)),
+                   NOW()
+            FROM property_analytics
+            GROUP BY 1, 2;
+
+            INSERT INTO property_analytics_weekly (
+                property_id, period_start, views, unique_views, inquiries, loves, shares,
+                search_appearances, search_clicks, social_shares, social_clicks,
+                view_to_inquiry_rate, search_ctr, updated_at
+            )
+            SELECT property_id, date_trunc('week', date)::date,
+                   SUM(views), SUM(unique_views), SUM(inquiries), SUM(loves), SUM(shares),
+                   SUM(search_appearances), SUM(search_clicks), SUM(social_shares), SUM(social_clicks),
+                   LEAST(9.9999, COALESCE(ROUND(SUM(inquiries)::numeric / NULLIF(SUM(views), 0), 4), 0)),
+                   LEAST(9.9999, COALESCE(ROUND(SUM(search_clicks)::numeric / NULLIF(SUM(search_appearances), 0), 4), 0)),
+                   NOW()
+            FROM property_analytics
+            GROUP BY 1, 2;
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
+from django.db.models import Exists, F, OuterRef, Prefetch, Q, Value, Window
+from django.db.models.functions import RowNumber
 from django.contrib.gis.db import models as gis_models
+from django.contrib.postgres.indexes import GinIndex, GistIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from builtins import property as builtin_property
 from django.utils import timezone
@@ -7,6 +11,8 @@ from decimal import Decimal
 import uuid
 from django.utils.functional import cached_property as builtin_property
 from django.contrib.gis.geos import Point
+from core import refdata
+from core.geo import AsGeography
 
 class PropertyType(models.Model):
     """Types of properties"""
@@ -74,6 +80,92 @@ class PropertyStatus(models.Model):
     
     def __str__(self):
         return self.display_name
+    
+    @property
+    def is_searchable(self):
+        """Listings in this status appear in public searches"""
+        return self.is_public and self.name == 'active'
+
+
+class PropertyQuerySet(models.QuerySet):
+    """Query helpers for property read paths"""
+
+    @staticmethod
+    def primary_images():
+        """Each property's featured image: primary first, then by sort order"""
+        return (
+            PropertyMedia.objects
+            .filter(is_active=True, media_type__name='image')
+            .select_related('media_type')
+            .annotate(image_rank=Window(
+                expression=RowNumber(),
+                partition_by=[F('property_id')],
+                order_by=[F('is_primary').desc(), F('sort_order').asc(), F('uploaded_at').asc()],
+            ))
+            .filter(image_rank=1)
+        )
+
+    @staticmethod
+    def is_loved_by(user):
+        if user is not None and user.is_authenticated:
+            return Exists(
+                LovedProperty.objects.filter(user=user, property=OuterRef('pk'))
+            )
+        return Value(False, output_field=models.BooleanField())
+
+    def publicly_searchable(self):
+        """
+        Live listings: a public, active status and not expired. Reads the
+        denormalized flag, so there is no join to ``property_status`` and
+        the partial indexes on the flag apply.
+        """
+        return self.filter(self._live())
+
+    @staticmethod
+    def _live():
+        now = timezone.now()
+        return Q(Q(expires_at__isnull=True) | Q(expires_at__gt=now), is_publicly_searchable=True)
+
+    def visible_to(self, user):
+        """Listings ``user`` may open: live ones, plus their own when signed in."""
+        visible = self._live()
+        if user is not None and user.is_authenticated:
+            visible |= Q(landlord=user)
+        return self.filter(visible)
+
+    def sync_public_flags(self):
+        """
+        Recompute ``is_publicly_searchable`` for these listings and their
+        locations from the status table, after writes that bypass ``save()``.
+        """
+        searchable_status = PropertyStatus.objects.filter(pk=OuterRef('status_id'), name='active', is_public=True)
+        updated = self.update(is_publicly_searchable=Exists(searchable_status))
+        PropertyLocation.objects.filter(property__in=self.values('pk')).update(
+            is_publicly_searchable=Exists(
+                Property.objects.filter(pk=OuterRef('property_id'), is_publicly_searchable=True)
+            ),
+        )
+        return updated
+
+    def for_listing(self, user=None):
+        """
+        Load everything a listing card needs in a fixed number of queries:
+        one for the page (with joined landlord, type, status and location
+        chain plus an ``is_loved`` subquery) and one for the primary images.
+        """
+        return (
+            self.select_related(
+                'landlord',
+                'property_type',
+                'status',
+                'location__neighborhood__city__county',
+                'rating_aggregate',
+            )
+            .prefetch_related(
+                Prefetch('media', queryset=self.primary_images(), to_attr='primary_images')
+            )
+            .annotate(is_loved=self.is_loved_by(user))
+        )
 
 
 class Property(models.Model):
@@ -166,6 +258,14 @@ class Property(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
     published_at = models.DateTimeField(blank=True, null=True)
     expires_at = models.DateTimeField(blank=True, null=True)
+
+    # Search (maintained by properties.search)
+    search_vector = SearchVectorField(null=True, editable=False)
+    # status.is_searchable, denormalized so public searches need no join
+    # (kept in step by save() and PropertyQuerySet.sync_public_flags())
+    is_publicly_searchable = models.BooleanField(default=False, editable=False)
+
+    objects = PropertyQuerySet.as_manager()
     
     class Meta:
         db_table = 'properties'
@@ -178,6 +278,23 @@ class Property(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['published_at']),
             models.Index(fields=['availability_date']),
+            # Keyset pagination: ORDER BY published_at DESC NULLS LAST, id DESC
+            models.Index(
+                F('published_at').desc(nulls_last=True), F('id').desc(),
+                name='properties_published_id_idx',
+            ),
+            GinIndex(fields=['search_vector'], name='properties_search_idx'),
+            # Public searches (PropertyQuerySet.publicly_searchable) only scan live listings.
+            models.Index(
+                fields=['rent_amount', 'id'], name='properties_public_rent_idx',
+                condition=Q(is_publicly_searchable=True),
+            ),
+            models.Index(
+                F('published_at').desc(nulls_last=True), F('id').desc(),
+                name='properties_public_pub_id_idx', condition=Q(is_publicly_searchable=True),
+            ),
+            # Listing expiry sweep (properties.lifecycle)
+            models.Index(fields=['status', 'expires_at'], name='properties_status_expiry_idx'),
         ]
         ordering = ['-created_at']
     
@@ -186,17 +303,33 @@ class Property(models.Model):
     
     @property
     def is_available(self):
+        now = timezone.now()
         return (
-            self.status.name == 'active' and
-            self.availability_date <= timezone.now().date() and
-            (self.expires_at is None or self.expires_at > timezone.now())
+            self.is_publicly_searchable and
+            self.availability_date <= now.date() and
+            (self.expires_at is None or self.expires_at > now)
         )
     
+    def sync_public_flag(self):
+        """Set ``is_publicly_searchable`` from the status; bulk writes must call this."""
+        status = refdata.by_id(PropertyStatus, self.status_id)
+        self.is_publicly_searchable = status is not None and status.is_searchable
+    
     def save(self, *args, **kwargs):
         if not self.slug:
             from django.utils.text import slugify
             self.slug = slugify(f"{self.title}-{self.id}")
+        was_searchable = self.is_publicly_searchable
+        self.sync_public_flag()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'is_publicly_searchable'}
+        adding = self._state.adding
         super().save(*args, **kwargs)
+        if not adding and self.is_publicly_searchable != was_searchable:
+            PropertyLocation.objects.filter(property=self).update(
+                is_publicly_searchable=self.is_publicly_searchable,
+            )
 
 class PropertyLocation(models.Model):
     """Property location details"""
@@ -232,8 +365,25 @@ class PropertyLocation(models.Model):
     public_transport_distance_m = models.PositiveIntegerField(blank=True, null=True)
     main_road_distance_m = models.PositiveIntegerField(blank=True, null=True)
 
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Copy of property.is_publicly_searchable, for the partial index below
+    is_publicly_searchable = models.BooleanField(default=False, editable=False)
+
     class Meta:
         db_table = "property_locations"
+        indexes = [
+            # Radius and nearest-first searches cast to geography (metres).
+            GistIndex(AsGeography('location'), name='property_locations_geog_idx'),
+            GistIndex(
+                AsGeography('location'), name='prop_locations_public_geog_idx',
+                condition=Q(is_publicly_searchable=True),
+            ),
+            GistIndex(
+                fields=['location'], name='prop_locations_public_geom_idx',
+                condition=Q(is_publicly_searchable=True),
+            ),
+        ]
 
     def __str__(self):
         return f"Location for {self.property.title}"
@@ -261,6 +411,7 @@ class PropertyLocation(models.Model):
             # If Point exists but lat/lng fields are empty, sync them
             self.latitude = self.location.y
             self.longitude = self.location.x
+        self.is_publicly_searchable = self.property.is_publicly_searchable
         super().save(*args, **kwargs)
 
 class PropertyMedia(models.Model):
@@ -302,6 +453,8 @@ class PropertyMedia(models.Model):
         ],
         default='completed'
     )
+    # Generated sizes: {format: {width: {name, width, height, size_bytes}}}
+    renditions = models.JSONField(default=dict, blank=True)
     
     # Timestamps
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -313,6 +466,11 @@ class PropertyMedia(models.Model):
         indexes = [
             models.Index(fields=['property', 'is_active']),
             models.Index(fields=['media_type']),
+            models.Index(
+                fields=['uploaded_at'],
+                name='property_media_pending_idx',
+                condition=models.Q(processing_status='pending'),
+            ),
         ]
     
     def __str__(self):
@@ -395,6 +553,11 @@ class PropertyTrustBadge(models.Model):
     class Meta:
         db_table = 'property_trust_badges'
         unique_together = ['property', 'badge']
+        indexes = [
+            models.Index(
+                fields=['expires_at'], name='trust_badges_active_expiry_idx', condition=Q(is_active=True),
+            ),
+        ]
     
     def __str__(self):
         return f"{self.property.title} - {self.badge.name}"
@@ -506,6 +669,8 @@ class Review(models.Model):
             models.Index(fields=['overall_rating']),
             models.Index(fields=['created_at']),
             models.Index(fields=['is_verified']),
+            models.Index(fields=['property', '-created_at', '-id'], name='reviews_property_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='reviews_created_id_idx'),
         ]
         ordering = ['-created_at']
     
@@ -537,6 +702,86 @@ class ReviewRating(models.Model):
         return f"{self.review} - {self.category.display_name}: {self.rating_value}"
 
 
+class PropertyRatingAggregate(models.Model):
+    """Running review totals per property (maintained by properties.ratings)"""
+    property = models.OneToOneField(
+        Property,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='rating_aggregate'
+    )
+    
+    # Approved reviews only
+    review_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1_count = models.PositiveIntegerField(default=0)
+    rating_2_count = models.PositiveIntegerField(default=0)
+    rating_3_count = models.PositiveIntegerField(default=0)
+    rating_4_count = models.PositiveIntegerField(default=0)
+    rating_5_count = models.PositiveIntegerField(default=0)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, default=Decimal('0.00'))
+    
+    # {category_id: [rating_sum, rating_count]} and {category_id: average}
+    category_totals = models.JSONField(default=dict)
+    category_averages = models.JSONField(default=dict)
+    # Category averages weighted by RatingCategory.weight_factor
+    weighted_category_rating = models.DecimalField(
+        max_digits=3,
+        decimal_places=2,
+        blank=True,
+        null=True
+    )
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'property_rating_aggregates'
+    
+    def __str__(self):
+        return f"Ratings for {self.property_id}: {self.average_rating} ({self.review_count})"
+    
+    def histogram(self):
+        return {value: getattr(self, f'rating_{value}_count') for value in range(1, 6)}
+
+
+class NeighborhoodMarketStats(models.Model):
+    """Rent and demand rollup per neighborhood (maintained by properties.market)"""
+    neighborhood = models.ForeignKey(
+        'core.Neighborhood',
+        on_delete=models.CASCADE,
+        related_name='market_stats'
+    )
+    # Null for the all-types row
+    property_type = models.ForeignKey(
+        PropertyType,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='market_stats'
+    )
+    
+    # Active, publicly listed properties only
+    active_listings = models.PositiveIntegerField(default=0)
+    median_rent = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    p25_rent = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    p75_rent = models.DecimalField(max_digits=12, decimal_places=2, blank=True, null=True)
+    average_rent_per_sqft = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
+    average_rating = models.DecimalField(max_digits=3, decimal_places=2, blank=True, null=True)
+    review_count = models.PositiveIntegerField(default=0)
+    average_days_on_market = models.DecimalField(max_digits=7, decimal_places=1, blank=True, null=True)
+    
+    computed_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        db_table = 'neighborhood_market_stats'
+        indexes = [
+            models.Index(fields=['neighborhood', 'property_type'], name='market_stats_neighborhood_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Market stats for neighborhood {self.neighborhood_id} ({self.property_type_id or 'all'})"
+
+
 class ReviewMedia(models.Model):
     """Images and videos attached to reviews"""
     review = models.ForeignKey(
@@ -572,6 +817,91 @@ class ReviewMedia(models.Model):
         return f"{self.media_type} for review {self.review.id}"
 
 
+class MediaUpload(models.Model):
+    """Resumable upload session for property or review media"""
+    TARGET_CHOICES = [
+        ('property', 'Property media'),
+        ('review', 'Review media'),
+    ]
+    STATUS_CHOICES = [
+        ('uploading', 'Uploading'),
+        ('completed', 'Completed'),
+        ('aborted', 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        'accounts.User',
+        on_delete=models.CASCADE,
+        related_name='media_uploads'
+    )
+    target = models.CharField(max_length=10, choices=TARGET_CHOICES)
+    property = models.ForeignKey(
+        Property,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='media_uploads'
+    )
+    review = models.ForeignKey(
+        Review,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+        related_name='media_uploads'
+    )
+    media_type = models.ForeignKey(
+        'core.MediaType',
+        on_delete=models.PROTECT
+    )
+
+    # File information
+    original_filename = models.CharField(max_length=255)
+    total_size_bytes = models.PositiveBigIntegerField()
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    detected_format = models.CharField(max_length=10, blank=True)
+    # SHA-256 of each received chunk, in order, and of their concatenation
+    chunk_hashes = models.JSONField(default=list, blank=True)
+    digest = models.CharField(max_length=64, blank=True)
+    # Set while a chunk is being copied (properties.uploads.write_chunk)
+    chunk_started_at = models.DateTimeField(blank=True, null=True)
+
+    # Metadata passed on to the media row
+    title = models.CharField(max_length=200, blank=True)
+    caption = models.CharField(max_length=255, blank=True)
+    alt_text = models.CharField(max_length=255, blank=True)
+    sort_order = models.PositiveIntegerField(default=0)
+
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='uploading')
+    property_media = models.OneToOneField(
+        PropertyMedia,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='upload'
+    )
+    review_media = models.OneToOneField(
+        ReviewMedia,
+        on_delete=models.SET_NULL,
+        blank=True,
+        null=True,
+        related_name='upload'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    expires_at = models.DateTimeField()
+
+    class Meta:
+        db_table = 'media_uploads'
+        indexes = [
+            models.Index(fields=['status', 'expires_at'], name='media_uploads_expiry_idx'),
+        ]
+
+    def __str__(self):
+        return f"Upload of {self.original_filename} ({self.received_bytes}/{self.total_size_bytes})"
+
+
 class LovedProperty(models.Model):
     """User's favorite/bookmarked properties"""
     user = models.ForeignKey(
@@ -674,6 +1004,8 @@ class PropertyInquiry(models.Model):
             models.Index(fields=['property', 'status']),
             models.Index(fields=['tenant']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['property', '-created_at', '-id'], name='inquiries_property_created_idx'),
+            models.Index(fields=['-created_at', '-id'], name='inquiries_created_id_idx'),
         ]
         ordering = ['-created_at']
     
@@ -796,4 +1128,51 @@ class PropertyAnalytics(models.Model):
         ]
     
     def __str__(self):
-        return f"Analytics for {self.property.title} on {self.date}"
\ No newline at end of file
+        return f"Analytics for {self.property.title} on {self.date}"
+
+class AnalyticsRollup(models.Model):
+    """
+    ``PropertyAnalytics`` summed over a period (maintained by
+    properties.rollups). Rates are recomputed from the summed counts.
+    """
+    property = models.ForeignKey(Property, on_delete=models.CASCADE, related_name='+')
+    period_start = models.DateField()
+
+    views = models.PositiveIntegerField(default=0)
+    # Sum of daily unique views (visitor-days)
+    unique_views = models.PositiveIntegerField(default=0)
+    inquiries = models.PositiveIntegerField(default=0)
+    loves = models.PositiveIntegerField(default=0)
+    shares = models.PositiveIntegerField(default=0)
+    search_appearances = models.PositiveIntegerField(default=0)
+    search_clicks = models.PositiveIntegerField(default=0)
+    social_shares = models.PositiveIntegerField(default=0)
+    social_clicks = models.PositiveIntegerField(default=0)
+
+    view_to_inquiry_rate = models.DecimalField(max_digits=5, decimal_places=4, default=Decimal('0.0000'))
+    search_ctr = models.DecimalField(max_digits=5, decimal_places=4, default=Decimal('0.0000'))
+
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        abstract = True
+        unique_together = ['property', 'period_start']
+
+    def __str__(self):
+        return f"Analytics for property {self.property_id} from {self.period_start}"
+
+
+class PropertyWeeklyAnalytics(AnalyticsRollup):
+    """Weekly rollup; weeks start on Monday"""
+
+    class Meta(AnalyticsRollup.Meta):
+        db_table = 'property_analytics_weekly'
+        verbose_name_plural = 'Property weekly analytics'
+
+
+class PropertyMonthlyAnalytics(AnalyticsRollup):
+    """Monthly rollup"""
+
+    class Meta(AnalyticsRollup.Meta):
+        db_table = 'property_analytics_monthly'
+        verbose_name_plural = 'Property monthly analytics'
@@ -0,0 +1,19 @@
+# properties/pagination.py
+from core.pagination import KeysetPagination
+
+
+class PropertyCursorPagination(KeysetPagination):
+    """Newest published listings first; unpublished listings sort last"""
+    ordering_field = 'published_at'
+
+
+class InquiryCursorPagination(KeysetPagination):
+    ordering_field = 'created_at'
+
+
+class ReviewCursorPagination(KeysetPagination):
+    ordering_field = 'created_at'
+
+
+class LovedPropertyCursorPagination(KeysetPagination):
+    ordering_field = 'loved_at'
@@ -0,0 +1,230 @@
+# properties/ratings.py
+"""
+Incrementally maintained review totals per property.
+
+``PropertyRatingAggregate`` holds the count, sum and 1-5 histogram of
+approved reviews plus per-``RatingCategory`` sums, so listings can show
+ratings without aggregating ``reviews`` and ``review_ratings``. Signal
+handlers turn each change into a delta that is applied under a row lock in
+the same transaction; ``rebuild()`` recomputes rows from scratch and is
+what the ``reconcile_rating_aggregates`` command runs.
+"""
+from collections import Counter, defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Sum
+
+from core import refdata
+from core.models import RatingCategory
+from .models import PropertyRatingAggregate, Review, ReviewRating
+
+RATING_VALUES = range(1, 6)
+TWO_PLACES = Decimal('0.01')
+
+_COUNTER_FIELDS = ['review_count', 'rating_sum'] + [f'rating_{value}_count' for value in RATING_VALUES]
+
+
+def _round(value):
+    return Decimal(value).quantize(TWO_PLACES, rounding=ROUND_HALF_UP)
+
+
+class RatingDelta:
+    """Change to one property's totals"""
+
+    def __init__(self):
+        self.reviews = Counter()                        # overall rating -> +/- reviews
+        self.categories = defaultdict(lambda: [0, 0])   # category id -> [sum, count]
+
+    def review(self, rating, sign):
+        self.reviews[rating] += sign
+
+    def category(self, category_id, value, sign):
+        totals = self.categories[str(category_id)]
+        totals[0] += sign * value
+        totals[1] += sign
+
+    def __bool__(self):
+        return any(self.reviews.values()) or any(count or total for total, count in self.categories.values())
+
+    def adds(self):
+        return any(n > 0 for n in self.reviews.values()) or any(c > 0 for _, c in self.categories.values())
+
+
+def recalculate(aggregate):
+    """Refresh the averages of ``aggregate`` from its counters."""
+    aggregate.average_rating = (
+        _round(Decimal(aggregate.rating_sum) / aggregate.review_count)
+        if aggregate.review_count else Decimal('0.00')
+    )
+    aggregate.category_averages = {
+        category_id: float(_round(Decimal(total) / count))
+        for category_id, (total, count) in aggregate.category_totals.items() if count
+    }
+    weighted = weights = Decimal(0)
+    for category_id, average in aggregate.category_averages.items():
+        category = refdata.by_id(RatingCategory, category_id)
+        if category is None or not category.is_active:
+            continue
+        weighted += Decimal(str(average)) * category.weight_factor
+        weights += category.weight_factor
+    aggregate.weighted_category_rating = _round(weighted / weights) if weights else None
+
+
+@transaction.atomic
+def apply(property_id, delta):
+    if not delta:
+        return
+    locked = PropertyRatingAggregate.objects.select_for_update()
+    aggregate = locked.filter(property_id=property_id).first()
+    if aggregate is None:
+        if not delta.adds():
+            return
+        PropertyRatingAggregate.objects.get_or_create(property_id=property_id)
+        aggregate = locked.get(property_id=property_id)
+
+    for rating, n in delta.reviews.items():
+        field = f'rating_{rating}_count'
+        setattr(aggregate, field, max(getattr(aggregate, field) + n, 0))
+        aggregate.review_count = max(aggregate.review_count + n, 0)
+        aggregate.rating_sum = max(aggregate.rating_sum + rating * n, 0)
+
+    totals = aggregate.category_totals
+    for category_id, (total, count) in delta.categories.items():
+        current = totals.get(category_id, [0, 0])
+        updated = [current[0] + total, current[1] + count]
+        if updated[1] > 0:
+            totals[category_id] = updated
+        else:
+            totals.pop(category_id, None)
+
+    recalculate(aggregate)
+    aggregate.save()
+
+
+def _apply_all(deltas):
+    # Property order keeps concurrent writers locking rows in the same order.
+    for property_id in sorted(deltas, key=str):
+        apply(property_id, deltas[property_id])
+
+
+# Signal entry points
+
+def review_snapshot(review):
+    if review._state.adding or review.pk is None:
+        return None
+    return Review.objects.filter(pk=review.pk).values(
+        'property_id', 'overall_rating', 'is_approved'
+    ).first()
+
+
+def review_saved(review, old):
+    deltas = defaultdict(RatingDelta)
+    was_counted = bool(old and old['is_approved'])
+    if was_counted:
+        deltas[old['property_id']].review(old['overall_rating'], -1)
+    if review.is_approved:
+        deltas[review.property_id].review(review.overall_rating, 1)
+
+    # Category ratings follow the review in and out of the totals.
+    if old is not None and (
+        was_counted != review.is_approved or old['property_id'] != review.property_id
+    ):
+        category_ratings = list(review.detailed_ratings.values_list('category_id', 'rating_value'))
+        for category_id, value in category_ratings:
+            if was_counted:
+                deltas[old['property_id']].category(category_id, value, -1)
+            if review.is_approved:
+                deltas[review.property_id].category(category_id, value, 1)
+    _apply_all(deltas)
+
+
+def review_deleted(review):
+    # Its category ratings are removed by their own (cascade) delete signals.
+    if review.is_approved:
+        delta = RatingDelta()
+        delta.review(review.overall_rating, -1)
+        apply(review.property_id, delta)
+
+
+def rating_snapshot(rating):
+    if rating._state.adding or rating.pk is None:
+        return None
+    return ReviewRating.objects.filter(pk=rating.pk).values(
+        'review_id', 'category_id', 'rating_value'
+    ).first()
+
+
+def _counted_review(review_id):
+    review = Review.objects.filter(pk=review_id).values('property_id', 'is_approved').first()
+    return review if review and review['is_approved'] else None
+
+
+def rating_saved(rating, old):
+    deltas = defaultdict(RatingDelta)
+    if old is not None:
+        old_review = _counted_review(old['review_id'])
+        if old_review:
+            deltas[old_review['property_id']].category(old['category_id'], old['rating_value'], -1)
+    review = _counted_review(rating.review_id)
+    if review:
+        deltas[review['property_id']].category(rating.category_id, rating.rating_value, 1)
+    _apply_all(deltas)
+
+
+def rating_deleted(rating):
+    review = _counted_review(rating.review_id)
+    if review:
+        delta = RatingDelta()
+        delta.category(rating.category_id, rating.rating_value, -1)
+        apply(review['property_id'], delta)
+
+
+# Full rebuild
+
+@transaction.atomic
+def rebuild(property_ids=None):
+    """Recompute aggregates from the review tables. Returns the rows written."""
+    reviews = Review.objects.filter(is_approved=True)
+    category_ratings = ReviewRating.objects.filter(review__is_approved=True)
+    existing = PropertyRatingAggregate.objects.all()
+    if property_ids is not None:
+        reviews = reviews.filter(property_id__in=property_ids)
+        category_ratings = category_ratings.filter(review__property_id__in=property_ids)
+        existing = existing.filter(property_id__in=property_ids)
+
+    aggregates = {}
+    overall = reviews.order_by().values('property_id').annotate(
+        review_count=Count('id'),
+        rating_sum=Sum('overall_rating'),
+        **{f'rating_{value}_count': Count('id', filter=Q(overall_rating=value)) for value in RATING_VALUES},
+    )
+    for row in overall:
+        aggregates[row['property_id']] = PropertyRatingAggregate(
+            category_totals={}, **{field: row[field] for field in ['property_id'] + _COUNTER_FIELDS}
+        )
+
+    per_category = category_ratings.order_by().values('review__property_id', 'category_id').annotate(
+        total=Sum('rating_value'), count=Count('id'),
+    )
+    for row in per_category:
+        aggregate = aggregates.get(row['review__property_id'])
+        if aggregate is not None:
+            aggregate.category_totals[str(row['category_id'])] = [row['total'], row['count']]
+
+    for aggregate in aggregates.values():
+        recalculate(aggregate)
+
+    existing.filter(
+        ~Exists(Review.objects.filter(property_id=OuterRef('property_id'), is_approved=True))
+    ).delete()
+    PropertyRatingAggregate.objects.bulk_create(
+        aggregates.values(),
+        update_conflicts=True,
+        unique_fields=['property'],
+        update_fields=_COUNTER_FIELDS + [
+            'average_rating', 'category_totals', 'category_averages',
+            'weighted_category_rating', 'updated_at',
+        ],
+    )
+    return len(aggregates)
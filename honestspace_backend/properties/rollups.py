@@ -0,0 +1,204 @@
+# properties/rollups.py
+"""
+Weekly and monthly rollups of ``property_analytics`` for the landlord dashboard.
+
+``PropertyWeeklyAnalytics`` and ``PropertyMonthlyAnalytics`` hold the daily
+rows summed per property and period. They are recomputed from the daily
+rows, never incremented, so a refresh can be repeated safely. The counter
+flush (``properties.analytics``) refreshes the periods it has just written
+in the same transaction. ``refresh_rollups()`` with no keys rebuilds
+everything, e.g. after daily rows were loaded or edited directly.
+
+``portfolio_analytics`` answers a date range with a single query. The range
+is covered by whole months first, then whole weeks, and daily rows only
+for the days left at its ends. A 12-month range therefore reads about 12
+rows per property instead of 365. Rates are recomputed from the summed
+counts, never averaged from daily ratios.
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+
+from .models import PropertyAnalytics, PropertyMonthlyAnalytics, PropertyWeeklyAnalytics
+
+# Coarsest first; units are PostgreSQL date_trunc fields.
+ROLLUPS = (
+    ('month', PropertyMonthlyAnalytics),
+    ('week', PropertyWeeklyAnalytics),
+)
+
+SUMMED = (
+    'views', 'unique_views', 'inquiries', 'loves', 'shares',
+    'search_appearances', 'search_clicks', 'social_shares', 'social_clicks',
+)
+# Dashboard metrics, in the order the dashboard query returns them
+METRICS = ('views', 'unique_views', 'inquiries', 'loves', 'search_appearances', 'search_clicks')
+
+
+def _rate_sql(numerator, denominator):
+    return (
+        f'LEAST(9.9999, COALESCE(ROUND(SUM(pa.{numerator})::numeric'
+        f' / NULLIF(SUM(pa.{denominator}), 0), 4), 0))'
+    )
+
+
+_REFRESH_SQL = f"""
+INSERT INTO {{table}} AS r (
+    property_id, period_start, {', '.join(SUMMED)}, view_to_inquiry_rate, search_ctr, updated_at
+)
+SELECT pa.property_id, date_trunc('{{unit}}', pa.date)::date,
+       {', '.join(f'SUM(pa.{name})' for name in SUMMED)},
+       {_rate_sql('inquiries', 'views')}, {_rate_sql('search_clicks', 'search_appearances')}, NOW()
+FROM property_analytics pa
+{{scope}}
+GROUP BY 1, 2
+ON CONFLICT (property_id, period_start) DO UPDATE SET
+    {', '.join(f'{name} = EXCLUDED.{name}' for name in SUMMED)},
+    view_to_inquiry_rate = EXCLUDED.view_to_inquiry_rate,
+    search_ctr = EXCLUDED.search_ctr,
+    updated_at = EXCLUDED.updated_at
+"""
+
+# The periods containing the given (property, day) keys
+_KEYS_SCOPE = """
+JOIN (
+    SELECT DISTINCT k.property_id, date_trunc('{unit}', k.date)::date AS period_start
+    FROM unnest(%s::uuid[], %s::date[]) AS k(property_id, date)
+) k ON k.property_id = pa.property_id
+   AND pa.date >= k.period_start AND pa.date < k.period_start + interval '1 {unit}'
+"""
+
+# pg_advisory_xact_lock(namespace, key) namespace for refreshes. Each
+# refresh sums daily rows as of its own statement, so two flushes of the
+# same property and period must not overlap or the later upsert drops the
+# other's days. Keyed refreshes hold key 0 shared plus one key per
+# property; a full rebuild holds key 0 exclusively.
+_LOCK_NAMESPACE = 7315
+
+_LOCK_PROPERTIES_SQL = """
+SELECT pg_advisory_xact_lock(%s, hashtext(s.id))
+FROM (SELECT DISTINCT unnest(%s::text[]) AS id ORDER BY 1) s
+"""
+
+_DASHBOARD_SQL = f"""
+SELECT p.id, p.title, {', '.join(f'COALESCE(SUM(r.{name}), 0)' for name in METRICS)}
+FROM properties p
+LEFT JOIN ({{rows}}) AS r ON r.property_id = p.id
+WHERE p.landlord_id = %s {{property_scope}}
+GROUP BY ROLLUP ((p.id, p.title))
+"""
+
+_DASHBOARD_ROWS_SQL = f"""
+SELECT property_id, {', '.join(METRICS)} FROM {{table}}
+WHERE {{column}} >= %s AND {{column}} < %s
+  AND property_id IN (SELECT id FROM properties WHERE landlord_id = %s)
+"""
+
+
+@transaction.atomic
+def refresh_rollups(keys=None):
+    """
+    Recompute the rollup rows of the periods containing ``keys``, an iterable
+    of ``(property_id, date)``; every row when None. Returns rows written.
+    """
+    written = 0
+    with connection.cursor() as cursor:
+        if keys is None:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s, 0)', [_LOCK_NAMESPACE])
+            for unit, model in ROLLUPS:
+                cursor.execute(f'DELETE FROM {model._meta.db_table}')
+                cursor.execute(_REFRESH_SQL.format(table=model._meta.db_table, unit=unit, scope=''))
+                written += cursor.rowcount
+            return written
+        keys = sorted({(str(property_id), day) for property_id, day in keys})
+        if not keys:
+            return 0
+        params = [[property_id for property_id, _ in keys], [day for _, day in keys]]
+        cursor.execute('SELECT pg_advisory_xact_lock_shared(%s, 0)', [_LOCK_NAMESPACE])
+        cursor.execute(_LOCK_PROPERTIES_SQL, [_LOCK_NAMESPACE, params[0]])
+        for unit, model in ROLLUPS:
+            cursor.execute(
+                _REFRESH_SQL.format(
+                    table=model._meta.db_table, unit=unit, scope=_KEYS_SCOPE.format(unit=unit),
+                ),
+                params,
+            )
+            written += cursor.rowcount
+    return written
+
+
+def _next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def plan(start, end):
+    """
+    Cover ``start``..``end`` (inclusive dates) with whole months, then whole
+    weeks, then days. Returns ``(model, first, stop)`` half-open ranges.
+    """
+    stop = end + timedelta(days=1)
+    segments = []
+    month = start if start.day == 1 else _next_month(start)
+    last_month = stop.replace(day=1)
+    if month < last_month:
+        segments.append((PropertyMonthlyAnalytics, month, last_month))
+        edges = [(start, month), (last_month, stop)]
+    else:
+        edges = [(start, stop)]
+    for first, last in edges:
+        if first >= last:
+            continue
+        week = first + timedelta(days=-first.weekday() % 7)
+        last_week = last - timedelta(days=last.weekday())
+        if week < last_week:
+            segments.append((PropertyWeeklyAnalytics, week, last_week))
+            days = [(first, week), (last_week, last)]
+        else:
+            days = [(first, last)]
+        segments += [(PropertyAnalytics, a, b) for a, b in days if a < b]
+    return segments
+
+
+def _rates(metrics):
+    def rate(numerator, denominator):
+        return round(numerator / denominator, 4) if denominator else 0.0
+
+    metrics['view_to_inquiry_rate'] = rate(metrics['inquiries'], metrics['views'])
+    metrics['search_ctr'] = rate(metrics['search_clicks'], metrics['search_appearances'])
+    return metrics
+
+
+def portfolio_analytics(landlord, start, end, property_id=None):
+    """
+    Totals for ``landlord``'s listings over ``start``..``end``, per listing
+    (most viewed first) and for the whole portfolio. One query.
+    """
+    selects, params = [], []
+    for model, first, stop in plan(start, end):
+        column = 'date' if model is PropertyAnalytics else 'period_start'
+        selects.append(_DASHBOARD_ROWS_SQL.format(table=model._meta.db_table, column=column))
+        params += [first, stop, landlord.pk]
+    params.append(landlord.pk)
+    property_scope = ''
+    if property_id is not None:
+        property_scope = 'AND p.id = %s'
+        params.append(property_id)
+    sql = _DASHBOARD_SQL.format(rows=' UNION ALL '.join(selects), property_scope=property_scope)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    listings, totals = [], None
+    for pk, title, *values in rows:
+        metrics = _rates(dict(zip(METRICS, (int(value) for value in values))))
+        if pk is None:
+            totals = metrics
+        else:
+            listings.append({'id': str(pk), 'title': title, **metrics})
+    listings.sort(key=lambda listing: (-listing['views'], listing['title']))
+    return {
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'totals': totals,
+        'properties': listings,
+    }
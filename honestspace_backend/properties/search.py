@@ -0,0 +1,149 @@
+# properties/search.py
+"""
+Ranked full-text search over listings.
+
+Each property stores a weighted ``tsvector`` (title A, neighborhood/city/
+county path B, amenity names C, description D) in ``search_vector``,
+backed by a GIN index. Because the vector spans several tables it is kept
+up to date here rather than by a generated column. Typos in place names
+are handled by rewriting the query with trigram matches against the small
+neighborhood, city and county tables, so listings are still matched by
+the single GIN index.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection, transaction
+from django.core.exceptions import ValidationError
+from django.db.models import F
+
+from core.system_settings import system_settings
+
+SEARCH_CONFIG = 'english'
+
+
+def _validate_similarity(value):
+    # Candidates are found with pg_trgm's ``%`` operator, which uses 0.3.
+    if not 0.3 <= value <= 1:
+        raise ValidationError('Similarity threshold must be between 0.3 and 1')
+
+
+PLACE_CORRECTION = system_settings.declare(
+    'search.place_correction', True, 'boolean',
+    description='Rewrite misspelt place names in search queries',
+)
+# Minimum pg_trgm similarity for a word to be treated as a misspelt place name
+PLACE_SIMILARITY_THRESHOLD = system_settings.declare(
+    'search.place_similarity_threshold', 0.35, 'float', _validate_similarity,
+)
+MAX_QUERY_WORDS = 8
+
+_UPDATE_SQL = """
+UPDATE properties p SET search_vector =
+       setweight(to_tsvector(%(config)s::regconfig, coalesce(p.title, '')), 'A')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(place.path, '')), 'B')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(am.names, '')), 'C')
+    || setweight(to_tsvector(%(config)s::regconfig, coalesce(p.description, '')), 'D')
+FROM properties src
+LEFT JOIN LATERAL (
+    SELECT concat_ws(' ', n.name, c.name, co.name) AS path
+    FROM property_locations pl
+    JOIN neighborhoods n ON n.id = pl.neighborhood_id
+    JOIN cities c ON c.id = n.city_id
+    JOIN counties co ON co.id = c.county_id
+    WHERE pl.property_id = src.id
+) place ON TRUE
+LEFT JOIN LATERAL (
+    SELECT string_agg(a.name, ' ') AS names
+    FROM property_amenities pa
+    JOIN amenities a ON a.id = pa.amenity_id
+    WHERE pa.property_id = src.id
+) am ON TRUE
+WHERE src.id = p.id {scope}
+"""
+
+_PLACE_MATCH_SQL = """
+SELECT w.word, m.name, similarity(m.name, w.word) AS score
+FROM unnest(%s::text[]) AS w(word)
+JOIN LATERAL (
+    SELECT name FROM neighborhoods WHERE name %% w.word
+    UNION SELECT name FROM cities WHERE name %% w.word
+    UNION SELECT name FROM counties WHERE name %% w.word
+) m ON TRUE
+"""
+
+
+def update_search_vectors(property_ids=None, neighborhood_ids=None):
+    """Rebuild ``search_vector`` for the given properties (all when both are None)."""
+    if property_ids is not None and not property_ids:
+        return 0
+    if neighborhood_ids is not None and not neighborhood_ids:
+        return 0
+
+    scope, params = '', {'config': SEARCH_CONFIG}
+    if property_ids is not None:
+        scope += ' AND src.id = ANY(%(property_ids)s::uuid[])'
+        params['property_ids'] = [str(pk) for pk in property_ids]
+    if neighborhood_ids is not None:
+        scope += (
+            ' AND src.id IN (SELECT property_id FROM property_locations'
+            ' WHERE neighborhood_id = ANY(%(neighborhood_ids)s))'
+        )
+        params['neighborhood_ids'] = list(neighborhood_ids)
+
+    with connection.cursor() as cursor:
+        cursor.execute(_UPDATE_SQL.format(scope=scope), params)
+        return cursor.rowcount
+
+
+def schedule_search_update(property_ids=None, neighborhood_ids=None):
+    property_ids = list(property_ids) if property_ids is not None else None
+    neighborhood_ids = list(neighborhood_ids) if neighborhood_ids is not None else None
+    transaction.on_commit(
+        lambda: update_search_vectors(property_ids=property_ids, neighborhood_ids=neighborhood_ids)
+    )
+
+
+def correct_place_names(text):
+    """
+    Replace words that look like misspelt neighborhood, city or county
+    names with the closest name. Returns None when nothing changed.
+    """
+    if not system_settings.get(PLACE_CORRECTION):
+        return None
+    words = re.findall(r'\w+', text)[:MAX_QUERY_WORDS]
+    candidates = [word for word in words if len(word) >= 4 and not word.isdigit()]
+    if not candidates:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(_PLACE_MATCH_SQL, [candidates])
+        rows = cursor.fetchall()
+
+    threshold = system_settings.get(PLACE_SIMILARITY_THRESHOLD)
+    best = {}
+    for word, name, score in rows:
+        if score >= threshold and score > best.get(word, ('', 0))[1]:
+            best[word] = (name, score)
+
+    replacements = {
+        word: name for word, (name, _) in best.items()
+        if name.lower() != word.lower()
+    }
+    if not replacements:
+        return None
+    return ' '.join(replacements.get(word, word) for word in words)
+
+
+def search_properties(queryset, text):
+    """Filter ``queryset`` to listings matching ``text``, annotated with ``search_rank``."""
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type='websearch')
+    corrected = correct_place_names(text)
+    if corrected:
+        query |= SearchQuery(corrected, config=SEARCH_CONFIG, search_type='websearch')
+
+    return (
+        queryset
+        .filter(search_vector=query)
+        .annotate(search_rank=SearchRank(F('search_vector'), query))
+    )
@@ -0,0 +1,401 @@
+# properties/seed.py
+"""
+Synthetic listings for benchmarks and local development.
+
+``seed()`` writes a reproducible dataset (the same ``seed`` always gives
+the same rows) modelled on the frontend's ``generateMockProperties``:
+eight Nairobi neighborhoods, rents of KES 20,000–170,000, every third
+listing verified, every second furnished and every fourth pet friendly,
+the first two to five of eight common amenities, availability within 90
+days and 5–104 reviews averaging 3.0–5.0 stars. Landlords, tenants,
+media rows, landmarks, loves and inquiries are generated around them.
+
+Rows are written with ``bulk_create``, which skips signals, so the work
+the signals would do (search vectors, landmark distances, rating
+aggregates, counters and market statistics) runs once at the end.
+Synthetic users have ``SEED_EMAIL_DOMAIN`` addresses and the password
+``SEED_PASSWORD``; ``reset()`` deletes them, their listings and the synthetic
+landmarks.
+"""
+import random
+import uuid
+from collections import namedtuple
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.gis.geos import Point
+from django.db import transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from accounts.models import User, UserType
+from core.models import (
+    Amenity, AmenityCategory, City, Country, County, Landmark, LandmarkType, MediaType, Neighborhood,
+)
+from . import landmarks, ratings, search
+from .bulk import sync_coordinates
+from .market import refresh_market_stats
+from .models import (
+    LovedProperty, Property, PropertyAmenity, PropertyInquiry, PropertyLocation, PropertyMedia,
+    PropertyStatus, PropertyType, Review,
+)
+
+SEED_EMAIL_DOMAIN = 'seed.honestspace.test'
+SEED_PASSWORD = 'seed-pass-123'
+SEED_LANDMARK_DESCRIPTION = 'Synthetic landmark (properties.seed)'
+CHUNK_SIZE = 1000
+
+Listing = namedtuple('Listing', 'property location media amenities created')
+
+# name: (latitude, longitude, average_rent_range)
+NEIGHBORHOODS = {
+    'Westlands': (-1.2676, 36.8108, 'high'),
+    'Karen': (-1.3194, 36.7073, 'premium'),
+    'Kilimani': (-1.2921, 36.7825, 'high'),
+    'Lavington': (-1.2795, 36.7700, 'premium'),
+    'Runda': (-1.2183, 36.8097, 'premium'),
+    'Muthaiga': (-1.2466, 36.8286, 'premium'),
+    'Kileleshwa': (-1.2806, 36.7848, 'high'),
+    'Parklands': (-1.2630, 36.8160, 'medium'),
+}
+
+# The mock's Apartment, House, Studio, Bedsitter, Maisonette and Villa as
+# PropertyType names, with their bedroom ranges.
+PROPERTY_TYPES = [
+    ('apartment', 1, 3),
+    ('bungalow', 3, 4),
+    ('studio', 0, 0),
+    ('1bedroom', 1, 1),
+    ('maisonette', 3, 5),
+    ('4bedroom', 4, 6),
+]
+
+# (name, category, icon), in the mock's order
+AMENITIES = [
+    ('WiFi', 'on_premise', 'wifi'),
+    ('Parking', 'on_premise', 'car'),
+    ('Security', 'safety', 'shield'),
+    ('Swimming Pool', 'on_premise', 'waves'),
+    ('Gym', 'on_premise', 'dumbbell'),
+    ('Laundry', 'on_premise', 'shirt'),
+    ('Balcony', 'on_premise', 'sun'),
+    ('Garden', 'on_premise', 'trees'),
+]
+
+LANDMARK_TYPES = [
+    ('school', 'graduation-cap'),
+    ('hospital', 'hospital'),
+    ('mall', 'shopping-bag'),
+    ('matatu_stage', 'bus'),
+]
+
+# (status name, share of listings); only active listings are published
+STATUSES = [('active', 0.85), ('pending', 0.1), ('inactive', 0.05)]
+
+MEDIA_PER_PROPERTY = (3, 8)
+REVIEWS_PER_PROPERTY = (5, 104)
+LOVES_PER_PROPERTY = (0, 15)
+INQUIRIES_PER_PROPERTY = (0, 5)
+LANDMARKS_PER_TYPE = 3
+# Listings per landlord, and tenants per listing (at least enough for the largest review count)
+PROPERTIES_PER_LANDLORD = 25
+TENANTS_PER_PROPERTY = 0.2
+
+
+def seed_users():
+    return User.objects.filter(email__endswith=f'@{SEED_EMAIL_DOMAIN}')
+
+
+def reset():
+    """Delete synthetic users, everything that cascades from them and synthetic landmarks."""
+    Landmark.objects.filter(description=SEED_LANDMARK_DESCRIPTION).delete()
+    return seed_users().delete()[0]
+
+
+def reference_data():
+    """Create (or reuse) the reference rows listings point at."""
+    country, _ = Country.objects.get_or_create(
+        code='KEN', defaults={'name': 'Kenya', 'currency_code': 'KES', 'phone_prefix': '+254'},
+    )
+    county, _ = County.objects.get_or_create(name='Nairobi', country=country, defaults={'code': '047'})
+    city, _ = City.objects.get_or_create(name='Nairobi', county=county)
+    neighborhoods = [
+        Neighborhood.objects.get_or_create(
+            name=name, city=city, defaults={'average_rent_range': rent_range},
+        )[0]
+        for name, (_, _, rent_range) in NEIGHBORHOODS.items()
+    ]
+
+    choices = dict(PropertyType.TYPE_CHOICES)
+    types = [
+        (PropertyType.objects.get_or_create(
+            name=name, defaults={'display_name': choices[name], 'category': 'residential'},
+        )[0], bedrooms_min, bedrooms_max)
+        for name, bedrooms_min, bedrooms_max in PROPERTY_TYPES
+    ]
+    status_names = dict(PropertyStatus.STATUS_CHOICES)
+    statuses = [
+        (PropertyStatus.objects.get_or_create(
+            name=name, defaults={'display_name': status_names[name], 'is_public': name == 'active'},
+        )[0], share)
+        for name, share in STATUSES
+    ]
+
+    category_names = dict(AmenityCategory.CATEGORY_CHOICES)
+    amenities = []
+    for sort_order, (name, category_name, icon) in enumerate(AMENITIES):
+        category, _ = AmenityCategory.objects.get_or_create(
+            name=category_name, defaults={'display_name': category_names[category_name]},
+        )
+        amenities.append(Amenity.objects.get_or_create(
+            name=name, category=category, defaults={'icon': icon, 'sort_order': sort_order},
+        )[0])
+
+    landmark_types = [
+        LandmarkType.objects.get_or_create(name=name, defaults={'icon': icon})[0]
+        for name, icon in LANDMARK_TYPES
+    ]
+    image_type, _ = MediaType.objects.get_or_create(
+        name='image', defaults={'max_file_size_mb': 10, 'allowed_formats': ['jpg', 'png', 'webp']},
+    )
+    tenant_type, _ = UserType.objects.get_or_create(type_name='tenant')
+    landlord_type, _ = UserType.objects.get_or_create(type_name='landlord')
+    return {
+        'neighborhoods': neighborhoods,
+        'types': types,
+        'statuses': statuses,
+        'amenities': amenities,
+        'landmark_types': landmark_types,
+        'image_type': image_type,
+        'tenant_type': tenant_type,
+        'landlord_type': landlord_type,
+    }
+
+
+def jitter(rng, center, spread=0.01):
+    """A point near ``(lat, lng)``, as ``(lat, lng)`` decimals"""
+    lat, lng = center
+    return (
+        Decimal(str(round(lat + rng.gauss(0, spread), 6))),
+        Decimal(str(round(lng + rng.gauss(0, spread), 6))),
+    )
+
+
+def make_users(kind, count, user_type, password):
+    users = [
+        User(
+            username=f'seed-{kind}-{i}',
+            email=f'{kind}{i}@{SEED_EMAIL_DOMAIN}',
+            first_name=kind.title(),
+            last_name=str(i),
+            user_type=user_type,
+            password=password,
+            email_verified=True,
+        )
+        for i in range(count)
+    ]
+    return User.objects.bulk_create(users, batch_size=CHUNK_SIZE)
+
+
+def make_landmarks(rng, ref):
+    rows = []
+    for neighborhood in ref['neighborhoods']:
+        lat, lng, _ = NEIGHBORHOODS[neighborhood.name]
+        for landmark_type in ref['landmark_types']:
+            for i in range(LANDMARKS_PER_TYPE):
+                point_lat, point_lng = jitter(rng, (lat, lng), 0.015)
+                rows.append(Landmark(
+                    name=f'{neighborhood.name} {landmark_type.name.replace("_", " ").title()} {i + 1}',
+                    landmark_type=landmark_type,
+                    neighborhood=neighborhood,
+                    location=Point(float(point_lng), float(point_lat)),
+                    description=SEED_LANDMARK_DESCRIPTION,
+                    is_verified=True,
+                ))
+    return Landmark.objects.bulk_create(rows)
+
+
+def weighted(rng, choices):
+    return rng.choices([value for value, _ in choices], weights=[share for _, share in choices])[0]
+
+
+def make_listing(rng, index, ref, landlords, now):
+    property_type, bedrooms_min, bedrooms_max = rng.choice(ref['types'])
+    neighborhood = rng.choice(ref['neighborhoods'])
+    status = weighted(rng, ref['statuses'])
+    rent = Decimal(rng.randrange(20_000, 170_001, 500))
+    amenities = ref['amenities'][:rng.randint(2, 5)]
+    amenity_names = {amenity.name for amenity in amenities}
+    bedrooms = rng.randint(bedrooms_min, bedrooms_max)
+    title = f'{bedrooms or "Studio"}{" Bedroom" if bedrooms else ""} {property_type.display_name} in {neighborhood.name}'
+    created = now - timedelta(days=rng.randint(0, 365), minutes=rng.randint(0, 1440))
+
+    prop = Property(
+        id=uuid.UUID(int=rng.getrandbits(128), version=4),
+        title=title,
+        description=(
+            f'Well kept {property_type.display_name.lower()} in {neighborhood.name}, '
+            f'close to shops and public transport. Amenities: {", ".join(sorted(amenity_names))}.'
+        ),
+        landlord=rng.choice(landlords),
+        property_type=property_type,
+        status=status,
+        rent_amount=rent,
+        deposit_amount=rent * rng.choice((1, 2, 3)),
+        property_size_sqft=rng.randint(500, 2500),
+        bedrooms=bedrooms,
+        bathrooms=max(1, bedrooms - rng.randint(0, 1)),
+        parking_spaces=rng.randint(1, 2) if 'Parking' in amenity_names else 0,
+        is_furnished=index % 2 == 0,
+        is_pet_friendly=index % 4 == 0,
+        has_garden='Garden' in amenity_names,
+        has_pool='Swimming Pool' in amenity_names,
+        has_gym='Gym' in amenity_names,
+        availability_date=(now + timedelta(days=rng.randint(0, 90))).date(),
+        is_verified=index % 3 == 0,
+        verification_date=created if index % 3 == 0 else None,
+        view_count=int(rng.paretovariate(1.5) * 40),
+        published_at=created if status.name == 'active' else None,
+    )
+    # As in Property.save() and PropertyLocation.save(), which bulk writes bypass
+    prop.slug = slugify(f'{prop.title}-{prop.id}')
+    prop.sync_public_flag()
+
+    lat, lng, _ = NEIGHBORHOODS[neighborhood.name]
+    latitude, longitude = jitter(rng, (lat, lng))
+    location = PropertyLocation(
+        property=prop,
+        address_line_1=f'{rng.randint(1, 400)} {neighborhood.name} Road',
+        neighborhood=neighborhood,
+        latitude=latitude,
+        longitude=longitude,
+        address_verified=prop.is_verified,
+        coordinates_verified=prop.is_verified,
+        public_transport_distance_m=rng.randint(50, 2000),
+        main_road_distance_m=rng.randint(20, 1500),
+        is_publicly_searchable=prop.is_publicly_searchable,
+    )
+    sync_coordinates(location)
+
+    media = [
+        PropertyMedia(
+            property=prop,
+            media_type=ref['image_type'],
+            file=f'property_media/seed/{prop.pk}-{n}.jpg',
+            original_filename=f'photo-{n}.jpg',
+            file_size_bytes=rng.randint(150_000, 4_000_000),
+            alt_text=f'{title}, photo {n + 1}',
+            sort_order=n,
+            is_primary=n == 0,
+            processing_status='completed',
+        )
+        for n in range(rng.randint(*MEDIA_PER_PROPERTY))
+    ]
+    links = [PropertyAmenity(property=prop, amenity=amenity) for amenity in amenities]
+    return Listing(prop, location, media, links, created)
+
+
+def make_activity(rng, prop, tenants, now):
+    """Reviews, loves and inquiries for one listing"""
+    target = rng.uniform(3.0, 5.0)
+    reviewers = rng.sample(tenants, min(rng.randint(*REVIEWS_PER_PROPERTY), len(tenants)))
+    reviews = [
+        Review(
+            property=prop,
+            tenant=tenant,
+            overall_rating=min(5, max(1, round(rng.gauss(target, 0.8)))),
+            title=f'Stayed {rng.randint(3, 36)} months',
+            review_text='Synthetic review for benchmarking.',
+            is_verified=rng.random() < 0.4,
+        )
+        for tenant in reviewers
+    ]
+    loves = [
+        LovedProperty(user=tenant, property=prop)
+        for tenant in rng.sample(tenants, min(rng.randint(*LOVES_PER_PROPERTY), len(tenants)))
+    ]
+    inquiries = [
+        PropertyInquiry(
+            property=prop,
+            tenant=rng.choice(tenants),
+            subject=f'Enquiry about {prop.title}'[:200],
+            message='Is this still available? I would like to arrange a viewing.',
+            desired_move_in_date=(now + timedelta(days=rng.randint(7, 60))).date(),
+        )
+        for _ in range(rng.randint(*INQUIRIES_PER_PROPERTY))
+    ]
+    prop.love_count = len(loves)
+    prop.inquiry_count = len(inquiries)
+    return reviews, loves, inquiries
+
+
+@transaction.atomic
+def insert_chunk(rng, listings, tenants, now):
+    """Insert ``Listing`` tuples with their activity. Returns row counts."""
+    properties = [listing.property for listing in listings]
+    reviews, loves, inquiries = [], [], []
+    for prop in properties:
+        for rows, new_rows in zip((reviews, loves, inquiries), make_activity(rng, prop, tenants, now)):
+            rows.extend(new_rows)
+
+    Property.objects.bulk_create(properties)
+    PropertyLocation.objects.bulk_create([listing.location for listing in listings])
+    PropertyMedia.objects.bulk_create([media for listing in listings for media in listing.media])
+    PropertyAmenity.objects.bulk_create([link for listing in listings for link in listing.amenities])
+    Review.objects.bulk_create(reviews, batch_size=CHUNK_SIZE)
+    LovedProperty.objects.bulk_create(loves, batch_size=CHUNK_SIZE)
+    PropertyInquiry.objects.bulk_create(inquiries, batch_size=CHUNK_SIZE)
+
+    # auto_now_add overrides assigned values, so creation dates are spread after insert.
+    for listing in listings:
+        listing.property.created_at = listing.created
+    Property.objects.bulk_update(properties, ['created_at'], batch_size=CHUNK_SIZE)
+    return {'reviews': len(reviews), 'loves': len(loves), 'inquiries': len(inquiries)}
+
+
+def seed(properties=2000, seed=42, reset_existing=False, on_progress=None):
+    """
+    Write ``properties`` synthetic listings and their surroundings.
+    Returns the number of rows created per kind.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    if reset_existing:
+        reset()
+    elif seed_users().exists():
+        raise ValueError('Synthetic data already exists; reset it first.')
+
+    ref = reference_data()
+    password = make_password(SEED_PASSWORD)
+    landlords = make_users(
+        'landlord', max(properties // PROPERTIES_PER_LANDLORD, 1), ref['landlord_type'], password,
+    )
+    tenants = make_users(
+        'tenant', max(int(properties * TENANTS_PER_PROPERTY), REVIEWS_PER_PROPERTY[1]),
+        ref['tenant_type'], password,
+    )
+    counts = {
+        'landlords': len(landlords), 'tenants': len(tenants), 'landmarks': len(make_landmarks(rng, ref)),
+        'properties': 0, 'reviews': 0, 'loves': 0, 'inquiries': 0,
+    }
+
+    property_ids = []
+    for start in range(0, properties, CHUNK_SIZE):
+        listings = [
+            make_listing(rng, index, ref, landlords, now)
+            for index in range(start, min(start + CHUNK_SIZE, properties))
+        ]
+        for kind, count in insert_chunk(rng, listings, tenants, now).items():
+            counts[kind] += count
+        counts['properties'] += len(listings)
+        property_ids.extend(listing.property.pk for listing in listings)
+        if on_progress:
+            on_progress(counts)
+
+    # The per-row signal work bulk_create skipped
+    search.update_search_vectors(property_ids=property_ids)
+    landmarks.refresh_property_landmarks(property_ids=property_ids)
+    ratings.rebuild(property_ids)
+    refresh_market_stats([neighborhood.pk for neighborhood in ref['neighborhoods']])
+    return counts
@@ -1,18 +1,23 @@
 # properties/serializers.py
 from rest_framework import serializers
 from django.db import transaction
+from django.utils import timezone
 from .models import (
     Property, PropertyLocation, PropertyMedia, PropertyAmenity,
-    PropertyType, PropertyStatus,
-    LovedProperty
+    PropertyType, PropertyStatus, PropertyRatingAggregate,
+    LovedProperty, MediaUpload, Review
 )
 from core.models import Neighborhood
 from core.serializers import NeighborhoodSerializer 
 from core.models import (Amenity, AmenityCategory, MediaType,)
+from core import refdata
+from . import media as media_processing
+from . import uploads
 from core.models import Neighborhood
 from accounts.serializers import UserSerializer
 from django.contrib.gis.geos import Point
 import re
+from datetime import timedelta
 from rest_framework.exceptions import ValidationError
 
 class PropertyTypeSerializer(serializers.ModelSerializer):
@@ -47,6 +52,9 @@ def extract_coordinates(google_maps_url):
     
     return None, None
 class PropertyLocationSerializer(serializers.ModelSerializer):
+    neighborhood = refdata.ReferenceRelatedField(
+        queryset=Neighborhood.objects.all(), required=False, allow_null=True
+    )
     neighborhood_details = NeighborhoodSerializer(source="neighborhood", read_only=True)
     full_address = serializers.ReadOnlyField()
 
@@ -97,20 +105,29 @@ class MediaTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'max_file_size_mb', 'allowed_formats']
 
 class PropertyMediaSerializer(serializers.ModelSerializer):
+    media_type = refdata.ReferenceRelatedField(queryset=MediaType.objects.all())
     media_type_details = MediaTypeSerializer(source='media_type', read_only=True)
     file_url = serializers.SerializerMethodField()
     thumbnail_url = serializers.SerializerMethodField()
+    renditions = serializers.SerializerMethodField()
     
     class Meta:
         model = PropertyMedia
         fields = [
             'id', 'media_type', 'media_type_details', 'file_url', 'thumbnail_url',
             'sort_order', 'alt_text', 'file_size_bytes', 'original_filename',
-            'uploaded_at'
+            'processing_status', 'renditions', 'uploaded_at'
+        ]
+        read_only_fields = [
+            'id', 'file_size_bytes', 'original_filename', 'processing_status', 'uploaded_at'
         ]
-        read_only_fields = ['id', 'file_size_bytes', 'original_filename', 'uploaded_at']
+    
+    def _absolute(self, url):
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request and url else url
     
     def get_file_url(self, obj):
+        file = obj.file
         if file:
             request = self.context.get('request')
             if request:
@@ -125,6 +142,35 @@ class PropertyMediaSerializer(serializers.ModelSerializer):
                 return request.build_absolute_uri(obj.thumbnail.url)
             return obj.thumbnail.url
         return None
+    
+    def get_renditions(self, obj):
+        storage = obj.file.storage
+        return {
+            fmt: [
+                {
+                    'width': info['width'], 'height': info['height'],
+                    'size_bytes': info['size_bytes'], 'url': self._absolute(storage.url(info['name'])),
+                }
+                for _, info in sorted(sizes.items(), key=lambda item: int(item[0]))
+            ]
+            for fmt, sizes in (obj.renditions or {}).items()
+        }
+
+class CardImageSerializer(PropertyMediaSerializer):
+    """Featured image of a listing card, with links to card-sized renditions"""
+    card_url = serializers.SerializerMethodField()
+    card_webp_url = serializers.SerializerMethodField()
+    
+    class Meta(PropertyMediaSerializer.Meta):
+        fields = PropertyMediaSerializer.Meta.fields + ['card_url', 'card_webp_url']
+    
+    def get_card_url(self, obj):
+        # Originals are served until processing has produced a rendition.
+        url = media_processing.rendition_url(obj, 'jpeg')
+        return self._absolute(url) if url else self.get_file_url(obj)
+    
+    def get_card_webp_url(self, obj):
+        return self._absolute(media_processing.rendition_url(obj, 'webp'))
 
 class AmenityCategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -133,6 +179,7 @@ class AmenityCategorySerializer(serializers.ModelSerializer):
 
 class AmenitySerializer(serializers.ModelSerializer):
     category_details = AmenityCategorySerializer(source='category', read_only=True)
+    icon_name = serializers.CharField(source='icon', read_only=True)
     
     class Meta:
         model = Amenity
@@ -159,6 +206,13 @@ class PropertyAmenitySerializer(serializers.ModelSerializer):
             return obj.verified_by.get_full_name()
         return None
 
+def get_rating_aggregate(obj):
+    # Select 'rating_aggregate' with the property to avoid a query per row
+    try:
+        return obj.rating_aggregate
+    except PropertyRatingAggregate.DoesNotExist:
+        return None
+
 class PropertyListSerializer(serializers.ModelSerializer):
     """Lightweight serializer for property listings"""
     landlord_name = serializers.SerializerMethodField()
@@ -167,6 +221,10 @@ class PropertyListSerializer(serializers.ModelSerializer):
     location = PropertyLocationSerializer(read_only=True)
     featured_image = serializers.SerializerMethodField()
     is_loved = serializers.SerializerMethodField()
+    views_count = serializers.IntegerField(source='view_count', read_only=True)
+    distance_m = serializers.SerializerMethodField()
+    reviews_count = serializers.SerializerMethodField()
+    average_rating = serializers.SerializerMethodField()
     
     class Meta:
         model = Property
@@ -175,19 +233,46 @@ class PropertyListSerializer(serializers.ModelSerializer):
             'property_type_display', 'status', 'status_display', 'is_verified',
             'is_furnished', 'is_pet_friendly', 'availability_date',
             'landlord', 'landlord_name', 'location', 'featured_image',
-            'views_count', 'created_at', 'is_loved'
+            'views_count', 'created_at', 'is_loved', 'distance_m',
+            'reviews_count', 'average_rating'
         ]
     
     def get_landlord_name(self, obj):
         return obj.landlord.get_full_name()
     
     def get_featured_image(self, obj):
-        media = obj.media.filter(media_type__name='image').first()
+        # Querysets built with Property.objects.for_listing() carry the
+        # primary image already; anything else falls back to a lookup.
+        images = getattr(obj, 'primary_images', None)
+        if images is not None:
+            media = images[0] if images else None
+        else:
+            media = (
+                obj.media.filter(is_active=True, media_type__name='image')
+                .select_related('media_type')
+                .order_by('-is_primary', 'sort_order', 'uploaded_at')
+                .first()
+            )
         if media:
-            return PropertyMediaSerializer(media, context=self.context).data
+            return CardImageSerializer(media, context=self.context).data
         return None
     
+    def get_reviews_count(self, obj):
+        aggregate = get_rating_aggregate(obj)
+        return aggregate.review_count if aggregate else 0
+    
+    def get_average_rating(self, obj):
+        aggregate = get_rating_aggregate(obj)
+        return float(aggregate.average_rating) if aggregate else 0.0
+    
+    def get_distance_m(self, obj):
+        # Only present when the search was anchored with ?near=lat,lng
+        distance = getattr(obj, 'distance_m', None)
+        return round(distance, 1) if distance is not None else None
+    
     def get_is_loved(self, obj):
+        if hasattr(obj, 'is_loved'):
+            return obj.is_loved
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return LovedProperty.objects.filter(user=request.user, property=obj).exists()
@@ -204,6 +289,8 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
     is_loved = serializers.SerializerMethodField()
     reviews_count = serializers.SerializerMethodField()
     average_rating = serializers.SerializerMethodField()
+    rating_summary = serializers.SerializerMethodField()
+    views_count = serializers.IntegerField(source='view_count', read_only=True)
     
     class Meta:
         model = Property
@@ -214,25 +301,49 @@ class PropertyDetailSerializer(serializers.ModelSerializer):
             'verification_date', 'views_count', 'created_at', 'updated_at',
             'landlord', 'landlord_details', 'property_type', 'property_type_details',
             'status', 'status_details', 'location', 'media', 'amenities',
-            'is_loved', 'reviews_count', 'average_rating'
+            'is_loved', 'reviews_count', 'average_rating', 'rating_summary'
         ]
     
     def get_is_loved(self, obj):
+        if hasattr(obj, 'is_loved'):
+            return obj.is_loved
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             return LovedProperty.objects.filter(user=request.user, property=obj).exists()
         return False
     
     def get_reviews_count(self, obj):
-        # Will implement when reviews model is ready
-        return 0
+        aggregate = get_rating_aggregate(obj)
+        return aggregate.review_count if aggregate else 0
     
     def get_average_rating(self, obj):
-        # Will implement when reviews model is ready
-        return 0.0
+        aggregate = get_rating_aggregate(obj)
+        return float(aggregate.average_rating) if aggregate else 0.0
+    
+    def get_rating_summary(self, obj):
+        aggregate = get_rating_aggregate(obj)
+        if aggregate is None:
+            return None
+        weighted = aggregate.weighted_category_rating
+        return {
+            'histogram': aggregate.histogram(),
+            'category_averages': aggregate.category_averages,
+            'weighted_category_rating': float(weighted) if weighted is not None else None,
+        }
+
+def get_pending_status():
+    """Status given to newly submitted listings"""
+    pending_status = refdata.by_name(PropertyStatus, 'pending')
+    if pending_status is None:
+        pending_status, _ = PropertyStatus.objects.get_or_create(
+            name='pending',
+            defaults={'description': 'Pending verification'}
+        )
+    return pending_status
 
 class PropertyCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating new properties"""
+    property_type = refdata.ReferenceRelatedField(queryset=PropertyType.objects.all())
     location = PropertyLocationSerializer()
     amenities = serializers.ListField(
         child=serializers.IntegerField(),
@@ -267,32 +378,117 @@ class PropertyCreateSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         validated_data['landlord'] = request.user
         
-        pending_status, _ = PropertyStatus.objects.get_or_create(
-            name='pending',
-            defaults={'description': 'Pending verification'}
-        )
-        validated_data['status'] = pending_status
+        validated_data['status'] = get_pending_status()
         
         property_instance = Property.objects.create(**validated_data)
         
         # Use the already validated location serializer data
         PropertyLocation.objects.create(property=property_instance, **location_data)
         
-        for amenity_id in amenities_ids:
-            try:
-                amenity = Amenity.objects.get(id=amenity_id)
-                PropertyAmenity.objects.create(
-                    property=property_instance,
-                    amenity=amenity
-                )
-            except Amenity.DoesNotExist:
-                continue
+        # Unknown amenity ids are skipped
+        amenities = [refdata.by_id(Amenity, amenity_id) for amenity_id in dict.fromkeys(amenities_ids)]
+        PropertyAmenity.objects.bulk_create([
+            PropertyAmenity(property=property_instance, amenity=amenity)
+            for amenity in amenities if amenity is not None
+        ])
         
         return property_instance
 
+class CommaSeparatedIntegerField(serializers.CharField):
+    """Query parameter like ``1,4,7`` parsed into a list of integers"""
+
+    def to_internal_value(self, data):
+        value = super().to_internal_value(data)
+        try:
+            return [int(part) for part in value.split(',') if part.strip()]
+        except ValueError:
+            raise serializers.ValidationError("Expected comma-separated integers")
+
+class FacetQuerySerializer(serializers.Serializer):
+    """Query parameters for the facet search endpoint"""
+    property_types = CommaSeparatedIntegerField(required=False, default=list)
+    amenities = CommaSeparatedIntegerField(required=False, default=list)
+    rent_buckets = CommaSeparatedIntegerField(required=False, default=list)
+    is_furnished = serializers.BooleanField(required=False, allow_null=True, default=None)
+    is_pet_friendly = serializers.BooleanField(required=False, allow_null=True, default=None)
+    utilities_included = serializers.BooleanField(required=False, allow_null=True, default=None)
+    is_verified = serializers.BooleanField(required=False, allow_null=True, default=None)
+    has_garden = serializers.BooleanField(required=False, allow_null=True, default=None)
+    has_pool = serializers.BooleanField(required=False, allow_null=True, default=None)
+    has_gym = serializers.BooleanField(required=False, allow_null=True, default=None)
+    offset = serializers.IntegerField(required=False, default=0, min_value=0)
+    page_size = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+
+class DashboardAnalyticsQuerySerializer(serializers.Serializer):
+    """Query parameters for the landlord dashboard analytics endpoint"""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    property = serializers.UUIDField(required=False)
+
+    def validate(self, attrs):
+        attrs.setdefault('end', timezone.localdate())
+        attrs.setdefault('start', attrs['end'] - timedelta(days=29))
+        if attrs['start'] > attrs['end']:
+            raise ValidationError({'start': ['Must not be after end.']})
+        return attrs
+
+
 class LovedPropertySerializer(serializers.ModelSerializer):
     property_details = PropertyListSerializer(source='property', read_only=True)
     class Meta:
         model = LovedProperty
         fields = ['id', 'property', 'property_details', 'loved_at', 'notes']
-        read_only_fields = ['id', 'loved_at']
\ No newline at end of file
+        read_only_fields = ['id', 'loved_at']
+
+class MediaUploadSerializer(serializers.ModelSerializer):
+    """Resumable upload session; creating one validates the declared file"""
+    media_type = refdata.ReferenceRelatedField(queryset=MediaType.objects.all())
+    property = serializers.PrimaryKeyRelatedField(
+        queryset=Property.objects.all(), required=False, allow_null=True
+    )
+    review = serializers.PrimaryKeyRelatedField(
+        queryset=Review.objects.all(), required=False, allow_null=True
+    )
+    max_chunk_bytes = serializers.SerializerMethodField()
+    
+    class Meta:
+        model = MediaUpload
+        fields = [
+            'id', 'target', 'property', 'review', 'media_type', 'original_filename',
+            'total_size_bytes', 'received_bytes', 'max_chunk_bytes', 'detected_format',
+            'digest', 'title', 'caption', 'alt_text', 'sort_order', 'status',
+            'property_media', 'review_media', 'created_at', 'expires_at'
+        ]
+        read_only_fields = [
+            'id', 'received_bytes', 'detected_format', 'digest', 'status',
+            'property_media', 'review_media', 'created_at', 'expires_at'
+        ]
+    
+    def get_max_chunk_bytes(self, obj):
+        return uploads.MAX_CHUNK_BYTES
+    
+    def validate(self, attrs):
+        user = self.context['request'].user
+        target = attrs['target']
+        if target == 'property':
+            prop = attrs.get('property')
+            if prop is None:
+                raise ValidationError({'property': ['This field is required.']})
+            if prop.landlord_id != user.pk:
+                raise ValidationError({'property': ['You can only add media to your own properties.']})
+            attrs['review'] = None
+        else:
+            review = attrs.get('review')
+            if review is None:
+                raise ValidationError({'review': ['This field is required.']})
+            if review.tenant_id != user.pk:
+                raise ValidationError({'review': ['You can only add media to your own reviews.']})
+            attrs['property'] = None
+        uploads.check_declared(
+            attrs['media_type'], attrs['original_filename'], attrs['total_size_bytes'], target
+        )
+        return attrs
+    
+    def create(self, validated_data):
+        return uploads.start(self.context['request'].user, **validated_data)
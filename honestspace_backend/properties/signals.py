@@ -0,0 +1,184 @@
+# properties/signals.py
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.db import transaction
+from django.dispatch import receiver
+
+from core.models import Amenity, City, County, Landmark, LandmarkType, Neighborhood
+from . import facets, landmarks, market, ratings, search
+from .analytics import counters
+from .media import processor as media_processor
+from .models import (
+    LovedProperty, Property, PropertyAmenity, PropertyInquiry, PropertyLocation, PropertyMedia,
+    PropertyStatus, Review, ReviewRating,
+)
+
+
+def _touches(update_fields, *fields):
+    return update_fields is None or bool(set(update_fields) & set(fields))
+
+
+@receiver(post_save, sender=PropertyLocation, dispatch_uid='property_location_landmarks')
+def refresh_landmarks_for_location(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, 'location', 'latitude', 'longitude'):
+        landmarks.schedule_property_refresh(instance.property_id)
+
+
+@receiver(post_save, sender=Landmark, dispatch_uid='landmark_nearby_properties')
+def refresh_properties_for_landmark(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, 'location', 'is_active', 'landmark_type'):
+        landmarks.schedule_landmark_refresh([instance.pk])
+
+
+@receiver(post_save, sender=LandmarkType, dispatch_uid='landmark_type_radius')
+def refresh_properties_for_landmark_type(sender, instance, created=False, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, 'search_radius_m'):
+        landmarks.schedule_landmark_refresh(
+            instance.landmarks.values_list('pk', flat=True)
+        )
+
+
+@receiver(post_save, sender=Property, dispatch_uid='property_search_vector')
+def refresh_search_vector_for_property(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, 'title', 'description'):
+        search.schedule_search_update(property_ids=[instance.pk])
+
+
+@receiver(post_save, sender=PropertyLocation, dispatch_uid='property_location_search_vector')
+def refresh_search_vector_for_location(sender, instance, update_fields=None, **kwargs):
+    if _touches(update_fields, 'neighborhood'):
+        search.schedule_search_update(property_ids=[instance.property_id])
+
+
+@receiver(post_save, sender=PropertyAmenity, dispatch_uid='property_amenity_search_vector')
+@receiver(post_delete, sender=PropertyAmenity, dispatch_uid='property_amenity_delete_search_vector')
+def refresh_search_vector_for_amenity_link(sender, instance, **kwargs):
+    search.schedule_search_update(property_ids=[instance.property_id])
+
+
+@receiver(post_save, sender=Amenity, dispatch_uid='amenity_rename_search_vector')
+def refresh_search_vector_for_amenity(sender, instance, created=False, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, 'name'):
+        search.schedule_search_update(
+            property_ids=instance.property_amenities.values_list('property_id', flat=True)
+        )
+
+
+@receiver(post_save, sender=Neighborhood, dispatch_uid='neighborhood_rename_search_vector')
+@receiver(post_save, sender=City, dispatch_uid='city_rename_search_vector')
+@receiver(post_save, sender=County, dispatch_uid='county_rename_search_vector')
+def refresh_search_vector_for_place(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or not _touches(update_fields, 'name'):
+        return
+    if sender is Neighborhood:
+        neighborhoods = [instance.pk]
+    elif sender is City:
+        neighborhoods = instance.neighborhoods.values_list('pk', flat=True)
+    else:
+        neighborhoods = Neighborhood.objects.filter(city__county=instance).values_list('pk', flat=True)
+    search.schedule_search_update(neighborhood_ids=neighborhoods)
+
+
+@receiver(post_save, sender=Property, dispatch_uid='property_facet_index')
+@receiver(post_delete, sender=Property, dispatch_uid='property_delete_facet_index')
+def refresh_facet_index_for_property(sender, instance, **kwargs):
+    facets.schedule_facet_refresh(instance.pk)
+
+
+@receiver(post_save, sender=PropertyStatus, dispatch_uid='property_status_public_flags')
+def sync_public_flags_for_status(sender, instance, created=False, raw=False, **kwargs):
+    # A status made (non-)public moves all of its listings in or out of public searches.
+    if created or raw:
+        return
+    Property.objects.filter(status=instance).sync_public_flags()
+    transaction.on_commit(market.refresh_market_stats)
+    if facets.facet_index.is_built:
+        transaction.on_commit(facets.facet_index.rebuild)
+
+
+@receiver(post_save, sender=PropertyAmenity, dispatch_uid='property_amenity_facet_index')
+@receiver(post_delete, sender=PropertyAmenity, dispatch_uid='property_amenity_delete_facet_index')
+def refresh_facet_index_for_amenity_link(sender, instance, **kwargs):
+    facets.schedule_facet_refresh(instance.property_id)
+
+
+@receiver(post_save, sender=PropertyInquiry, dispatch_uid='property_inquiry_counter')
+def count_inquiry(sender, instance, created=False, **kwargs):
+    if created:
+        transaction.on_commit(lambda: counters.record_inquiry(instance.property_id))
+
+
+@receiver(post_save, sender=LovedProperty, dispatch_uid='loved_property_counter')
+def count_love(sender, instance, created=False, **kwargs):
+    if created:
+        transaction.on_commit(lambda: counters.record_love(instance.property_id, 1))
+
+
+@receiver(post_delete, sender=LovedProperty, dispatch_uid='loved_property_delete_counter')
+def count_unlove(sender, instance, **kwargs):
+    transaction.on_commit(lambda: counters.record_love(instance.property_id, -1))
+
+
+@receiver(pre_save, sender=Review, dispatch_uid='review_rating_snapshot')
+def snapshot_review_rating(sender, instance, raw=False, **kwargs):
+    instance._rating_snapshot = None if raw else ratings.review_snapshot(instance)
+
+
+@receiver(post_save, sender=Review, dispatch_uid='review_rating_aggregate')
+def update_ratings_for_review(sender, instance, raw=False, **kwargs):
+    if not raw:
+        ratings.review_saved(instance, getattr(instance, '_rating_snapshot', None))
+
+
+@receiver(post_delete, sender=Review, dispatch_uid='review_delete_rating_aggregate')
+def update_ratings_for_deleted_review(sender, instance, **kwargs):
+    ratings.review_deleted(instance)
+
+
+@receiver(pre_save, sender=ReviewRating, dispatch_uid='review_category_rating_snapshot')
+def snapshot_category_rating(sender, instance, raw=False, **kwargs):
+    instance._rating_snapshot = None if raw else ratings.rating_snapshot(instance)
+
+
+@receiver(post_save, sender=ReviewRating, dispatch_uid='review_category_rating_aggregate')
+def update_ratings_for_category_rating(sender, instance, raw=False, **kwargs):
+    if not raw:
+        ratings.rating_saved(instance, getattr(instance, '_rating_snapshot', None))
+
+
+@receiver(post_delete, sender=ReviewRating, dispatch_uid='review_category_rating_delete_aggregate')
+def update_ratings_for_deleted_category_rating(sender, instance, **kwargs):
+    ratings.rating_deleted(instance)
+
+
+@receiver(post_save, sender=Property, dispatch_uid='property_market_stats')
+def refresh_market_stats_for_property(sender, instance, update_fields=None, raw=False, **kwargs):
+    if not raw and _touches(update_fields, *market.MARKET_FIELDS):
+        market.schedule_market_refresh_for_property(instance.pk)
+
+
+@receiver(pre_save, sender=PropertyLocation, dispatch_uid='property_location_market_snapshot')
+def snapshot_location_neighborhood(sender, instance, raw=False, **kwargs):
+    instance._previous_neighborhood_id = None
+    if not raw and not instance._state.adding:
+        instance._previous_neighborhood_id = (
+            PropertyLocation.objects.filter(pk=instance.pk)
+            .values_list('neighborhood_id', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=PropertyLocation, dispatch_uid='property_location_market_stats')
+def refresh_market_stats_for_location(sender, instance, created=False, raw=False, **kwargs):
+    previous = getattr(instance, '_previous_neighborhood_id', None)
+    if not raw and (created or previous != instance.neighborhood_id):
+        market.schedule_market_refresh([previous, instance.neighborhood_id])
+
+
+@receiver(post_delete, sender=PropertyLocation, dispatch_uid='property_location_delete_market_stats')
+def refresh_market_stats_for_deleted_location(sender, instance, **kwargs):
+    market.schedule_market_refresh([instance.neighborhood_id])
+
+
+@receiver(post_save, sender=PropertyMedia, dispatch_uid='property_media_processing')
+def process_pending_media(sender, instance, raw=False, **kwargs):
+    if not raw and instance.processing_status == 'pending':
+        transaction.on_commit(media_processor.schedule)
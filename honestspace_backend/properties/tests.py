@@ -1,3 +1,1111 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.gis.geos import Point
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import EmailVerificationToken, PasswordResetToken, User, UserType
+from core.renderers import FastJSONRenderer
+from core.models import (
+    Amenity, AmenityCategory, City, Country, County, Landmark, LandmarkType, MediaType,
+    Neighborhood, RatingCategory,
+)
+from . import facets, seed, uploads
+from .analytics import CounterBuffer
+from .benchmarks import Scenarios, compare, percentile
+from .cards import CardBuilder, card_values
+from .conditional import listing_validators
+from .facets import FacetDocument, FacetIndex
+from .landmarks import refresh_property_landmarks
+from .lifecycle import sweep
+from .market import refresh_market_stats
+from .media import CARD_WIDTH, MediaProcessor, rendition_url
+from .ratings import rebuild as rebuild_rating_aggregates
+from .rollups import plan, refresh_rollups
+from .serializers import PropertyListSerializer
+from .search import update_search_vectors
+from .models import (
+    LovedProperty, MediaUpload, Property, PropertyAnalytics, PropertyLandmark, PropertyLocation,
+    PropertyMedia, PropertyMonthlyAnalytics, PropertyRatingAggregate, PropertyStatus, PropertyType,
+    PropertyWeeklyAnalytics, Review, ReviewRating,
+)
+
+
+class PropertyFixturesMixin:
+    """Shared reference data and factories for property tests"""
+
+    @classmethod
+    def setUpTestData(cls):
+        landlord_type, _ = UserType.objects.get_or_create(type_name='landlord')
+        tenant_type, _ = UserType.objects.get_or_create(type_name='tenant')
+        cls.landlord = User.objects.create_user(
+            username='landlord', email='landlord@example.com', password='pass12345',
+            first_name='Lena', last_name='Landlord', user_type=landlord_type,
+        )
+        cls.tenant = User.objects.create_user(
+            username='tenant', email='tenant@example.com', password='pass12345',
+            first_name='Tom', last_name='Tenant', user_type=tenant_type,
+        )
+        cls.property_type = PropertyType.objects.create(
+            name='apartment', display_name='Apartment', category='residential'
+        )
+        cls.active_status = PropertyStatus.objects.create(name='active', display_name='Active')
+        cls.image_type = MediaType.objects.create(
+            name='image', max_file_size_mb=10, allowed_formats=['jpg', 'png', 'webp']
+        )
+        country = Country.objects.create(
+            name='Kenya', code='KEN', currency_code='KES', phone_prefix='+254'
+        )
+        county = County.objects.create(name='Nairobi', code='047', country=country)
+        city = City.objects.create(name='Nairobi', county=county)
+        cls.neighborhood = Neighborhood.objects.create(name='Kilimani', city=city)
+
+    # Yaya Centre, Kilimani
+    default_coordinates = (Decimal('-1.292066'), Decimal('36.782460'))
+
+    @classmethod
+    def make_property(cls, index=0, coordinates=None, **overrides):
+        fields = {
+            'title': f'Apartment {index}',
+            'description': 'Bright two bedroom apartment close to amenities.',
+            'landlord': cls.landlord,
+            'property_type': cls.property_type,
+            'status': cls.active_status,
+            'rent_amount': Decimal('25000.00') + index,
+        }
+        fields.update(overrides)
+        prop = Property.objects.create(**fields)
+        PropertyLocation.objects.create(
+            property=prop,
+            address_line_1=f'{index} Argwings Kodhek Rd',
+            neighborhood=cls.neighborhood,
+            latitude=(coordinates or cls.default_coordinates)[0],
+            longitude=(coordinates or cls.default_coordinates)[1],
+        )
+        for sort_order in range(2):
+            PropertyMedia.objects.create(
+                property=prop,
+                media_type=cls.image_type,
+                file=f'property_media/{prop.pk}-{sort_order}.jpg',
+                original_filename=f'{sort_order}.jpg',
+                file_size_bytes=1024,
+                sort_order=sort_order,
+                is_primary=sort_order == 1,
+            )
+        return prop
+
+
+class PropertyListQueryCountTests(PropertyFixturesMixin, TestCase):
+    """The listing read path must not issue queries per row"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('property-list-create')
+
+    def _list_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response, len(ctx.captured_queries)
+
+    def test_query_count_is_constant_in_page_size(self):
+        for index in range(2):
+            self.make_property(index)
+        _, small_page_queries = self._list_queries()
+
+        for index in range(2, 20):
+            self.make_property(index)
+        response, full_page_queries = self._list_queries()
+
+        self.assertEqual(len(response.data['results']), 20)
+        self.assertEqual(small_page_queries, full_page_queries)
+
+    def test_list_page_query_budget(self):
+        for index in range(20):
+            self.make_property(index)
+        # page (with joined location chain and is_loved) + primary images;
+        # the conditional GET validators only run when the client revalidates
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_primary_image_and_is_loved_come_from_annotations(self):
+        loved = self.make_property(0)
+        self.make_property(1)
+        LovedProperty.objects.create(user=self.tenant, property=loved)
+
+        response, _ = self._list_queries()
+        rows = {row['id']: row for row in response.data['results']}
+
+        self.assertTrue(rows[str(loved.pk)]['is_loved'])
+        self.assertEqual(sum(row['is_loved'] for row in rows.values()), 1)
+        featured = rows[str(loved.pk)]['featured_image']
+        self.assertEqual(featured['original_filename'], '1.jpg')
+        self.assertEqual(
+            rows[str(loved.pk)]['location']['neighborhood_details']['county_name'],
+            'Nairobi',
+        )
+
+
+class PropertyCursorPaginationTests(PropertyFixturesMixin, TestCase):
+    """Keyset pagination walks every listing exactly once"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('property-list-create')
+
+    def test_pages_cover_all_rows_including_ties_and_nulls(self):
+        published_at = timezone.now()
+        expected = set()
+        for index in range(7):
+            # Two listings share each timestamp and one is unpublished.
+            prop = self.make_property(
+                index, published_at=None if index == 6 else published_at - timedelta(days=index // 2)
+            )
+            expected.add(str(prop.pk))
+
+        seen, url, pages = [], f'{self.url}?page_size=2', 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+            pages += 1
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(len(seen), len(expected))
+        self.assertEqual(set(seen), expected)
+
+        previous = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in previous.data['results']], seen[4:6])
+
+    def test_count_modes(self):
+        for index in range(3):
+            self.make_property(index, published_at=timezone.now())
+
+        response = self.client.get(self.url)
+        self.assertIsNone(response.data['count'])
+
+        response = self.client.get(f'{self.url}?count=exact')
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(response.data['count_type'], 'exact')
+
+        response = self.client.get(f'{self.url}?count=estimate')
+        self.assertIsInstance(response.data['count'], int)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(f'{self.url}?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class PropertyGeoSearchTests(PropertyFixturesMixin, TestCase):
+    """near/radius_m, bbox and distance ordering on the list endpoint"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('property-list-create')
+        now = timezone.now()
+        # Roughly 0 m, 1.1 km and 11 km north of the search point.
+        self.here = self.make_property(0, coordinates=(Decimal('-1.292066'), Decimal('36.782460')), published_at=now)
+        self.near = self.make_property(1, coordinates=(Decimal('-1.282066'), Decimal('36.782460')), published_at=now)
+        self.far = self.make_property(2, coordinates=(Decimal('-1.192066'), Decimal('36.782460')), published_at=now)
+
+    def test_radius_filter_and_distance_ordering(self):
+        response = self.client.get(self.url, {
+            'near': '-1.292066,36.782460', 'radius_m': 2000, 'ordering': 'distance',
+        })
+        self.assertEqual(response.status_code, 200)
+        rows = response.data['results']
+        self.assertEqual([row['id'] for row in rows], [str(self.here.pk), str(self.near.pk)])
+        self.assertAlmostEqual(rows[0]['distance_m'], 0, delta=1)
+        self.assertAlmostEqual(rows[1]['distance_m'], 1106, delta=15)
+
+    def test_bbox_filter(self):
+        response = self.client.get(self.url, {'bbox': '36.77,-1.30,36.79,-1.28'})
+        self.assertEqual(
+            {row['id'] for row in response.data['results']},
+            {str(self.here.pk), str(self.near.pk)},
+        )
+
+    def test_distance_ordering_without_point_is_ignored(self):
+        response = self.client.get(self.url, {'ordering': 'distance'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertIsNone(response.data['results'][0]['distance_m'])
+
+    def test_invalid_point_is_rejected(self):
+        response = self.client.get(self.url, {'near': '200,1'})
+        self.assertEqual(response.status_code, 400)
+
+
+class PropertyLandmarkDistanceTests(PropertyFixturesMixin, TestCase):
+    """Set-based landmark distance computation and its incremental hooks"""
+
+    def setUp(self):
+        self.school = LandmarkType.objects.create(name='school', icon='school', search_radius_m=1500)
+        self.prop = self.make_property(0)
+
+    def make_landmark(self, lat, lng, **overrides):
+        fields = {
+            'name': 'Kilimani Primary',
+            'landmark_type': self.school,
+            'neighborhood': self.neighborhood,
+            'location': Point(lng, lat),
+        }
+        fields.update(overrides)
+        return Landmark.objects.create(**fields)
+
+    def test_batch_computation_respects_type_radius(self):
+        near = self.make_landmark(-1.282066, 36.782460)
+        self.make_landmark(-1.262066, 36.782460, name='Too far')
+
+        refresh_property_landmarks()
+
+        pair = PropertyLandmark.objects.get(property=self.prop)
+        self.assertEqual(pair.landmark, near)
+        self.assertAlmostEqual(pair.distance_meters, 1106, delta=15)
+        self.assertEqual(pair.walking_time_minutes, 18)
+
+    def test_moving_a_landmark_recomputes_only_its_pairs(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            landmark = self.make_landmark(-1.282066, 36.782460)
+        self.assertTrue(PropertyLandmark.objects.filter(landmark=landmark).exists())
+
+        landmark.location = Point(36.782460, -1.262066)
+        with self.captureOnCommitCallbacks(execute=True):
+            landmark.save()
+        self.assertFalse(PropertyLandmark.objects.filter(landmark=landmark).exists())
+
+    def test_verified_distances_are_kept(self):
+        landmark = self.make_landmark(-1.282066, 36.782460)
+        refresh_property_landmarks()
+        PropertyLandmark.objects.filter(landmark=landmark).update(
+            distance_meters=1000, distance_verified=True
+        )
+
+        refresh_property_landmarks(property_ids=[self.prop.pk])
+
+        self.assertEqual(PropertyLandmark.objects.get(landmark=landmark).distance_meters, 1000)
+
+
+class PropertySearchTests(PropertyFixturesMixin, TestCase):
+    """q= full-text search with typo-tolerant place names"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('property-list-create')
+        self.garden = self.make_property(0, title='Garden maisonette with borehole')
+        self.studio = self.make_property(
+            1, title='Compact studio', description='Studio near the garden city mall.'
+        )
+        update_search_vectors()
+
+    def test_title_matches_rank_above_description_matches(self):
+        response = self.client.get(self.url, {'q': 'garden'})
+        self.assertEqual(
+            [row['id'] for row in response.data['results']],
+            [str(self.garden.pk), str(self.studio.pk)],
+        )
+
+    def test_misspelt_place_name_still_matches(self):
+        response = self.client.get(self.url, {'q': 'kilimnai'})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_no_match(self):
+        response = self.client.get(self.url, {'q': 'penthouse'})
+        self.assertEqual(response.data['results'], [])
+
+
+class FacetIndexTests(SimpleTestCase):
+    """Bitmap filtering and facet counts without the database"""
+
+    def setUp(self):
+        self.index = FacetIndex()
+        self.index.upsert('a', FacetDocument(1, {10, 11}, frozenset({'is_furnished'}), 2))
+        self.index.upsert('b', FacetDocument(1, {10}, frozenset(), 3))
+        self.index.upsert('c', FacetDocument(2, {11}, frozenset({'is_furnished'}), 2))
+
+    def test_filters_and_newest_first_order(self):
+        result = self.index.query(amenities=[10])
+        self.assertEqual(result.count, 2)
+        self.assertEqual(result.ids, ['b', 'a'])
+
+        result = self.index.query(features={'is_furnished': False})
+        self.assertEqual(result.ids, ['b'])
+
+    def test_disjunctive_facet_counts(self):
+        result = self.index.query(property_types=[1])
+        self.assertEqual(result.count, 2)
+        # Counts for other types ignore the type filter itself.
+        self.assertEqual(result.facets['property_type'], {1: 2, 2: 1})
+        self.assertEqual(result.facets['amenities'], {10: 2, 11: 1})
+        self.assertEqual(result.facets['rent_bucket'], {2: 1, 3: 1})
+
+    def test_update_and_remove(self):
+        self.index.upsert('a', FacetDocument(2, set(), frozenset(), 2))
+        self.assertEqual(self.index.query(property_types=[2]).count, 2)
+        self.assertEqual(self.index.query(amenities=[11]).ids, ['c'])
+
+        self.index.remove('c')
+        result = self.index.query(offset=1, limit=5)
+        self.assertEqual(result.count, 2)
+        self.assertEqual(result.ids, ['a'])
+
+    def test_stale_index_is_served_while_rebuilt_in_the_background(self):
+        index = FacetIndex()
+        index.built_at = time.monotonic() - 10 ** 6
+        with mock.patch.object(facets, 'facet_index', index), \
+                mock.patch.object(index, 'rebuild') as rebuild, \
+                mock.patch.object(facets, '_rebuilder') as rebuilder:
+            self.assertIs(facets.get_facet_index(), index)
+            rebuild.assert_not_called()
+            rebuilder.wake.assert_called_once_with()
+
+
+class PropertyCounterBufferTests(PropertyFixturesMixin, TestCase):
+    """Buffered counters reach PropertyAnalytics and Property in one flush"""
+
+    def setUp(self):
+        cache.clear()
+        self.prop = self.make_property(0)
+        self.buffer = CounterBuffer()
+        self.buffer.flusher.ensure_started = lambda: None
+
+    def test_flush_aggregates_views_and_unique_visitors(self):
+        for visitor in ('u:1', 'u:1', 'u:2'):
+            self.buffer.record_view(self.prop.pk, visitor)
+        self.buffer.record_inquiry(self.prop.pk)
+        self.buffer.record_love(self.prop.pk)
+
+        # daily upsert, property counters, rollup locks, monthly and weekly rollups
+        with self.assertNumQueries(6):
+            self.assertEqual(self.buffer.flush(), 1)
+
+        analytics = PropertyAnalytics.objects.get(property=self.prop)
+        self.assertEqual(
+            (analytics.views, analytics.unique_views, analytics.inquiries, analytics.loves),
+            (3, 2, 1, 1),
+        )
+        self.assertEqual(analytics.view_to_inquiry_rate, Decimal('0.3333'))
+        weekly = PropertyWeeklyAnalytics.objects.get(property=self.prop)
+        self.assertEqual((weekly.views, weekly.inquiries, weekly.view_to_inquiry_rate), (3, 1, Decimal('0.3333')))
+        self.prop.refresh_from_db()
+        self.assertEqual((self.prop.view_count, self.prop.inquiry_count, self.prop.love_count), (3, 1, 1))
+
+    def test_later_flushes_add_to_the_same_day(self):
+        self.buffer.record_view(self.prop.pk, 'u:1')
+        self.buffer.flush()
+        self.buffer.record_view(self.prop.pk, 'u:1')
+        self.buffer.record_love(self.prop.pk, -1)
+        self.buffer.flush()
+
+        analytics = PropertyAnalytics.objects.get(property=self.prop)
+        self.assertEqual((analytics.views, analytics.unique_views), (2, 1))
+        self.prop.refresh_from_db()
+        self.assertEqual(self.prop.love_count, 0)
+        self.assertEqual(self.buffer.flush(), 0)
+
+
+class PropertyImportTests(PropertyFixturesMixin, TestCase):
+    """Streaming CSV import writes valid rows in bulk and reports the rest"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.landlord)
+        category = AmenityCategory.objects.create(name='on_premise', display_name='On-Premise')
+        self.parking = Amenity.objects.create(name='Parking', category=category, icon='car')
+        self.borehole = Amenity.objects.create(name='Borehole', category=category, icon='water')
+
+    def upload(self, rows):
+        body = io.StringIO()
+        writer = csv.writer(body)
+        writer.writerow([
+            'title', 'description', 'property_type', 'rent_amount', 'address_line_1',
+            'neighborhood', 'google_maps_link', 'amenities',
+        ])
+        writer.writerows(rows)
+        return self.client.post(reverse('property-import'), {
+            'file': SimpleUploadedFile('listings.csv', body.getvalue().encode(), content_type='text/csv'),
+        }, format='multipart')
+
+    def test_valid_rows_are_created_and_invalid_rows_reported(self):
+        link = 'https://www.google.com/maps/place/@-1.292066,36.782460,17z'
+        amenities = f'{self.parking.pk};{self.borehole.pk}'
+        response = self.upload([
+            ('Studio A', 'Near Yaya', self.property_type.pk, 18000, '1 Argwings', self.neighborhood.pk, link, amenities),
+            ('Studio B', 'Near Yaya', self.property_type.pk, 0, '2 Argwings', self.neighborhood.pk, link, ''),
+            ('Studio C', 'Near Yaya', self.property_type.pk, 21000, '3 Argwings', self.neighborhood.pk, '', self.parking.pk),
+        ])
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual([error['row'] for error in response.data['errors']], [2])
+        self.assertIn('rent_amount', response.data['errors'][0]['errors'])
+
+        studio = Property.objects.get(title='Studio A')
+        self.assertEqual(studio.landlord, self.landlord)
+        self.assertEqual(studio.status.name, 'pending')
+        self.assertTrue(studio.slug)
+        self.assertAlmostEqual(float(studio.location.latitude), -1.292066, places=5)
+        self.assertAlmostEqual(studio.location.location.x, 36.782460, places=5)
+        self.assertEqual(studio.property_amenities.count(), 2)
+
+
+class PropertyBatchTests(PropertyFixturesMixin, TestCase):
+    """Batch create/update with per-item results and a flat query count"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.landlord)
+        self.url = reverse('property-batch')
+
+    def payload(self, index, **overrides):
+        item = {
+            'title': f'Batch {index}', 'description': 'Bulk listing',
+            'property_type': self.property_type.pk, 'rent_amount': '30000.00',
+            'location': {'address_line_1': f'{index} Ngong Rd', 'neighborhood': self.neighborhood.pk},
+        }
+        item.update(overrides)
+        return item
+
+    def batch_queries(self, size):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(self.url, [self.payload(i) for i in range(size)], format='json')
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        self.batch_queries(1)
+        self.assertEqual(self.batch_queries(2), self.batch_queries(8))
+
+    def test_mixed_batch_reports_each_item(self):
+        existing = self.make_property(0)
+        response = self.client.post(self.url, [
+            self.payload(1),
+            self.payload(2, rent_amount='0'),
+            {'id': str(existing.pk), 'rent_amount': '27500.00'},
+            {'id': '00000000-0000-0000-0000-000000000000', 'title': 'Nope'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(
+            [item['status'] for item in response.data['results']],
+            ['created', 'error', 'updated', 'error'],
+        )
+        existing.refresh_from_db()
+        self.assertEqual(existing.rent_amount, Decimal('27500.00'))
+        self.assertTrue(Property.objects.filter(title='Batch 1', landlord=self.landlord).exists())
+
+
+class PropertyRatingAggregateTests(PropertyFixturesMixin, TestCase):
+    """Review changes keep PropertyRatingAggregate equal to a full rebuild"""
+
+    def setUp(self):
+        self.prop = self.make_property(0)
+        self.cleanliness = RatingCategory.objects.create(
+            name='cleanliness', display_name='Cleanliness', description='', weight_factor=Decimal('2.00')
+        )
+        self.security = RatingCategory.objects.create(
+            name='security', display_name='Security', description='', weight_factor=Decimal('1.00')
+        )
+        self.other_tenant = User.objects.create_user(
+            username='tenant2', email='tenant2@example.com', password='pass12345',
+            user_type=self.tenant.user_type,
+        )
+
+    def review(self, tenant, rating, **overrides):
+        fields = {
+            'property': self.prop, 'tenant': tenant, 'overall_rating': rating,
+            'title': 'Stay', 'review_text': 'Fine',
+        }
+        fields.update(overrides)
+        return Review.objects.create(**fields)
+
+    def aggregate(self):
+        return PropertyRatingAggregate.objects.get(property=self.prop)
+
+    def assertMatchesRebuild(self):
+        incremental = self.aggregate()
+        rebuild_rating_aggregates(property_ids=[self.prop.pk])
+        rebuilt = self.aggregate()
+        for field in ('review_count', 'rating_sum', 'average_rating', 'category_totals',
+                      'weighted_category_rating'):
+            self.assertEqual(getattr(incremental, field), getattr(rebuilt, field), field)
+        self.assertEqual(incremental.histogram(), rebuilt.histogram())
+
+    def test_incremental_updates(self):
+        first = self.review(self.tenant, 4)
+        ReviewRating.objects.create(review=first, category=self.cleanliness, rating_value=5)
+        ReviewRating.objects.create(review=first, category=self.security, rating_value=2)
+        hidden = self.review(self.other_tenant, 1, is_approved=False)
+
+        aggregate = self.aggregate()
+        self.assertEqual((aggregate.review_count, aggregate.average_rating), (1, Decimal('4.00')))
+        # (5 * 2 + 2 * 1) / 3
+        self.assertEqual(aggregate.weighted_category_rating, Decimal('4.00'))
+        self.assertMatchesRebuild()
+
+        hidden.is_approved = True
+        hidden.save()
+        self.assertEqual(self.aggregate().average_rating, Decimal('2.50'))
+        self.assertEqual(self.aggregate().histogram()[1], 1)
+
+        first.is_approved = False
+        first.save()
+        self.assertEqual(self.aggregate().category_totals, {})
+        self.assertMatchesRebuild()
+
+        first.is_approved = True
+        first.save()
+        first.delete()
+        self.assertEqual(self.aggregate().review_count, 1)
+        self.assertMatchesRebuild()
+
+    def test_list_reads_ratings_without_extra_queries(self):
+        self.review(self.tenant, 5)
+        client = APIClient()
+        client.force_authenticate(self.tenant)
+        # page (with joined location chain and is_loved) + primary images;
+        # the conditional GET validators only run when the client revalidates
+        with self.assertNumQueries(2):
+            response = client.get(reverse('property-list-create'))
+        row = response.data['results'][0]
+        self.assertEqual((row['reviews_count'], row['average_rating']), (1, 5.0))
+
+
+class NeighborhoodMarketStatsTests(PropertyFixturesMixin, TestCase):
+    """Neighborhood rollups over active listings, refreshed on change"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.tenant)
+        self.url = reverse('neighborhood-stats', args=[self.neighborhood.pk])
+        self.listings = [
+            self.make_property(i, rent_amount=Decimal(rent), property_size_sqft=1000)
+            for i, rent in enumerate(['20000', '30000', '40000', '50000'])
+        ]
+
+    def test_rollup_and_endpoint(self):
+        refresh_market_stats()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        overall = response.data['overall']
+        self.assertEqual(overall['active_listings'], 4)
+        self.assertEqual(overall['median_rent'], 35000.0)
+        self.assertEqual((overall['p25_rent'], overall['p75_rent']), (27500.0, 42500.0))
+        self.assertEqual(overall['average_rent_per_sqft'], 35.0)
+        self.assertEqual(len(response.data['by_property_type']), 1)
+
+        listing = self.client.get(reverse('neighborhood-list'), {'include': 'stats'})
+        self.assertEqual(listing.data['results'][0]['market_stats']['overall']['active_listings'], 4)
+
+    def test_property_change_refreshes_its_neighborhood(self):
+        refresh_market_stats()
+        self.client.get(self.url)
+
+        listing = self.listings[0]
+        listing.rent_amount = Decimal('60000')
+        with self.captureOnCommitCallbacks(execute=True):
+            listing.save(update_fields=['rent_amount'])
+
+        self.assertEqual(self.client.get(self.url).data['overall']['median_rent'], 45000.0)
+
+    def test_batch_update_refreshes_its_neighborhood(self):
+        refresh_market_stats()
+        self.client.get(self.url)
+
+        landlord = APIClient()
+        landlord.force_authenticate(self.landlord)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = landlord.post(
+                reverse('property-batch'),
+                [{'id': str(self.listings[0].pk), 'rent_amount': '60000.00'}], format='json',
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(self.url).data['overall']['median_rent'], 45000.0)
+
+
+class PropertyMediaProcessingTests(PropertyFixturesMixin, TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.prop = self.make_property()
+        buffer = io.BytesIO()
+        Image.new('RGB', (1600, 1200), (200, 120, 40)).save(buffer, 'JPEG', quality=95)
+        self.media = PropertyMedia.objects.create(
+            property=self.prop,
+            media_type=self.image_type,
+            file=SimpleUploadedFile('photo.jpg', buffer.getvalue(), content_type='image/jpeg'),
+            original_filename='photo.jpg',
+            file_size_bytes=len(buffer.getvalue()),
+            processing_status='pending',
+        )
+        # Threads instead of processes keep the test inside one database connection.
+        self.processor = MediaProcessor()
+        self.processor._executor = lambda: ThreadPoolExecutor(max_workers=1)
+
+    def test_pending_image_gets_renditions_and_thumbnail(self):
+        self.assertEqual(self.processor.process_batch(), (1, 0))
+
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.processing_status, 'completed')
+        self.assertTrue(self.media.thumbnail)
+        self.assertEqual(sorted(self.media.renditions), ['jpeg', 'webp'])
+        webp = self.media.renditions['webp']
+        self.assertEqual(sorted(webp, key=int), ['320', '640', '1280'])
+        self.assertEqual((webp['640']['width'], webp['640']['height']), (640, 480))
+        self.assertLess(webp['640']['size_bytes'], self.media.file_size_bytes)
+        self.assertTrue(rendition_url(self.media, 'jpeg').endswith(f'/{CARD_WIDTH}.jpeg'))
+
+        # Nothing is left to claim.
+        self.assertEqual(self.processor.process_batch(), (0, 0))
+
+    def test_undecodable_upload_is_marked_failed(self):
+        self.media.file.save('broken.jpg', SimpleUploadedFile('broken.jpg', b'not an image'), save=False)
+        self.media.save()
+
+        self.assertEqual(self.processor.process_batch(), (0, 1))
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.processing_status, 'failed')
+
+    def test_crashed_pool_requeues_then_isolates_the_culprit(self):
+        other = PropertyMedia.objects.create(
+            property=self.prop, media_type=self.image_type, file=self.media.file.name,
+            original_filename='copy.jpg', file_size_bytes=1, processing_status='pending',
+        )
+        broken_pool = mock.Mock(submit=mock.Mock(side_effect=BrokenProcessPool))
+        self.processor._executor = lambda: broken_pool
+
+        self.assertEqual(self.processor.process_batch(), (0, 0))
+        self.assertEqual(
+            set(PropertyMedia.objects.filter(pk__in=[self.media.pk, other.pk])
+                .values_list('processing_status', flat=True)),
+            {'pending'},
+        )
+        # Retried one at a time: a lone row that breaks the pool is the culprit.
+        self.assertEqual(self.processor.process_batch(), (0, 1))
+        self.processor._executor = lambda: ThreadPoolExecutor(max_workers=1)
+        self.assertEqual(self.processor.process_batch(), (1, 0))
+
+    def test_shutdown_leaves_claimed_rows_pending(self):
+        pool = ThreadPoolExecutor(max_workers=1)
+        pool.shutdown()
+        self.processor._executor = lambda: pool
+        self.assertFalse(self.processor.flusher.flush_at_exit)
+
+        self.assertEqual(self.processor.process_batch(), (0, 0))
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.processing_status, 'pending')
+
+
+class MediaUploadTests(PropertyFixturesMixin, TestCase):
+    """Chunked uploads: resumable offsets, magic-byte checks and finalizing"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        patcher = mock.patch('properties.uploads.UPLOAD_DIR', self.media_root)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.prop = self.make_property()
+        self.client = APIClient()
+        self.client.force_authenticate(self.landlord)
+        self.body = b'\xff\xd8\xff\xe0' + bytes(range(256)) * 40
+
+    def start(self, **overrides):
+        payload = {
+            'target': 'property', 'property': str(self.prop.pk), 'media_type': self.image_type.pk,
+            'original_filename': 'kitchen.jpeg', 'total_size_bytes': len(self.body),
+        }
+        payload.update(overrides)
+        return self.client.post(reverse('media-upload-create'), payload, format='json')
+
+    def put(self, upload_id, offset, data, **headers):
+        return self.client.put(
+            reverse('media-upload-detail', args=[upload_id]), data,
+            content_type='application/offset+octet-stream', HTTP_UPLOAD_OFFSET=str(offset), **headers
+        )
+
+    def test_chunked_upload_creates_pending_media(self):
+        upload_id = self.start().data['id']
+        self.assertEqual(self.put(upload_id, 0, self.body[:4000]).status_code, 200)
+        # A retried or out-of-order chunk is refused with the offset to resume from.
+        self.assertEqual(self.put(upload_id, 0, self.body[:4000]).status_code, 409)
+        checksum = hashlib.sha256(self.body[4000:]).hexdigest()
+        response = self.put(upload_id, 4000, self.body[4000:], HTTP_UPLOAD_CHECKSUM=f'sha256 {checksum}')
+        self.assertEqual(response['Upload-Offset'], str(len(self.body)))
+
+        response = self.client.post(reverse('media-upload-finalize', args=[upload_id]))
+        self.assertEqual(response.status_code, 201)
+        media = PropertyMedia.objects.get(pk=response.data['property_media'])
+        self.assertEqual(media.processing_status, 'pending')
+        self.assertEqual(media.file_size_bytes, len(self.body))
+        with media.file.open('rb') as f:
+            self.assertEqual(f.read(), self.body)
+
+    def test_declared_and_sniffed_formats_are_checked(self):
+        self.assertEqual(self.start(original_filename='clip.mp4').status_code, 400)
+        self.assertEqual(self.start(total_size_bytes=11 * 1024 * 1024).status_code, 400)
+
+        upload_id = self.start().data['id']
+        response = self.put(upload_id, 0, b'%PDF-1.7' + self.body[8:])
+        self.assertEqual(response.status_code, 415)
+        self.assertEqual(MediaUpload.objects.get(pk=upload_id).status, 'aborted')
+
+    def test_checksum_mismatch_keeps_the_offset(self):
+        upload_id = self.start().data['id']
+        response = self.put(upload_id, 0, self.body, HTTP_UPLOAD_CHECKSUM='sha256 ' + '0' * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(MediaUpload.objects.get(pk=upload_id).received_bytes, 0)
+
+    def test_chunk_is_copied_outside_a_transaction(self):
+        upload_id = self.start().data['id']
+        depth = len(connection.atomic_blocks)
+        seen = []
+
+        def read(size):
+            seen.append(len(connection.atomic_blocks))
+            # A second chunk for the session is refused while this one is copied.
+            seen.append(self.put(upload_id, 0, self.body[:10]).status_code)
+            return self.body[:size]
+
+        upload = uploads.write_chunk(upload_id, 0, 10, mock.Mock(read=read))
+        self.assertEqual(seen, [depth, 409])
+        self.assertEqual((upload.received_bytes, upload.chunk_started_at), (10, None))
+
+
+class PropertyConditionalGetTests(PropertyFixturesMixin, TestCase):
+    """ETags answer unchanged reads with 304 before anything is serialized"""
+
+    def setUp(self):
+        self.prop = self.make_property(0)
+        self.client = APIClient()
+        self.detail_url = reverse('property-detail', args=[self.prop.pk])
+
+    def test_detail_revalidates_until_related_rows_change(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertIn('public', response['Cache-Control'])
+        self.assertIn('Authorization', response['Vary'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        media = self.prop.media.first()
+        media.alt_text = 'Living room'
+        media.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_detail_hides_listings_that_are_not_live_except_from_their_landlord(self):
+        pending = self.make_property(
+            1, status=PropertyStatus.objects.create(name='pending', display_name='Pending'),
+        )
+        url = reverse('property-detail', args=[pending.pk])
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.tenant)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.client.force_authenticate(self.landlord)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_list_etag_is_per_user_and_private_when_authenticated(self):
+        url = reverse('property-list-create')
+        anonymous = self.client.get(url)['ETag']
+
+        self.client.force_authenticate(self.tenant)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=anonymous)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+
+        LovedProperty.objects.create(user=self.tenant, property=self.prop)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertTrue(changed.data['results'][0]['is_loved'])
+
+    def test_list_computes_validators_only_when_revalidating(self):
+        url = reverse('property-list-create')
+        first = self.client.get(url)
+        self.assertIn('ETag', first)
+        with mock.patch('properties.views.listing_validators', wraps=listing_validators) as validators:
+            second = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+            self.assertEqual(second.status_code, 200)
+            third = self.client.get(url, HTTP_IF_NONE_MATCH=second['ETag'])
+        self.assertEqual(third.status_code, 304)
+        self.assertEqual(validators.call_count, 2)
+
+
+class ListingCardParityTests(PropertyFixturesMixin, TestCase):
+    """The values-based card builder renders exactly what PropertyListSerializer does"""
+
+    def test_cards_match_serializer_field_by_field(self):
+        loved = self.make_property(0, availability_date=timezone.localdate())
+        rated = self.make_property(1, is_furnished=True, deposit_amount=Decimal('5000'))
+        Property.objects.create(
+            title='No location', description='', landlord=self.landlord,
+            property_type=self.property_type, status=self.active_status, rent_amount=Decimal('9000.5'),
+        )
+        LovedProperty.objects.create(user=self.tenant, property=loved)
+        Review.objects.create(
+            property=rated, tenant=self.tenant, overall_rating=4, title='Good', review_text='Good',
+        )
+        PropertyMedia.objects.filter(property=rated).update(renditions={
+            'webp': {'640': {'name': 'property_renditions/x/640.webp', 'width': 640, 'height': 480, 'size_bytes': 1}},
+            'jpeg': {'320': {'name': 'property_renditions/x/320.jpeg', 'width': 320, 'height': 240, 'size_bytes': 1}},
+        })
+
+        request = RequestFactory().get('/api/properties/')
+        request.user = self.tenant
+        queryset = Property.objects.order_by('-created_at')
+        expected = json.loads(JSONRenderer().render(
+            PropertyListSerializer(queryset.for_listing(self.tenant), many=True, context={'request': request}).data
+        ))
+        actual = json.loads(FastJSONRenderer().render(
+            CardBuilder(request).build(card_values(queryset, self.tenant))
+        ))
+
+        self.assertEqual(len(actual), 3)
+        for expected_card, card in zip(expected, actual):
+            self.assertEqual(list(card), list(expected_card))
+            for field, value in expected_card.items():
+                self.assertEqual(card[field], value, f'{expected_card["title"]}: {field}')
+
+
+class PublicSearchPredicateTests(PropertyFixturesMixin, TestCase):
+    """Public searches read the denormalized flag instead of joining property_status"""
+
+    def test_flag_follows_status_and_expiry_is_checked_in_the_query(self):
+        live = self.make_property(0)
+        expired = self.make_property(1, expires_at=timezone.now() - timedelta(days=1))
+        pending = self.make_property(2, status=PropertyStatus.objects.create(name='pending', display_name='Pending'))
+
+        self.assertEqual(list(Property.objects.publicly_searchable()), [live])
+        self.assertTrue(Property.objects.get(pk=live.pk).is_available)
+        self.assertFalse(pending.is_publicly_searchable)
+        self.assertTrue(expired.location.is_publicly_searchable)
+
+        self.active_status.is_public = False
+        self.active_status.save()
+        self.assertFalse(Property.objects.publicly_searchable().exists())
+        self.assertFalse(PropertyLocation.objects.get(property=live).is_publicly_searchable)
+
+        pending.status = self.active_status
+        pending.save(update_fields=['status'])
+        self.active_status.is_public = True
+        self.active_status.save()
+        self.assertEqual(set(Property.objects.publicly_searchable()), {live, pending})
+
+    def test_listing_queries_do_not_join_property_status(self):
+        self.make_property(0)
+        with CaptureQueriesContext(connection) as ctx:
+            response = APIClient().get(reverse('property-list-create'), {'near': '-1.292066,36.782460'})
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['status_display'], 'Active')
+        self.assertFalse([query for query in ctx.captured_queries if 'property_status' in query['sql']])
+
+
+class AsyncEndpointTests(PropertyFixturesMixin, TestCase):
+    """The async read endpoints answer exactly as the sync ones do"""
+
+    def setUp(self):
+        self.prop = self.make_property(0)
+        self.make_property(1)
+        LovedProperty.objects.create(user=self.tenant, property=self.prop, notes='Near work')
+        self.headers = {'Authorization': f'Bearer {RefreshToken.for_user(self.tenant).access_token}'}
+
+    async def assert_same(self, sync_path, async_path, headers=None):
+        expected = await sync_to_async(self.client.get)(sync_path, headers=headers)
+        actual = await AsyncClient().get(async_path, headers=headers)
+        self.assertEqual(actual.status_code, expected.status_code)
+        self.assertEqual(json.loads(actual.content), json.loads(expected.content))
+        return actual
+
+    async def test_reads_match_sync_endpoints(self):
+        await self.assert_same('/api/properties/', '/api/async/properties/', self.headers)
+        await self.assert_same('/api/properties/?min_price=cheap', '/api/async/properties/?min_price=cheap')
+        await self.assert_same(
+            f'/api/properties/{self.prop.pk}/', f'/api/async/properties/{self.prop.pk}/', self.headers,
+        )
+        await self.assert_same(
+            '/api/core/neighborhoods/?include=stats', '/api/async/core/neighborhoods/?include=stats',
+        )
+
+    async def test_detail_revalidates_and_missing_listing_is_404(self):
+        url = f'/api/async/properties/{self.prop.pk}/'
+        response = await AsyncClient().get(url)
+        revalidated = await AsyncClient().get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+        missing = await AsyncClient().get('/api/async/properties/00000000-0000-4000-8000-000000000000/')
+        self.assertEqual(missing.status_code, 404)
+
+    async def test_loved_properties_require_authentication(self):
+        url = '/api/async/properties/loved/'
+        self.assertEqual((await AsyncClient().get(url)).status_code, 401)
+
+        response = await AsyncClient().get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        [love] = json.loads(response.content)['results']
+        self.assertEqual(love['property'], str(self.prop.pk))
+        self.assertEqual(love['notes'], 'Near work')
+        self.assertTrue(love['property_details']['is_loved'])
+
+
+class SeedDataTests(TestCase):
+    """Synthetic data is reproducible and consistent with what signals would maintain"""
+
+    def test_seed_is_deterministic_and_maintained(self):
+        counts = seed.seed(properties=12, seed=7)
+        titles = list(Property.objects.order_by('title', 'rent_amount').values_list('title', 'rent_amount'))
+
+        self.assertEqual(counts['properties'], 12)
+        with self.assertRaises(ValueError):
+            seed.seed(properties=12, seed=7)
+        self.assertEqual(seed.seed(properties=12, seed=7, reset_existing=True), counts)
+        self.assertEqual(
+            list(Property.objects.order_by('title', 'rent_amount').values_list('title', 'rent_amount')), titles,
+        )
+
+        prop = Property.objects.filter(loved_by_users__isnull=False).first()
+        self.assertEqual(prop.love_count, prop.loved_by_users.count())
+        self.assertEqual(prop.rating_aggregate.review_count, prop.reviews.count())
+        self.assertFalse(Property.objects.filter(location__location__isnull=True).exists())
+
+    def test_percentiles_and_comparison(self):
+        self.assertEqual(percentile([1, 2, 3, 4, 5], 0.5), 3)
+        self.assertAlmostEqual(percentile([10, 20], 0.95), 19.5)
+        baseline = {'results': {'list': {'p50_ms': 10, 'p95_ms': 20, 'queries': 4}}}
+        current = {'results': {
+            'list': {'p50_ms': 5, 'p95_ms': 20, 'queries': 2},
+            'new': {'p50_ms': 1, 'p95_ms': 1, 'queries': 1},
+        }}
+        self.assertEqual(compare(baseline, current), [
+            ('list', 'p50_ms', 10, 5, -0.5),
+            ('list', 'p95_ms', 20, 20, 0.0),
+            ('list', 'queries', 4, 2, -0.5),
+        ])
+
+    def test_every_scenario_runs_on_seeded_data(self):
+        seed.seed(properties=12, seed=7)
+        for name, scenario in Scenarios().all().items():
+            with self.subTest(name):
+                scenario()
+
+
+class LifecycleSweepTests(PropertyFixturesMixin, TestCase):
+    """The lifecycle sweep expires listings and purges tokens in batches"""
+
+    def test_sweep_expires_listings_and_purges_tokens(self):
+        past, future = timezone.now() - timedelta(days=1), timezone.now() + timedelta(days=1)
+        live = self.make_property(0, expires_at=future)
+        lapsed = [self.make_property(i, expires_at=past) for i in range(1, 4)]
+        EmailVerificationToken.objects.create(user=self.tenant, token='used', expires_at=future, is_used=True)
+        EmailVerificationToken.objects.create(user=self.tenant, token='fresh', expires_at=future)
+        PasswordResetToken.objects.create(user=self.tenant, token='stale', expires_at=past)
+
+        counts = sweep(batch_size=2)
+
+        self.assertEqual(counts, {
+            'listings_expired': 3, 'badges_deactivated': 0,
+            'email_tokens_purged': 1, 'reset_tokens_purged': 1,
+        })
+        self.assertEqual(
+            set(Property.objects.filter(status__name='expired')), set(lapsed),
+        )
+        self.assertEqual(list(Property.objects.publicly_searchable()), [live])
+        self.assertFalse(PropertyLocation.objects.filter(
+            property__in=lapsed, is_publicly_searchable=True,
+        ).exists())
+        self.assertEqual(list(EmailVerificationToken.objects.values_list('token', flat=True)), ['fresh'])
+        self.assertFalse(PasswordResetToken.objects.exists())
+        self.assertEqual(sweep(batch_size=2)['listings_expired'], 0)
+
+
+class DashboardAnalyticsTests(PropertyFixturesMixin, TestCase):
+    """Dashboard ranges are answered from month, then week, then day rows"""
+
+    def test_plan_uses_coarsest_periods_first(self):
+        self.assertEqual(plan(date(2024, 1, 10), date(2024, 4, 20)), [
+            (PropertyMonthlyAnalytics, date(2024, 2, 1), date(2024, 4, 1)),
+            (PropertyWeeklyAnalytics, date(2024, 1, 15), date(2024, 1, 29)),
+            (PropertyAnalytics, date(2024, 1, 10), date(2024, 1, 15)),
+            (PropertyAnalytics, date(2024, 1, 29), date(2024, 2, 1)),
+            (PropertyWeeklyAnalytics, date(2024, 4, 1), date(2024, 4, 15)),
+            (PropertyAnalytics, date(2024, 4, 15), date(2024, 4, 21)),
+        ])
+
+    def test_dashboard_totals_match_daily_rows_in_one_query(self):
+        props = [self.make_property(0), self.make_property(1)]
+        first = date(2024, 1, 1)
+        PropertyAnalytics.objects.bulk_create([
+            PropertyAnalytics(
+                property=prop, date=first + timedelta(days=n), views=10 + n % 7, inquiries=n % 3,
+                loves=n % 2, search_appearances=40, search_clicks=n % 5,
+            )
+            for prop in props for n in range(150)
+        ])
+        refresh_rollups()
+        self.assertEqual(PropertyMonthlyAnalytics.objects.filter(property=props[0]).count(), 5)
+
+        client = APIClient()
+        client.force_authenticate(self.landlord)
+        with self.assertNumQueries(1):
+            response = client.get(reverse('dashboard-analytics'), {'start': '2024-01-10', 'end': '2024-04-20'})
+        self.assertEqual(response.status_code, 200)
+
+        daily = PropertyAnalytics.objects.filter(date__range=('2024-01-10', '2024-04-20'))
+        for prop in props:
+            rows = daily.filter(property=prop)
+            views = sum(row.views for row in rows)
+            inquiries = sum(row.inquiries for row in rows)
+            listing = next(item for item in response.data['properties'] if item['id'] == str(prop.pk))
+            self.assertEqual(listing['views'], views)
+            self.assertEqual(listing['inquiries'], inquiries)
+            self.assertEqual(listing['view_to_inquiry_rate'], round(inquiries / views, 4))
+        totals = response.data['totals']
+        self.assertEqual(totals['views'], sum(row.views for row in daily))
+        self.assertEqual(totals['search_ctr'], round(
+            sum(row.search_clicks for row in daily) / sum(row.search_appearances for row in daily), 4,
+        ))
+
+        client.force_authenticate(self.tenant)
+        response = client.get(reverse('dashboard-analytics'), {'property': str(props[0].pk)})
+        self.assertEqual(response.status_code, 404)
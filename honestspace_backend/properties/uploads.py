@@ -0,0 +1,327 @@
+# properties/uploads.py
+"""
+Chunked, resumable uploads for ``PropertyMedia`` and ``ReviewMedia``.
+
+A client opens a ``MediaUpload`` session with the file's name, size and
+media type, then sends the bytes in order with ``PUT`` requests carrying
+an ``Upload-Offset`` header (and optionally ``Upload-Checksum: sha256
+<hex>`` for the chunk), and finally asks for the session to be finalized.
+After a dropped connection the client reads the session's
+``received_bytes`` and resumes from there.
+
+Chunks are copied from the request stream to a part file on local disk
+``BUFFER_SIZE`` bytes at a time, hashing as they go, so neither Django's
+upload handlers nor memory ever hold a whole chunk, and outside any
+database transaction. The declared size and extension are checked
+against ``core.MediaType`` when the session opens and the real format is
+sniffed from the magic bytes of the first chunk.
+Finalizing creates the media row, then hands the part file to storage (a
+rename on the file system backend). The part directory must be shared by
+every app server that can receive a session's chunks.
+"""
+import hashlib
+import os
+import tempfile
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.exceptions import APIException, UnsupportedMediaType, ValidationError
+
+from .media import PROCESSABLE_TYPES
+from .models import MediaUpload, PropertyMedia, ReviewMedia
+
+BUFFER_SIZE = 64 * 1024
+MAX_CHUNK_BYTES = getattr(settings, 'MEDIA_UPLOAD_MAX_CHUNK_BYTES', 8 * 1024 * 1024)
+SESSION_TTL = timedelta(hours=getattr(settings, 'MEDIA_UPLOAD_SESSION_HOURS', 24))
+# A chunk whose copy has run this long is presumed abandoned (e.g. a killed worker).
+CHUNK_TIMEOUT = timedelta(minutes=getattr(settings, 'MEDIA_UPLOAD_CHUNK_TIMEOUT_MINUTES', 10))
+UPLOAD_DIR = getattr(settings, 'MEDIA_UPLOAD_DIR', None) or os.path.join(
+    settings.FILE_UPLOAD_TEMP_DIR or tempfile.gettempdir(), 'honestspace-uploads'
+)
+
+REVIEW_MEDIA_TYPES = ('image', 'video')
+
+# (offset, signature, format); checked in order.
+MAGIC_BYTES = [
+    (0, b'\xff\xd8\xff', 'jpg'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (0, b'GIF87a', 'gif'),
+    (0, b'GIF89a', 'gif'),
+    (8, b'WEBP', 'webp'),
+    (8, b'AVI ', 'avi'),
+    (4, b'ftypheic', 'heic'),
+    (4, b'ftypheix', 'heic'),
+    (4, b'ftypmif1', 'heic'),
+    (4, b'ftypqt', 'mov'),
+    (4, b'ftyp3gp', '3gp'),
+    (4, b'ftyp', 'mp4'),
+    (0, b'\x1a\x45\xdf\xa3', 'webm'),
+    (0, b'%PDF-', 'pdf'),
+]
+SNIFF_BYTES = 16
+
+# Extensions that name the same format
+FORMAT_ALIASES = {'jpeg': 'jpg', 'jpe': 'jpg', 'heif': 'heic', 'mkv': 'webm', 'm4v': 'mp4'}
+
+
+class UploadConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'The upload is not in a state that allows this request.'
+    default_code = 'conflict'
+
+
+def normalize_format(name):
+    fmt = name.rsplit('.', 1)[-1].lower() if '.' in name else name.lower()
+    return FORMAT_ALIASES.get(fmt, fmt)
+
+
+def allowed_formats(media_type):
+    return {normalize_format(fmt) for fmt in media_type.allowed_formats}
+
+
+def sniff_format(head):
+    """Format named by the magic bytes at the start of a file, or None."""
+    for offset, signature, fmt in MAGIC_BYTES:
+        if head[offset:offset + len(signature)] == signature:
+            return fmt
+    return None
+
+
+def check_declared(media_type, filename, size, target):
+    """Validate what a client declares before any bytes are sent."""
+    errors = {}
+    if target == 'review' and media_type.name not in REVIEW_MEDIA_TYPES:
+        errors['media_type'] = [f'Reviews accept {" and ".join(REVIEW_MEDIA_TYPES)} media only.']
+    max_bytes = media_type.max_file_size_mb * 1024 * 1024
+    if size > max_bytes:
+        errors['total_size_bytes'] = [f'Files of this type are limited to {media_type.max_file_size_mb} MB.']
+    if normalize_format(filename) not in allowed_formats(media_type):
+        errors['original_filename'] = [
+            f'Allowed formats: {", ".join(sorted(media_type.allowed_formats))}.'
+        ]
+    if errors:
+        raise ValidationError(errors)
+
+
+def part_path(upload):
+    return os.path.join(UPLOAD_DIR, f'{upload.pk}.part')
+
+
+def start(user, **fields):
+    """Open a session; ``fields`` are already validated ``MediaUpload`` fields."""
+    upload = MediaUpload.objects.create(
+        user=user, expires_at=timezone.now() + SESSION_TTL, **fields
+    )
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    open(part_path(upload), 'wb').close()
+    return upload
+
+
+def _locked(upload_id):
+    upload = MediaUpload.objects.select_for_update().select_related('media_type').get(pk=upload_id)
+    if upload.status != 'uploading':
+        raise UploadConflict(f'Upload is {upload.status}.')
+    if upload.expires_at <= timezone.now():
+        raise UploadConflict('Upload session has expired.')
+    return upload
+
+
+def _discard(upload):
+    upload.status = 'aborted'
+    upload.save(update_fields=['status', 'updated_at'])
+    try:
+        os.remove(part_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+def _read_checksum(header):
+    """Hex digest from an ``Upload-Checksum: sha256 <hex>`` header."""
+    if not header:
+        return None
+    algorithm, _, value = header.strip().partition(' ')
+    if algorithm.lower() != 'sha256' or len(value.strip()) != 64:
+        raise ValidationError({'Upload-Checksum': ['Expected "sha256 <hex digest>".']})
+    return value.strip().lower()
+
+
+def write_chunk(upload_id, offset, length, stream, checksum_header=None):
+    """
+    Append ``length`` bytes from ``stream`` at ``offset``. The session is
+    marked as receiving a chunk in one short transaction and advanced in
+    another; the bytes are copied in between with no transaction open, so
+    a slow client does not hold a connection idle in a transaction. Other
+    chunks for the session are refused until this one ends.
+    """
+    expected_hash = _read_checksum(checksum_header)
+    with transaction.atomic():
+        upload = _locked(upload_id)
+        _check_chunk(upload, offset, length)
+        upload.chunk_started_at = timezone.now()
+        upload.save(update_fields=['chunk_started_at', 'updated_at'])
+    started = upload.chunk_started_at
+
+    try:
+        rejected, chunk_hash = _write(upload, offset, length, stream, expected_hash)
+    except BaseException:
+        _release(upload_id, started)
+        raise
+    if rejected is not None:
+        _release(upload_id, started)
+        # Not worth resuming: the file is the wrong kind.
+        abort(upload_id)
+        raise UnsupportedMediaType(
+            rejected or 'unknown', detail=f'File content is {rejected or "not a recognised format"}.'
+        )
+
+    with transaction.atomic():
+        current = MediaUpload.objects.select_for_update().select_related('media_type').get(pk=upload_id)
+        if current.status != 'uploading' or current.chunk_started_at != started:
+            # Aborted, or taken over after CHUNK_TIMEOUT, while the bytes were copied.
+            raise UploadConflict('The upload changed while the chunk was written.')
+        current.received_bytes += length
+        current.chunk_hashes = current.chunk_hashes + [chunk_hash]
+        current.detected_format = upload.detected_format
+        current.chunk_started_at = None
+        current.save(update_fields=[
+            'received_bytes', 'chunk_hashes', 'detected_format', 'chunk_started_at', 'updated_at',
+        ])
+    return current
+
+
+def _check_chunk(upload, offset, length):
+    if upload.chunk_started_at and upload.chunk_started_at > timezone.now() - CHUNK_TIMEOUT:
+        raise UploadConflict('Another chunk is being written.')
+    if offset != upload.received_bytes:
+        raise UploadConflict(f'Expected Upload-Offset {upload.received_bytes}.')
+    if length <= 0 or length > MAX_CHUNK_BYTES:
+        raise ValidationError({'Content-Length': [f'Chunks must be 1 to {MAX_CHUNK_BYTES} bytes.']})
+    if offset + length > upload.total_size_bytes:
+        raise ValidationError({'Content-Length': ['Chunk goes past the declared file size.']})
+
+
+def _release(upload_id, started):
+    MediaUpload.objects.filter(pk=upload_id, chunk_started_at=started).update(chunk_started_at=None)
+
+
+def _write(upload, offset, length, stream, expected_hash):
+    """
+    Copy the chunk into the part file. Returns ``(rejected format, chunk
+    hash)``; the rejected format is None when the content is acceptable.
+    """
+    digest = hashlib.sha256()
+    head = b''
+    written = 0
+    with open(part_path(upload), 'r+b') as part:
+        part.seek(offset)
+        part.truncate()
+        while written < length:
+            data = stream.read(min(BUFFER_SIZE, length - written))
+            if not data:
+                break
+            if not upload.detected_format:
+                head += data[:SNIFF_BYTES - len(head)]
+                if len(head) >= SNIFF_BYTES or written + len(data) >= length:
+                    fmt = sniff_format(head)
+                    if fmt is None or fmt not in allowed_formats(upload.media_type):
+                        return fmt or '', None
+                    upload.detected_format = fmt
+            digest.update(data)
+            part.write(data)
+            written += len(data)
+
+        chunk_hash = digest.hexdigest()
+        if written != length or (expected_hash and expected_hash != chunk_hash):
+            # Drop the partial chunk; the client resends it from the same offset.
+            part.seek(offset)
+            part.truncate()
+            if written != length:
+                raise ValidationError({'Content-Length': ['Chunk ended before Content-Length bytes.']})
+            raise ValidationError({'Upload-Checksum': ['Chunk checksum does not match.']})
+    return None, chunk_hash
+
+
+class _PartFile(File):
+    # FileSystemStorage moves files that expose a temporary path instead of copying them.
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def finalize(upload_id):
+    """
+    Create the media row and move the completed file into storage. Returns
+    the session. The move comes last, so a failure before it leaves the part
+    file in place and finalizing can be retried.
+    """
+    with transaction.atomic():
+        upload = _locked(upload_id)
+        if upload.received_bytes != upload.total_size_bytes:
+            raise UploadConflict(
+                f'Received {upload.received_bytes} of {upload.total_size_bytes} bytes.'
+            )
+        upload.digest = hashlib.sha256(''.join(upload.chunk_hashes).encode()).hexdigest()
+
+        model = PropertyMedia if upload.target == 'property' else ReviewMedia
+        field = model._meta.get_field('file')
+        path = part_path(upload)
+        name = field.generate_filename(None, f'{upload.pk}.{upload.detected_format}')
+
+        if upload.target == 'property':
+            media = upload.property_media = PropertyMedia.objects.create(
+                property_id=upload.property_id,
+                media_type=upload.media_type,
+                file=name,
+                original_filename=upload.original_filename,
+                file_size_bytes=upload.total_size_bytes,
+                title=upload.title,
+                alt_text=upload.alt_text,
+                sort_order=upload.sort_order,
+                processing_status=(
+                    'pending' if upload.media_type.name in PROCESSABLE_TYPES else 'completed'
+                ),
+            )
+        else:
+            media = upload.review_media = ReviewMedia.objects.create(
+                review_id=upload.review_id,
+                file=name,
+                media_type=upload.media_type.name,
+                caption=upload.caption,
+                sort_order=upload.sort_order,
+            )
+        upload.status = 'completed'
+        upload.save()
+
+        with open(path, 'rb') as part:
+            stored = field.storage.save(name, _PartFile(part, name=path))
+        if stored != name:
+            # The storage picked a free name.
+            model.objects.filter(pk=media.pk).update(file=stored)
+            media.file.name = stored
+        transaction.on_commit(lambda: _remove(path))
+    return upload
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+@transaction.atomic
+def abort(upload_id):
+    _discard(_locked(upload_id))
+
+
+def purge_expired():
+    """Abort sessions past their expiry and delete their part files."""
+    expired = MediaUpload.objects.filter(status='uploading', expires_at__lte=timezone.now())
+    count = 0
+    for upload in expired.iterator():
+        _discard(upload)
+        count += 1
+    return count
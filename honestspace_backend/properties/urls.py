@@ -1,6 +1,17 @@
 from django.urls import path
-from .views import PropertyListCreateView
+from .views import (
+    DashboardAnalyticsView, MediaUploadCreateView, MediaUploadDetailView, MediaUploadFinalizeView,
+    PropertyBatchView, PropertyDetailView, PropertyFacetView, PropertyImportView, PropertyListCreateView,
+)
 
 urlpatterns = [
     path('', PropertyListCreateView.as_view(), name='property-list-create'),
+    path('<uuid:pk>/', PropertyDetailView.as_view(), name='property-detail'),
+    path('batch/', PropertyBatchView.as_view(), name='property-batch'),
+    path('import/', PropertyImportView.as_view(), name='property-import'),
+    path('facets/', PropertyFacetView.as_view(), name='property-facets'),
+    path('dashboard/analytics/', DashboardAnalyticsView.as_view(), name='dashboard-analytics'),
+    path('uploads/', MediaUploadCreateView.as_view(), name='media-upload-create'),
+    path('uploads/<uuid:pk>/', MediaUploadDetailView.as_view(), name='media-upload-detail'),
+    path('uploads/<uuid:pk>/finalize/', MediaUploadFinalizeView.as_view(), name='media-upload-finalize'),
 ]
@@ -1,11 +1,326 @@
-from rest_framework import generics, permissions
-from .models import Property
-from .serializers import PropertyCreateSerializer
+import uuid
 
-class PropertyListCreateView(generics.ListCreateAPIView):
-    queryset = Property.objects.all()
-    serializer_class = PropertyCreateSerializer
-    permission_classes = [permissions.IsAuthenticated]
+from django.conf import settings
+from django.db import DatabaseError
+from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from core.conditional import ConditionalGetMixin
+from core.renderers import FastJSONRenderer
+from . import bulk, rollups, uploads
+from .analytics import counters, visitor_key
+from .cards import CardBuilder, card_values
+from .conditional import listing_validators, property_validators
+from .facets import BOOLEAN_FEATURES, RENT_BUCKETS, get_facet_index
+from .filters import PropertyFilter
+from .models import MediaUpload, Property
+from .pagination import PropertyCursorPagination
+from .serializers import (
+    DashboardAnalyticsQuerySerializer, FacetQuerySerializer, MediaUploadSerializer, PropertyCreateSerializer,
+    PropertyDetailSerializer, PropertyListSerializer, get_pending_status,
+)
+
+class PropertyListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    pagination_class = PropertyCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PropertyFilter
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+    # The validators aggregate over every filtered listing; only pay for them on revalidation.
+    validate_unconditional = False
+
+    def get_validators(self, request, *args, **kwargs):
+        return listing_validators(self.filter_queryset(Property.objects.publicly_searchable()), request.user)
+
+    def get_queryset(self):
+        if self.request.method == 'GET':
+            return Property.objects.publicly_searchable().for_listing(self.request.user)
+        return Property.objects.all()
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return PropertyListSerializer
+        return PropertyCreateSerializer
+
+    def list(self, request, *args, **kwargs):
+        # Cards are built from .values() rows; PropertyListSerializer gives the same output.
+        rows = card_values(self.filter_queryset(self.get_queryset()), request.user)
+        page = self.paginate_queryset(rows)
+        cards = CardBuilder(request).build(page if page is not None else rows)
+        if page is not None:
+            return self.get_paginated_response(cards)
+        return Response(cards)
 
     def perform_create(self, serializer):
         serializer.save(landlord=self.request.user)
+
+
+class PropertyDetailView(ConditionalGetMixin, generics.RetrieveAPIView):
+    """Single listing; each read is recorded as a (buffered) view"""
+    permission_classes = [permissions.IsAuthenticatedOrReadOnly]
+    serializer_class = PropertyDetailSerializer
+    queryset = (
+        Property.objects
+        .select_related(
+            'landlord', 'property_type', 'status', 'location__neighborhood__city__county',
+            'rating_aggregate',
+        )
+        .prefetch_related('media', 'property_amenities__amenity')
+    )
+
+    def get_queryset(self):
+        return super().get_queryset().visible_to(self.request.user)
+
+    def get_validators(self, request, *args, **kwargs):
+        return property_validators(kwargs['pk'], request.user)
+
+    def get(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        # A revalidated (304) read is still a view.
+        if response.status_code in (200, 304):
+            counters.record_view(kwargs['pk'], visitor_key(request))
+        return response
+
+
+class PropertyImportView(APIView):
+    """
+    Bulk-import listings for the current user from an uploaded CSV or JSON
+    lines ``file``. Rows are streamed and written in chunks; invalid rows
+    are reported without stopping the import.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    max_errors = 1000
+
+    def post(self, request):
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'file': ['This field is required.']}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = request.data.get('format') or upload.name.rsplit('.', 1)[-1].lower()
+        if fmt not in bulk.READERS:
+            return Response(
+                {'format': [f"Expected one of: {', '.join(sorted(bulk.READERS))}"]},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        result = bulk.import_rows(
+            bulk.READERS[fmt](bulk.open_text(upload.file)),
+            request.user,
+            context={'request': request},
+        )
+        response_status = status.HTTP_201_CREATED if result.created else status.HTTP_200_OK
+        return Response(result.as_dict(max_errors=self.max_errors), status=response_status)
+
+
+def _as_uuid(value):
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+def _item_error(index, errors):
+    return {'index': index, 'status': 'error', 'errors': errors}
+
+
+class PropertyBatchView(APIView):
+    """
+    Create or update up to ``max_items`` listings in one request. Items with
+    an ``id`` update that listing (partially), the rest are created. All
+    items are validated first and written with bulk statements, so the
+    query count does not grow with the number of items; the response
+    reports each item's outcome in request order.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    max_items = getattr(settings, 'PROPERTY_BATCH_MAX_ITEMS', 100)
+
+    def post(self, request):
+        items = request.data.get('items') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response({'items': ['Expected a non-empty list.']}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > self.max_items:
+            return Response(
+                {'items': [f'At most {self.max_items} items per request.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        context = {'request': request}
+        update_ids = {_as_uuid(item.get('id')) for item in items if isinstance(item, dict)} - {None}
+        owned = Property.objects.select_related('location').filter(
+            landlord=request.user, pk__in=update_ids
+        ).in_bulk() if update_ids else {}
+
+        results = [None] * len(items)
+        creates, updates = [], []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results[index] = _item_error(index, {'non_field_errors': ['Expected an object.']})
+                continue
+            if item.get('id'):
+                prop = owned.get(_as_uuid(item['id']))
+                if prop is None:
+                    results[index] = _item_error(index, {'id': ['Not found.']})
+                    continue
+                serializer = PropertyCreateSerializer(prop, data=item, partial=True, context=context)
+                if serializer.is_valid():
+                    updates.append((index, prop, serializer.validated_data))
+                else:
+                    results[index] = _item_error(index, serializer.errors)
+            else:
+                data, errors = bulk.validate(item, context)
+                if errors:
+                    results[index] = _item_error(index, errors)
+                else:
+                    creates.append((index, data))
+
+        if creates:
+            outcome = bulk.ImportResult()
+            bulk.insert_chunk(creates, request.user, get_pending_status(), outcome)
+            for index, prop in outcome.created:
+                results[index] = {'index': index, 'status': 'created', 'id': str(prop.pk)}
+            for error in outcome.errors:
+                results[error.row] = _item_error(error.row, error.errors)
+
+        if updates:
+            try:
+                bulk.update([(prop, data) for _, prop, data in updates])
+            except DatabaseError as exc:
+                for index, _, _ in updates:
+                    results[index] = _item_error(index, {'non_field_errors': [str(exc).strip()]})
+            else:
+                for index, prop, _ in updates:
+                    results[index] = {'index': index, 'status': 'updated', 'id': str(prop.pk)}
+
+        failed = sum(result['status'] == 'error' for result in results)
+        if failed == len(results):
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({'results': results, 'failed': failed}, status=response_status)
+
+
+class PropertyFacetView(APIView):
+    """
+    Filter live listings and count facets from the in-process bitmap index.
+    Only the requested page of listings is loaded from the database.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        params = FacetQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+
+        result = get_facet_index().query(
+            property_types=query['property_types'],
+            amenities=query['amenities'],
+            rent_buckets=query['rent_buckets'],
+            features={name: query[name] for name in BOOLEAN_FEATURES if query.get(name) is not None},
+            offset=query['offset'],
+            limit=query['page_size'],
+        )
+
+        rows = card_values(Property.objects.filter(pk__in=result.ids), request.user)
+        cards = {card['id']: card for card in CardBuilder(request).build(rows)}
+        page = [cards[str(pk)] for pk in result.ids if str(pk) in cards]
+        facets = dict(result.facets)
+        facets['rent_bucket'] = [
+            {
+                'bucket': index,
+                'min': low,
+                'max': high,
+                'count': facets['rent_bucket'].get(index, 0),
+            }
+            for index, (low, high) in enumerate(RENT_BUCKETS)
+        ]
+        return Response({
+            'count': result.count,
+            'results': page,
+            'facets': facets,
+        })
+
+
+class DashboardAnalyticsView(APIView):
+    """
+    Views, inquiries, loves and conversion rates of the user's listings over
+    ``start``..``end`` (default: the last 30 days), per listing and for the
+    whole portfolio, from the analytics rollups in one query.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    renderer_classes = [FastJSONRenderer, BrowsableAPIRenderer]
+
+    def get(self, request):
+        params = DashboardAnalyticsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        query = params.validated_data
+        result = rollups.portfolio_analytics(request.user, query['start'], query['end'], query.get('property'))
+        if query.get('property') and not result['properties']:
+            raise NotFound
+        return Response(result)
+
+
+class MediaUploadCreateView(generics.CreateAPIView):
+    """
+    Open a resumable upload for property or review media. The declared size
+    and extension are checked against the media type before any bytes move.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = MediaUploadSerializer
+
+
+class MediaUploadDetailView(APIView):
+    """
+    ``GET`` reports progress, ``PUT`` appends the raw request body at the
+    ``Upload-Offset`` header, ``DELETE`` abandons the upload.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_object(self, pk):
+        return get_object_or_404(MediaUpload, pk=pk, user=self.request.user)
+
+    def get(self, request, pk):
+        return Response(MediaUploadSerializer(self.get_object(pk), context={'request': request}).data)
+
+    def put(self, request, pk):
+        self.get_object(pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            length = int(request.headers.get('Content-Length') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'Upload-Offset': ['An integer Upload-Offset header is required.']},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        # The body is read from the raw stream; request.data would buffer it.
+        upload = uploads.write_chunk(
+            pk, offset, length, request.stream, request.headers.get('Upload-Checksum')
+        )
+        response = Response(MediaUploadSerializer(upload, context={'request': request}).data)
+        response['Upload-Offset'] = str(upload.received_bytes)
+        return response
+
+    def delete(self, request, pk):
+        self.get_object(pk)
+        uploads.abort(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MediaUploadFinalizeView(APIView):
+    """Create the media row once every byte has arrived."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request, pk):
+        get_object_or_404(MediaUpload, pk=pk, user=request.user)
+        upload = uploads.finalize(pk)
+        return Response(
+            MediaUploadSerializer(upload, context={'request': request}).data,
+            status=status.HTTP_201_CREATED,
+        )